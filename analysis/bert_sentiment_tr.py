@@ -1,118 +1,252 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import time
 import warnings
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
 warnings.filterwarnings('ignore')
 
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.table_io import read_table, resolve_table_path, write_table
+from analysis.sentiment_engine import (SentimentEngine, parity_check, polarity_to_sentiment, predict_scores_sharded,
+                                       scores_to_sentiment)
+from analysis.sentiment_server import SentimentClient
+from data.text_normalization import normalize_whitespace
+from labeling.label_cache import LabelCache
+
 
-print("BERT modeli yükleniyor...")
 model_name = "savasy/bert-base-turkish-sentiment-cased"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSequenceClassification.from_pretrained(model_name)
-print("✅ BERT modeli yüklendi!")
 
+# Toplu çıkarım ayarları
+batch_size = 32
+num_threads = None  # None: PyTorch varsayılanı
+workers = 1  # >1: satırlar bu kadar sürece bölünür, her süreç ayrı çekirdek grubuna bağlanır
+backend = "torch"  # 'torch' (fp32), 'int8' (dinamik kuantizasyon) veya 'onnx' (ONNX Runtime)
+parity_sample = 0  # >0 ve backend fp32 değilse, bu kadar yorumda fp32 ile uyum kontrolü yapılır
+
+# Uzun yorumlar: None ise 512 tokendan sonrası kesilir; 'mean', 'max_negative' veya 'last_weighted'
+# verilirse yorum window_overlap token örtüşen pencerelere bölünür ve pencere skorları bu yöntemle birleştirilir
+chunk_reducer = None
+window_overlap = 64
+
+# Kalıcı duygu önbelleği (None: kapalı); anahtar: normalize yorum özeti + model + arka uç
+cache_file = os.path.join("outputs", "duygu_cache.sqlite")
+cache_max_entries = 2_000_000
+
+# Çalışan duygu servisi (analysis/sentiment_server.py) adresi; ayarlıysa model bu süreçte yüklenmez
+server_url = os.environ.get("DUYGU_SERVER_URL")
+
+_engine = None
+_sentiment_cache = None
+
+
+def get_sentiment_engine(batch_size=batch_size, num_threads=num_threads, backend=backend,
+                         chunk_reducer=chunk_reducer, window_overlap=window_overlap):
+    """Duygu analizi motorunu ilk kullanımda bir kez oluştur ve modeli yükle"""
+    global _engine
+    if _engine is None or _engine.backend_name != backend:
+        _engine = SentimentEngine(model_name, batch_size=batch_size, num_threads=num_threads, backend=backend,
+                                  chunk_reducer=chunk_reducer, window_overlap=window_overlap)
+    else:
+        _engine.batch_size = max(1, batch_size)
+        _engine.chunk_reducer = chunk_reducer
+        _engine.window_overlap = window_overlap
+    return _engine.load()
 
-def analyze_sentiment(text):
-    try:
-        
-        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512, padding=True)
-        
-      
-        model.eval()
-        with torch.no_grad():
-            outputs = model(**inputs)
-            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            sentiment_scores = predictions[0].tolist()
-            
-        
-        sentiment = "Pozitif" if sentiment_scores[1] > sentiment_scores[0] else "Negatif"
-        
-        polarity = sentiment_scores[1] - sentiment_scores[0]
-        
-        return sentiment, polarity
-    except Exception as e:
-        print(f"⚠️ Duygu analizi hatası: {str(e)}")
-        return "Nötr", 0.0
 
+def _window_setting(chunk_reducer, window_overlap):
+    """Sonucu etkileyen pencere örtüşmesi; birleştirici yoksa yorumlar kesilir ve örtüşme önemsizdir"""
+    return window_overlap if chunk_reducer else None
 
-start_time = time.time()
 
-print("\n🚀 DUYGU ANALİZİ İŞLEMİ BAŞLADI")
-print("-------------------------------")
+def get_sentiment_cache(backend=backend, cache_file=cache_file, chunk_reducer=chunk_reducer,
+                        window_overlap=window_overlap):
+    """Arka uca ve uzun yorum ayarına özgü kalıcı duygu önbelleğini döndür"""
+    global _sentiment_cache
+    model_id = f"{model_name}:{backend}"
+    if chunk_reducer:
+        model_id += f":{chunk_reducer}-{_window_setting(chunk_reducer, window_overlap)}"
+    if _sentiment_cache is None or _sentiment_cache.model_name != model_id or _sentiment_cache.path != cache_file:
+        _sentiment_cache = LabelCache(cache_file, model_id, prompt_version="duygu-v1",
+                                      max_entries=cache_max_entries, normalize=normalize_whitespace)
+    return _sentiment_cache
 
 
-tahmin_sonuclari = r"tahmin_sonuclari.xlsx"
+def load_sentiment_model():
+    """BERT modelini ilk kullanımda bir kez yükle"""
+    engine = get_sentiment_engine()
+    return engine.tokenizer, engine.model
 
 
-if not os.path.exists(tahmin_sonuclari):
-    print(f"⚠️ HATA: Excel dosyası bulunamadı!")
-    print(f"Aranan konum: {tahmin_sonuclari}")
-    print("Lütfen dosya yolunu kontrol edin.")
-    exit()
+def analyze_sentiment(text):
+    try:
+        return get_sentiment_engine().predict([text])[0]
+    except Exception as e:
+        print(f"⚠️ Duygu analizi hatası: {str(e)}")
+        return "Nötr", 0.0
 
 
-try:
-    df = pd.read_excel(tahmin_sonuclari)
-    print(f"📥 Tahmin sonuçları yüklendi: {len(df)} örnek")
-except Exception as e:
-    print(f"⚠️ Excel dosyası yüklenirken hata oluştu: {str(e)}")
-    exit()
+def print_parity_report(report, backend):
+    """Arka uç uyum kontrolü sonucunu yazdır"""
+    print(f"\n🔬 {backend} / fp32 UYUM KONTROLÜ ({report['ornek']} yorum)")
+    if not report['ornek']:
+        return
+    print(f"   Etiket uyumu: %{report['etiket_uyum']*100:.2f}")
+    print(f"   Polarite farkı: ort. {report['polarite_ort_fark']:.4f}, en fazla {report['polarite_max_fark']:.4f}")
+    print(f"   Hız: fp32 {report['fp32_yorum_per_sn']:.1f} yorum/sn, {backend} {report['aday_yorum_per_sn']:.1f} yorum/sn"
+          + (f" (x{report['hizlanma']:.2f})" if report['hizlanma'] else ""))
+
+
+def run_sentiment(tahmin_sonuclari="tahmin_sonuclari.parquet", df=None, sonuc_dosyasi="duygu_analizi_sonuclari.parquet",
+                  excel_path=None, batch_size=batch_size, num_threads=num_threads, workers=workers,
+                  backend=backend, parity_sample=parity_sample, cache_file=cache_file, server_url=server_url,
+                  chunk_reducer=chunk_reducer, window_overlap=window_overlap):
+    """En az bir kategoride 1 olan yorumlara BERT ile duygu analizi uygula.
+
+    Girdi biçimi uzantıdan anlaşılır; eski çalıştırmalardan kalan tahmin_sonuclari.xlsx de okunur.
+    df verilirse dosya okunmaz; sonuc_dosyasi None ise sonuç yalnızca döndürülür,
+    excel_path verilirse ayrıca rapor amaçlı Excel kopyası yazılır. Yorumlar batch_size'lık
+    gruplar halinde, num_threads iş parçacığıyla analiz edilir; workers > 1 ise satırlar
+    o kadar sürece bölünür. backend çıkarım arka ucunu seçer; parity_sample > 0 ise önce
+    fp32 modelle uyum kontrolü yapılır. cache_file verilirse daha önce puanlanan yorumlar
+    önbellekten okunur ve yalnızca yeni yorumlar modele gönderilir. server_url verilir ve servis
+    ayaktaysa yorumlar modeli bellekte tutan yerel servise gönderilir. chunk_reducer verilirse uzun
+    yorumlar kesilmek yerine örtüşen pencerelere bölünüp bu yöntemle birleştirilir.
+    """
+    start_time = time.time()
+
+    print("\n🚀 DUYGU ANALİZİ İŞLEMİ BAŞLADI")
+    print("-------------------------------")
+
+
+    if df is None:
+        tahmin_sonuclari = resolve_table_path(tahmin_sonuclari)
+    if df is None and not os.path.exists(tahmin_sonuclari):
+        print(f"⚠️ HATA: Excel dosyası bulunamadı!")
+        print(f"Aranan konum: {tahmin_sonuclari}")
+        print("Lütfen dosya yolunu kontrol edin.")
+        return None
 
 
-kategori_sutunlari = [col for col in df.columns if col not in ['Yorum', 'Tarih']]
-print(f"Bulunan kategori sayısı: {len(kategori_sutunlari)}")
-print(f"Kategoriler: {', '.join(kategori_sutunlari)}")
+    try:
+        df = read_table(tahmin_sonuclari) if df is None else df.copy()
+        print(f"📥 Tahmin sonuçları yüklendi: {len(df)} örnek")
+    except Exception as e:
+        print(f"⚠️ Excel dosyası yüklenirken hata oluştu: {str(e)}")
+        return None
 
 
-df['Duygu_Polaritesi'] = 0.0
-df['Duygu_Etiketi'] = 'Nötr'
+    kategori_sutunlari = [col for col in df.columns if col not in ['Yorum', 'Tarih']]
+    print(f"Bulunan kategori sayısı: {len(kategori_sutunlari)}")
+    print(f"Kategoriler: {', '.join(kategori_sutunlari)}")
 
-print("🔍 En az bir kategoride 1 olan yorumlar bulunuyor...")
-bir_olan_satirlar = df[df[kategori_sutunlari].sum(axis=1) > 0]
-print(f"✅ Toplam {len(bir_olan_satirlar)} yorumda en az bir kategoride 1 değeri var.")
 
-print("💭 Duygu analizi yapılıyor...")
-analiz_sayisi = 0
+    df['Duygu_Polaritesi'] = 0.0
+    df['Duygu_Etiketi'] = 'Nötr'
 
-for idx, row in bir_olan_satirlar.iterrows():
+    print("🔍 En az bir kategoride 1 olan yorumlar bulunuyor...")
+    maske = df[kategori_sutunlari].sum(axis=1) > 0
+    bir_olan_satirlar = df[maske]
+    print(f"✅ Toplam {len(bir_olan_satirlar)} yorumda en az bir kategoride 1 değeri var.")
+
+    print("💭 Duygu analizi yapılıyor...")
+    
+    def ilerleme(analiz_sayisi, toplam):
+        if analiz_sayisi // 100 > (analiz_sayisi - batch_size) // 100 or analiz_sayisi == toplam:
+            print(f"   ➤ {analiz_sayisi}/{toplam} yorum analiz edildi.")
+    
     try:
-        yorum = row['Yorum']
-        duygu_etiketi, polarite = analyze_sentiment(yorum)
+        yorumlar = bir_olan_satirlar['Yorum'].tolist()
+        if parity_sample and backend != "torch":
+            print_parity_report(parity_check(yorumlar, model_name, backend, parity_sample, batch_size=batch_size,
+                                             chunk_reducer=chunk_reducer, window_overlap=window_overlap), backend)
+        sonuclar = [None] * len(yorumlar)
+        cache = get_sentiment_cache(backend, cache_file, chunk_reducer, window_overlap) if cache_file else None
+        if cache is not None:
+            for k, value in enumerate(cache.get_many(yorumlar, "duygu", "")):
+                if value is not None:
+                    sonuclar[k] = polarity_to_sentiment(float(value))
+            isabet = len(yorumlar) - sonuclar.count(None)
+            print(f"🗃️ Önbellekten gelen: {isabet}/{len(yorumlar)}"
+                  f" (isabet oranı %{isabet / len(yorumlar) * 100 if yorumlar else 0:.1f})")
+        
+        eksik = [k for k, sonuc in enumerate(sonuclar) if sonuc is None]
+        eksik_yorumlar = [yorumlar[k] for k in eksik]
+        client = SentimentClient(server_url) if server_url and eksik_yorumlar else None
+        if client is not None and not client.is_alive():
+            print(f"⚠️ Duygu servisine ulaşılamadı ({server_url}), model bu süreçte yüklenecek.")
+            client = None
+        elif client is not None and (
+                client.health.get("backend"), client.health.get("birlestirici"),
+                _window_setting(client.health.get("birlestirici"), client.health.get("ortusme"))
+        ) != (backend, chunk_reducer, _window_setting(chunk_reducer, window_overlap)):
+            print(f"⚠️ Duygu servisi farklı ayarlarla çalışıyor ({client.health.get('backend')}, "
+                  f"{client.health.get('birlestirici')}, örtüşme {client.health.get('ortusme')}), "
+                  f"model bu süreçte yüklenecek.")
+            client = None
         
-        df.at[idx, 'Duygu_Polaritesi'] = polarite
-        df.at[idx, 'Duygu_Etiketi'] = duygu_etiketi
+        if client is not None:
+            tahminler = client.predict(eksik_yorumlar)
+            stats = client.last_stats
+        elif workers > 1 and len(eksik_yorumlar) > 1:
+            puanlar, stats = predict_scores_sharded(eksik_yorumlar, model_name, workers, batch_size, backend=backend,
+                                                    chunk_reducer=chunk_reducer, window_overlap=window_overlap)
+            print(f"🧩 Yorumlar {stats['isci']} sürece bölündü")
+            tahminler = [None if scores is None else scores_to_sentiment(scores) for scores in puanlar]
+        elif eksik_yorumlar:
+            engine = get_sentiment_engine(batch_size, num_threads, backend, chunk_reducer, window_overlap)
+            tahminler = [None if scores is None else scores_to_sentiment(scores)
+                         for scores in engine.predict_scores(eksik_yorumlar, progress=ilerleme)]
+            stats = engine.last_stats
+        else:
+            tahminler, stats = [], {'yorum': 0, 'sure': 0.0, 'yorum_per_sn': 0.0}
         
-        analiz_sayisi += 1
-     
-        if analiz_sayisi % 100 == 0:
-            print(f"   ➤ {analiz_sayisi}/{len(bir_olan_satirlar)} yorum analiz edildi.")
-            
+        yeni = []
+        for k, tahmin in zip(eksik, tahminler):
+            sonuclar[k] = ("Nötr", 0.0) if tahmin is None else tahmin
+            if tahmin is not None:
+                # repr tam geri dönüşümlüdür; önbellekten okunan polarite yeni hesaplananla aynı olur
+                yeni.append((yorumlar[k], repr(float(tahmin[1]))))
+        if cache is not None and yeni:
+            cache.put_many([yorum for yorum, _ in yeni], "duygu", "", [deger for _, deger in yeni])
+        
+        df.loc[maske, 'Duygu_Etiketi'] = [etiket for etiket, _ in sonuclar]
+        df.loc[maske, 'Duygu_Polaritesi'] = [polarite for _, polarite in sonuclar]
+        
+        print(f"⚡ {stats['yorum']} yorum {stats['sure']:.2f} sn'de analiz edildi ({stats['yorum_per_sn']:.1f} yorum/sn)")
+        if stats.get('pencere', 0) > stats['yorum']:
+            print(f"🪟 Uzun yorumlar pencerelere bölündü: {stats['yorum']} yorum için {stats['pencere']} pencere puanlandı")
     except Exception as e:
         print(f"⚠️ Duygu analizi yapılırken hata oluştu: {str(e)}")
-        df.at[idx, 'Duygu_Polaritesi'] = 0
-        df.at[idx, 'Duygu_Etiketi'] = "Hata"
-
-
-try:
-    sonuc_dosyasi = "duygu_analizi_sonuclari.xlsx"
-    df.to_excel(sonuc_dosyasi, index=False)
-    print(f"\n Duygu analizi sonuçları '{sonuc_dosyasi}' dosyasına kaydedildi.")
-except Exception as e:
-    print(f"Excel dosyası oluşturulurken hata oluştu: {str(e)}")
-
-bir_olan_yorumlar = df[df[kategori_sutunlari].sum(axis=1) > 0]
-pozitif_sayisi = (bir_olan_yorumlar['Duygu_Etiketi'] == 'Pozitif').sum()
-negatif_sayisi = (bir_olan_yorumlar['Duygu_Etiketi'] == 'Negatif').sum()
-notr_sayisi = (bir_olan_yorumlar['Duygu_Etiketi'] == 'Nötr').sum()
-
-print("\n DUYGU ANALİZİ İSTATİSTİKLERİ")
-print(f"   Pozitif: {pozitif_sayisi} ({pozitif_sayisi/len(bir_olan_yorumlar)*100:.2f}%)")
-print(f"   Negatif: {negatif_sayisi} ({negatif_sayisi/len(bir_olan_yorumlar)*100:.2f}%)")
-print(f"   Nötr: {notr_sayisi} ({notr_sayisi/len(bir_olan_yorumlar)*100:.2f}%)")
-
-total_time = time.time() - start_time
-print(f"\n Toplam çalışma süresi: {total_time:.2f} saniye")
-print("\n Duygu analizi işlemi tamamlandı!") 
\ No newline at end of file
+        df.loc[maske, 'Duygu_Polaritesi'] = 0
+        df.loc[maske, 'Duygu_Etiketi'] = "Hata"
+
+
+    if sonuc_dosyasi:
+        try:
+            sonuc_dosyasi = write_table(df, sonuc_dosyasi, excel_path)
+            print(f"\n Duygu analizi sonuçları '{sonuc_dosyasi}' dosyasına kaydedildi.")
+        except Exception as e:
+            print(f"Excel dosyası oluşturulurken hata oluştu: {str(e)}")
+
+    bir_olan_yorumlar = df[df[kategori_sutunlari].sum(axis=1) > 0]
+    pozitif_sayisi = (bir_olan_yorumlar['Duygu_Etiketi'] == 'Pozitif').sum()
+    negatif_sayisi = (bir_olan_yorumlar['Duygu_Etiketi'] == 'Negatif').sum()
+    notr_sayisi = (bir_olan_yorumlar['Duygu_Etiketi'] == 'Nötr').sum()
+
+    if len(bir_olan_yorumlar):
+        print("\n DUYGU ANALİZİ İSTATİSTİKLERİ")
+        print(f"   Pozitif: {pozitif_sayisi} ({pozitif_sayisi/len(bir_olan_yorumlar)*100:.2f}%)")
+        print(f"   Negatif: {negatif_sayisi} ({negatif_sayisi/len(bir_olan_yorumlar)*100:.2f}%)")
+        print(f"   Nötr: {notr_sayisi} ({notr_sayisi/len(bir_olan_yorumlar)*100:.2f}%)")
+
+    total_time = time.time() - start_time
+    print(f"\n Toplam çalışma süresi: {total_time:.2f} saniye")
+    print("\n Duygu analizi işlemi tamamlandı!") 
+    return df
+
+
+if __name__ == "__main__":
+    run_sentiment()
@@ -0,0 +1,136 @@
+import json
+import os
+
+import numpy as np
+
+
+BACKENDS = ("torch", "int8", "onnx")
+DEFAULT_CACHE_DIR = os.path.join("outputs", "model_cache")
+
+
+def artifact_dir(model_name, cache_dir=DEFAULT_CACHE_DIR):
+    """Model için dışa aktarılan/kuantize edilen dosyaların klasörü"""
+    return os.path.join(cache_dir, model_name.replace("/", "__"))
+
+
+class TorchBackend:
+    """PyTorch modeli (fp32 ya da dinamik int8) ile olasılık hesaplar"""
+
+    tensor_type = "pt"
+
+    def __init__(self, model, device="cpu"):
+        self.model = model
+        self.device = device
+
+    def __call__(self, inputs):
+        import torch
+
+        with torch.inference_mode():
+            logits = self.model(**inputs.to(self.device)).logits
+            return torch.softmax(logits, dim=-1).tolist()
+
+
+class OnnxBackend:
+    """Dışa aktarılmış ONNX grafiğini ONNX Runtime ile çalıştırır"""
+
+    tensor_type = "np"
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def __call__(self, inputs):
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(None, feed)[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probabilities = np.exp(logits)
+        return (probabilities / probabilities.sum(axis=-1, keepdims=True)).tolist()
+
+
+def _load_fp32(model_name):
+    from transformers import AutoModelForSequenceClassification
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    return model
+
+
+def _artifact_is_current(meta_path, meta):
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f) == meta
+
+
+def _write_meta(meta_path, meta):
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def load_int8(model_name, cache_dir=DEFAULT_CACHE_DIR):
+    """Linear katmanları int8'e dinamik kuantize edilmiş modeli yükle; ilk seferde oluşturup önbelleğe yaz"""
+    import torch
+
+    folder = artifact_dir(model_name, cache_dir)
+    path = os.path.join(folder, "model_int8.pt")
+    meta_path = os.path.join(folder, "model_int8.json")
+    meta = {"model": model_name, "torch": torch.__version__}
+    if os.path.exists(path) and _artifact_is_current(meta_path, meta):
+        model = torch.load(path, weights_only=False)
+        model.eval()
+        return model
+
+    print("⚙️ Model int8'e kuantize ediliyor (bir kerelik)...")
+    model = torch.quantization.quantize_dynamic(_load_fp32(model_name), {torch.nn.Linear}, dtype=torch.qint8)
+    os.makedirs(folder, exist_ok=True)
+    torch.save(model, path)
+    _write_meta(meta_path, meta)
+    print(f"💾 Kuantize model kaydedildi: {path}")
+    return model
+
+
+def export_onnx(model_name, tokenizer, cache_dir=DEFAULT_CACHE_DIR):
+    """Modeli dinamik batch/uzunluk eksenleriyle ONNX'e aktar; önbellekte güncel dosya varsa yolunu döndür"""
+    import torch
+
+    folder = artifact_dir(model_name, cache_dir)
+    path = os.path.join(folder, "model.onnx")
+    meta_path = os.path.join(folder, "model_onnx.json")
+    meta = {"model": model_name, "opset": 14}
+    if os.path.exists(path) and _artifact_is_current(meta_path, meta):
+        return path
+
+    print("⚙️ Model ONNX biçimine aktarılıyor (bir kerelik)...")
+    model = _load_fp32(model_name)
+    dummy = tokenizer(["örnek bir yorum", "ikinci örnek"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+    os.makedirs(folder, exist_ok=True)
+    torch.onnx.export(model, tuple(dummy[name] for name in input_names), path,
+                      input_names=input_names, output_names=["logits"],
+                      dynamic_axes=dynamic_axes, opset_version=meta["opset"])
+    _write_meta(meta_path, meta)
+    print(f"💾 ONNX modeli kaydedildi: {path}")
+    return path
+
+
+def load_backend(name, model_name, tokenizer, cache_dir=DEFAULT_CACHE_DIR, num_threads=None, device="cpu"):
+    """İsme göre çıkarım arka ucunu oluştur: 'torch' (fp32), 'int8' veya 'onnx'"""
+    if name == "torch":
+        return TorchBackend(_load_fp32(model_name).to(device), device)
+    if name == "int8":
+        return TorchBackend(load_int8(model_name, cache_dir))
+    if name == "onnx":
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("ONNX arka ucu için 'onnxruntime' paketi gerekli (pip install onnxruntime)")
+        return OnnxBackend(export_onnx(model_name, tokenizer, cache_dir), num_threads)
+    raise ValueError(f"Bilinmeyen arka uç: {name} ({', '.join(BACKENDS)})")
@@ -0,0 +1,269 @@
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis.sentiment_backends import DEFAULT_CACHE_DIR, load_backend
+
+
+REDUCERS = ("mean", "max_negative", "last_weighted")
+
+
+def scores_to_sentiment(scores):
+    """[negatif, pozitif] olasılıklarını (etiket, polarite) çiftine çevir"""
+    sentiment = "Pozitif" if scores[1] > scores[0] else "Negatif"
+    return sentiment, scores[1] - scores[0]
+
+
+def polarity_to_sentiment(polarity):
+    """Önbellekteki polariteden (etiket, polarite) çiftini geri üret"""
+    return ("Pozitif" if polarity > 0 else "Negatif"), polarity
+
+
+def sliding_windows(ids, size, overlap):
+    """Token dizisini en fazla ``size`` uzunluklu, ``overlap`` token örtüşen pencerelere böl"""
+    if len(ids) <= size:
+        return [ids]
+    step = max(1, size - overlap)
+    windows = []
+    for start in range(0, len(ids), step):
+        windows.append(ids[start:start + size])
+        if start + size >= len(ids):
+            break
+    return windows
+
+
+def reduce_window_scores(window_scores, reducer="mean"):
+    """Bir yorumun pencere olasılıklarını tek [negatif, pozitif] listesine indir.
+
+    'mean' pencerelerin ortalamasını, 'max_negative' en olumsuz pencereyi, 'last_weighted'
+    sona doğru doğrusal artan ağırlıklı ortalamayı (sonuç çoğunlukla yorumun sonundadır) alır.
+    """
+    if len(window_scores) == 1:
+        return list(window_scores[0])
+    if reducer == "max_negative":
+        return list(max(window_scores, key=lambda scores: scores[0]))
+    if reducer == "mean":
+        weights = [1.0] * len(window_scores)
+    elif reducer == "last_weighted":
+        weights = [float(position + 1) for position in range(len(window_scores))]
+    else:
+        raise ValueError(f"Bilinmeyen birleştirici: {reducer} ({', '.join(REDUCERS)})")
+    total = sum(weights)
+    return [sum(weight * scores[label] for weight, scores in zip(weights, window_scores)) / total
+            for label in range(len(window_scores[0]))]
+
+
+class SentimentEngine:
+    """BERT duygu modelini toplu (batch) çalıştıran çıkarım motoru.
+
+    Yorumlar token uzunluğuna göre sıralanıp ``batch_size``'lık kovalara ayrılır; her
+    kova yalnızca kendi en uzun yorumuna kadar doldurulur (dinamik padding). Sonuçlar
+    yorumların orijinal sırasına geri yerleştirilir. ``backend`` 'torch' (fp32), 'int8'
+    (dinamik kuantizasyon) ya da 'onnx' (ONNX Runtime) olabilir; int8/onnx dosyaları
+    ilk kullanımda ``cache_dir`` altına bir kez üretilir.
+
+    ``chunk_reducer`` None ise ``max_length``'i aşan yorumlar kesilir. 'mean', 'max_negative'
+    ya da 'last_weighted' verilirse uzun yorumlar ``window_overlap`` token örtüşen pencerelere
+    bölünür; pencereler kısa yorumlarla aynı kovalarda puanlanıp bu yöntemle birleştirilir.
+    """
+
+    def __init__(self, model_name, batch_size=32, max_length=512, num_threads=None, device="cpu",
+                 backend="torch", cache_dir=DEFAULT_CACHE_DIR, chunk_reducer=None, window_overlap=64):
+        if chunk_reducer is not None and chunk_reducer not in REDUCERS:
+            raise ValueError(f"Bilinmeyen birleştirici: {chunk_reducer} ({', '.join(REDUCERS)})")
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.device = device
+        self.backend_name = backend
+        self.cache_dir = cache_dir
+        self.chunk_reducer = chunk_reducer
+        self.window_overlap = window_overlap
+        self.tokenizer = None
+        self.backend = None
+        self.model = None
+        self.last_stats = {}
+
+    def load(self):
+        """Tokenizer ve seçilen arka ucu bir kez yükle"""
+        if self.backend is None:
+            # Ağır kütüphaneler yalnızca model gerçekten yüklenirken içe aktarılır
+            import torch
+            from transformers import AutoTokenizer
+
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            print(f"BERT modeli yükleniyor ({self.backend_name})...")
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.backend = load_backend(self.backend_name, self.model_name, self.tokenizer,
+                                        self.cache_dir, self.num_threads, self.device)
+            self.model = getattr(self.backend, "model", None)
+            print("✅ BERT modeli yüklendi!")
+        return self
+
+    def _encode(self, texts):
+        """Metinleri tokenize et; (sütun sözlüğü, her girdinin ait olduğu metin sırası) döndür"""
+        if self.chunk_reducer is None:
+            encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+            return encodings, list(range(len(texts)))
+
+        size = self.max_length - self.tokenizer.num_special_tokens_to_add()
+        token_ids = self.tokenizer(texts, add_special_tokens=False, truncation=False)["input_ids"]
+        encodings, owners = {}, []
+        for owner, ids in enumerate(token_ids):
+            for window in sliding_windows(ids, size, self.window_overlap):
+                for key, values in self.tokenizer.prepare_for_model(window).items():
+                    encodings.setdefault(key, []).append(values)
+                owners.append(owner)
+        return encodings, owners
+
+    def _batches(self, encodings):
+        """Token uzunluğuna göre sıralı indeks kovaları üret"""
+        order = sorted(range(len(encodings["input_ids"])), key=lambda i: len(encodings["input_ids"][i]))
+        for start in range(0, len(order), self.batch_size):
+            yield order[start:start + self.batch_size]
+
+    def predict_scores(self, texts, progress=None):
+        """Her metin için [negatif, pozitif] olasılıklarını orijinal sırada döndür; metin olmayanlar None"""
+        self.load()
+        valid = [i for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+        results = [None] * len(texts)
+        if not valid:
+            self.last_stats = {'yorum': 0, 'sure': 0.0, 'yorum_per_sn': 0.0, 'pencere': 0}
+            return results
+
+        start_time = time.perf_counter()
+        encodings, owners = self._encode([texts[i] for i in valid])
+        window_scores = [[] for _ in valid]
+        remaining = [0] * len(valid)
+        for owner in owners:
+            remaining[owner] += 1
+        done = 0
+        for batch in self._batches(encodings):
+            features = {key: [values[i] for i in batch] for key, values in encodings.items()}
+            inputs = self.tokenizer.pad(features, return_tensors=self.backend.tensor_type)
+            for item, scores in zip(batch, self.backend(inputs)):
+                owner = owners[item]
+                window_scores[owner].append((item, scores))
+                remaining[owner] -= 1
+                if remaining[owner] == 0:
+                    # Pencereler metindeki sıralarına göre birleştirilir
+                    ordered = [scores for _, scores in sorted(window_scores[owner], key=lambda pair: pair[0])]
+                    results[valid[owner]] = reduce_window_scores(ordered, self.chunk_reducer or "mean")
+                    done += 1
+            if progress is not None:
+                progress(done, len(valid))
+
+        elapsed = time.perf_counter() - start_time
+        self.last_stats = {
+            'yorum': len(valid),
+            'sure': elapsed,
+            'yorum_per_sn': len(valid) / elapsed if elapsed else 0.0,
+            'pencere': len(owners),
+        }
+        return results
+
+    def predict(self, texts, progress=None):
+        """Her metin için (etiket, polarite) döndür; analiz edilemeyenler ('Nötr', 0.0)"""
+        return [("Nötr", 0.0) if scores is None else scores_to_sentiment(scores)
+                for scores in self.predict_scores(texts, progress)]
+
+
+def available_cores():
+    """Bu sürecin çalışabileceği CPU çekirdeklerini döndür"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def split_cores(cores, workers):
+    """Çekirdekleri işçiler arasında ardışık, örtüşmeyen gruplara böl"""
+    workers = max(1, min(workers, len(cores)))
+    size, extra = divmod(len(cores), workers)
+    groups, start = [], 0
+    for worker in range(workers):
+        end = start + size + (1 if worker < extra else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+
+def _score_shard(model_name, batch_size, max_length, backend, cache_dir, chunk_reducer, window_overlap, cores, texts):
+    """İşçi süreç: kendi çekirdeklerine bağlan, modeli bir kez yükle ve parçayı puanla"""
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    engine = SentimentEngine(model_name, batch_size=batch_size, max_length=max_length,
+                             num_threads=max(1, len(cores)), backend=backend, cache_dir=cache_dir,
+                             chunk_reducer=chunk_reducer, window_overlap=window_overlap)
+    return engine.predict_scores(texts), engine.last_stats
+
+
+def predict_scores_sharded(texts, model_name, workers, batch_size=32, max_length=512, backend="torch",
+                           cache_dir=DEFAULT_CACHE_DIR, chunk_reducer=None, window_overlap=64):
+    """Metinleri ``workers`` sürece bölerek puanla; sonuçlar orijinal sırada döner.
+
+    Yorumlar karakter uzunluğuna göre sıralanıp işçilere sırayla dağıtılır, böylece her
+    parçanın yükü benzer olur. Her işçi ayrı bir çekirdek grubuna bağlanır ve modeli bir
+    kez yükler. (sonuçlar, istatistikler) döndürür.
+    """
+    if backend != "torch":
+        # Dışa aktarma/kuantizasyon işçilerde yarışmasın diye dosyayı önceden üret
+        SentimentEngine(model_name, backend=backend, cache_dir=cache_dir).load()
+    groups = split_cores(available_cores(), workers)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]) if isinstance(texts[i], str) else 0)
+    shards = [order[worker::len(groups)] for worker in range(len(groups))]
+
+    start_time = time.perf_counter()
+    results = [None] * len(texts)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(groups), mp_context=context) as executor:
+        futures = [executor.submit(_score_shard, model_name, batch_size, max_length, backend, cache_dir,
+                                   chunk_reducer, window_overlap, cores, [texts[i] for i in shard])
+                   for cores, shard in zip(groups, shards)]
+        shard_stats = []
+        for shard, future in zip(shards, futures):
+            scores, stats = future.result()
+            for index, score in zip(shard, scores):
+                results[index] = score
+            shard_stats.append(stats)
+
+    elapsed = time.perf_counter() - start_time
+    scored = sum(stats['yorum'] for stats in shard_stats)
+    return results, {
+        'yorum': scored,
+        'sure': elapsed,
+        'yorum_per_sn': scored / elapsed if elapsed else 0.0,
+        'pencere': sum(stats['pencere'] for stats in shard_stats),
+        'isci': len(groups),
+    }
+
+
+def parity_check(texts, model_name, backend, sample_size=200, seed=42, batch_size=32, cache_dir=DEFAULT_CACHE_DIR,
+                 chunk_reducer=None, window_overlap=64):
+    """Arka ucun etiket ve polaritesini fp32 PyTorch modeliyle rastgele bir örneklemde karşılaştır"""
+    candidates = [text for text in texts if isinstance(text, str) and text.strip()]
+    sample = random.Random(seed).sample(candidates, min(sample_size, len(candidates)))
+
+    reference_engine = SentimentEngine(model_name, batch_size=batch_size, backend="torch",
+                                       chunk_reducer=chunk_reducer, window_overlap=window_overlap)
+    reference = reference_engine.predict(sample)
+    candidate_engine = SentimentEngine(model_name, batch_size=batch_size, backend=backend, cache_dir=cache_dir,
+                                       chunk_reducer=chunk_reducer, window_overlap=window_overlap)
+    candidate = candidate_engine.predict(sample)
+
+    differences = [abs(ref[1] - cand[1]) for ref, cand in zip(reference, candidate)]
+    agreement = sum(ref[0] == cand[0] for ref, cand in zip(reference, candidate))
+    reference_speed = reference_engine.last_stats.get('yorum_per_sn', 0.0)
+    candidate_speed = candidate_engine.last_stats.get('yorum_per_sn', 0.0)
+    return {
+        'ornek': len(sample),
+        'etiket_uyum': agreement / len(sample) if sample else None,
+        'polarite_ort_fark': sum(differences) / len(differences) if differences else None,
+        'polarite_max_fark': max(differences) if differences else None,
+        'fp32_yorum_per_sn': reference_speed,
+        'aday_yorum_per_sn': candidate_speed,
+        'hizlanma': candidate_speed / reference_speed if reference_speed else None,
+    }
@@ -0,0 +1,159 @@
+"""Tokenizer ve modeli bellekte tutan yerel duygu analizi servisi.
+
+Başlatma:
+    python analysis/sentiment_server.py --port 8765 --backend int8
+
+İstek (POST /score):  {"texts": ["yorum 1", "yorum 2"]}
+Cevap:                {"results": [{"etiket": "Pozitif", "polarite": 0.93}, null], "sure": 0.04}
+Durum (GET /health):  {"model": ..., "backend": ..., "birlestirici": ..., "ortusme": ..., "istek": ..., "yorum": ...}
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.sentiment_engine import REDUCERS, SentimentEngine, scores_to_sentiment
+
+
+DEFAULT_PORT = 8765
+MAX_TEXTS_PER_REQUEST = 4096
+
+
+class SentimentServer(ThreadingHTTPServer):
+    """Tek bir yüklü SentimentEngine'i istekler arasında paylaşan HTTP sunucusu"""
+
+    daemon_threads = True
+
+    def __init__(self, engine, host="127.0.0.1", port=DEFAULT_PORT):
+        super().__init__((host, port), SentimentRequestHandler)
+        self.engine = engine.load()
+        self.lock = threading.Lock()
+        self.request_total = 0
+        self.text_total = 0
+
+    def score(self, texts):
+        """Metinleri puanla; model aynı anda tek istekte çalışır"""
+        with self.lock:
+            scores = self.engine.predict_scores(texts)
+            self.request_total += 1
+            self.text_total += len(texts)
+        return [None if score is None else dict(zip(("etiket", "polarite"), scores_to_sentiment(score)))
+                for score in scores]
+
+
+class SentimentRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"hata": "bulunamadı"})
+            return
+        engine = self.server.engine
+        self._send_json(200, {"model": engine.model_name, "backend": engine.backend_name,
+                              "birlestirici": engine.chunk_reducer, "ortusme": engine.window_overlap,
+                              "istek": self.server.request_total, "yorum": self.server.text_total})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"hata": "bulunamadı"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = body["texts"]
+            if not isinstance(texts, list) or len(texts) > MAX_TEXTS_PER_REQUEST:
+                raise ValueError(f"'texts' en fazla {MAX_TEXTS_PER_REQUEST} elemanlı bir liste olmalı")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"hata": str(e)})
+            return
+
+        start_time = time.perf_counter()
+        try:
+            results = self.server.score(texts)
+        except Exception as e:
+            self._send_json(500, {"hata": str(e)})
+            return
+        self._send_json(200, {"results": results, "sure": time.perf_counter() - start_time})
+
+
+class SentimentClient:
+    """Çalışan duygu servisine toplu istek gönderen istemci"""
+
+    def __init__(self, url=f"http://127.0.0.1:{DEFAULT_PORT}", batch_size=MAX_TEXTS_PER_REQUEST, timeout=600):
+        self.url = url.rstrip("/")
+        self.batch_size = max(1, min(batch_size, MAX_TEXTS_PER_REQUEST))
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.last_stats = {}
+        self.health = {}
+
+    def is_alive(self):
+        try:
+            response = self.session.get(f"{self.url}/health", timeout=2)
+        except requests.RequestException:
+            return False
+        if response.ok:
+            self.health = response.json()
+        return response.ok
+
+    def predict(self, texts):
+        """Her metin için (etiket, polarite) döndür; analiz edilemeyenler None"""
+        start_time = time.perf_counter()
+        results = []
+        for start in range(0, len(texts), self.batch_size):
+            chunk = [text if isinstance(text, str) else None for text in texts[start:start + self.batch_size]]
+            response = self.session.post(f"{self.url}/score", json={"texts": chunk}, timeout=self.timeout)
+            response.raise_for_status()
+            results.extend(None if item is None else (item["etiket"], item["polarite"])
+                           for item in response.json()["results"])
+        elapsed = time.perf_counter() - start_time
+        scored = sum(result is not None for result in results)
+        self.last_stats = {'yorum': scored, 'sure': elapsed, 'yorum_per_sn': scored / elapsed if elapsed else 0.0}
+        return results
+
+
+def main():
+    from analysis import bert_sentiment_tr
+
+    parser = argparse.ArgumentParser(description="Yerel BERT duygu analizi servisi")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", default=bert_sentiment_tr.backend, choices=("torch", "int8", "onnx"))
+    parser.add_argument("--batch-size", type=int, default=bert_sentiment_tr.batch_size)
+    parser.add_argument("--threads", type=int, default=bert_sentiment_tr.num_threads)
+    parser.add_argument("--reducer", default=bert_sentiment_tr.chunk_reducer, choices=REDUCERS,
+                        help="Uzun yorumları pencerelere bölüp bu yöntemle birleştir (verilmezse kesilir)")
+    parser.add_argument("--overlap", type=int, default=bert_sentiment_tr.window_overlap)
+    args = parser.parse_args()
+
+    engine = SentimentEngine(bert_sentiment_tr.model_name, batch_size=args.batch_size,
+                             num_threads=args.threads, backend=args.backend,
+                             chunk_reducer=args.reducer, window_overlap=args.overlap)
+    server = SentimentServer(engine, args.host, args.port)
+    print(f"🚀 Duygu servisi hazır: http://{args.host}:{args.port} ({args.backend})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServis kapatılıyor...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,25 @@
 import pandas as pd
 import csv
 import os
+import sys
 
-def filtrele_yorumlar():
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.table_io import read_table, write_table
+
+def filtrele_yorumlar(dosya_yolu="birlesik_yorumlar.csv", cikti_dosyasi=os.path.join("outputs", "filtrelenmis_yorumlar.parquet"),
+                      min_kelime=5, df=None):
     """
-    Yorumların kelime sayısı 5'ten küçük olanları filtreleyen fonksiyon
+    Yorumların kelime sayısı min_kelime'den küçük olanları filtreleyen fonksiyon.
+    Girdi/çıktı biçimi uzantıdan anlaşılır (CSV, Parquet, Arrow, Excel).
+    df verilirse dosya okunmaz; cikti_dosyasi None ise dosyaya yazılmaz. Filtrelenmiş DataFrame'i döndürür.
     """
     try:
        
-        # Define relative paths for input and output
-        # Assumes 'birlesik_yorumlar.csv' is in the project's root directory
-        dosya_yolu = "birlesik_yorumlar.csv"
-        
-        # Create an 'outputs' directory if it doesn't exist
-        output_dir = "outputs"
-        os.makedirs(output_dir, exist_ok=True)
-        cikti_dosyasi = os.path.join(output_dir, "filtrelenmis_yorumlar.csv")
-        
-        df = pd.read_csv(dosya_yolu)
+        # Default input assumes 'birlesik_yorumlar.csv' is in the project's root directory
+        if df is None:
+            df = read_table(dosya_yolu)
         
         
         yorum_sutunu = 'Yorum'
@@ -26,29 +28,34 @@ def filtrele_yorumlar():
             print(f"UYARI: '{yorum_sutunu}' adlı sütun bulunamadı.")
             print(f"Mevcut sütunlar: {df.columns.tolist()}")
             print("Lütfen kod içerisindeki 'yorum_sutunu' değişkenini CSV dosyanızdaki doğru sütun adıyla değiştirin.")
-            return
+            return None
         
         
         orijinal_satir_sayisi = len(df)
         
        
         df_filtrelenmis = df[df[yorum_sutunu].apply(lambda x: 
-                              len(str(x).split()) >= 5 if pd.notnull(x) else False)]
+                              len(str(x).split()) >= min_kelime if pd.notnull(x) else False)]
         
         
         filtrelenmis_satir_sayisi = len(df_filtrelenmis)
         
         
-        df_filtrelenmis.to_csv(cikti_dosyasi, index=False)
+        if cikti_dosyasi:
+            cikti_dosyasi = write_table(df_filtrelenmis, cikti_dosyasi)
         
         print(f"İşlem tamamlandı!")
         print(f"Orijinal satır sayısı: {orijinal_satir_sayisi}")
         print(f"Filtrelenmiş satır sayısı: {filtrelenmis_satir_sayisi}")
         print(f"Çıkarılan satır sayısı: {orijinal_satir_sayisi - filtrelenmis_satir_sayisi}")
-        print(f"Filtrelenmiş veriler '{cikti_dosyasi}' dosyasına kaydedildi.")
+        if cikti_dosyasi:
+            print(f"Filtrelenmiş veriler '{cikti_dosyasi}' dosyasına kaydedildi.")
+        
+        return df_filtrelenmis
         
     except Exception as e:
         print(f"Hata oluştu: {e}")
+        return None
 
 
 if __name__ == "__main__":
@@ -1,6 +1,12 @@
 import pandas as pd
 import os
 import glob
+import sys
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.table_io import read_table, write_table, is_table_file
 
 
 # Path to the folder containing the labeled Excel files from the LLM step
@@ -26,59 +32,59 @@ dosya_isimleri = [
 ]
 
 
-excel_dosyalari = []
-for dosya_ismi in dosya_isimleri:
-  
-    dosya_yolu = glob.glob(os.path.join(klasor_yolu, f"{dosya_ismi}*.xlsx"))
-    if dosya_yolu:
-        excel_dosyalari.append(dosya_yolu[0])
-    else:
-        print(f"Uyarı: '{dosya_ismi}' isimli Excel dosyası bulunamadı.")
+def birlestir(klasor_yolu=klasor_yolu, output_path=os.path.join("outputs", "birlesik_veri.parquet"), dosya_isimleri=dosya_isimleri,
+              excel_path=None):
+    """Kategori dosyalarını (Excel/Parquet/Arrow) tek tabloda birleştir; output_path None ise dosyaya yazılmaz"""
+    excel_dosyalari = []
+    for dosya_ismi in dosya_isimleri:
+      
+        dosya_yolu = sorted(f for f in glob.glob(os.path.join(klasor_yolu, f"{dosya_ismi}*")) if is_table_file(f))
+        if dosya_yolu:
+            excel_dosyalari.append((dosya_ismi, dosya_yolu[0]))
+        else:
+            print(f"Uyarı: '{dosya_ismi}' isimli Excel dosyası bulunamadı.")
 
 
-tum_veriler = []
+    tum_veriler = []
 
 
-for i, dosya in enumerate(excel_dosyalari):
-    try:
-        df = pd.read_excel(dosya)
-        
-        
-        kategori_ismi = dosya_isimleri[i]
-        df['Kaynak'] = kategori_ismi
-        
-       
-        if 'Tarih' not in df.columns or 'Yorum' not in df.columns:
-           
-            print(f"Uyarı: {dosya} dosyasında beklenen sütunlar bulunamadı.")
-            print(f"Mevcut sütunlar: {df.columns.tolist()}")
-            continue
+    for kategori_ismi, dosya in excel_dosyalari:
+        try:
+            df = read_table(dosya)
             
-        print(f"{dosya} başarıyla okundu. Satır sayısı: {len(df)}")
-        tum_veriler.append(df)
-    except Exception as e:
-        print(f"Hata: {dosya} dosyası okunamadı. Hata: {e}")
+            
+            df['Kaynak'] = kategori_ismi
+            
+           
+            if 'Tarih' not in df.columns or 'Yorum' not in df.columns:
+               
+                print(f"Uyarı: {dosya} dosyasında beklenen sütunlar bulunamadı.")
+                print(f"Mevcut sütunlar: {df.columns.tolist()}")
+                continue
+                
+            print(f"{dosya} başarıyla okundu. Satır sayısı: {len(df)}")
+            tum_veriler.append(df)
+        except Exception as e:
+            print(f"Hata: {dosya} dosyası okunamadı. Hata: {e}")
 
 
-if tum_veriler:
+    if not tum_veriler:
+        print("Birleştirilecek veri bulunamadı.")
+        return None
+
     birlesik_veri = pd.concat(tum_veriler, ignore_index=True)
     
     
     for kategori in dosya_isimleri:
-        birlesik_veri[kategori] = 0
-    
-   
-    for index, row in birlesik_veri.iterrows():
-        kaynak = row['Kaynak']
-        if kaynak in dosya_isimleri:
-            birlesik_veri.at[index, kaynak] = 1
+        birlesik_veri[kategori] = (birlesik_veri['Kaynak'] == kategori).astype(int)
    
-    output_dir = "outputs"
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "birlesik_veri.xlsx")
-    birlesik_veri.to_excel(output_path, index=False)
+    if output_path:
+        write_table(birlesik_veri, output_path, excel_path)
     
     print(f"Birleştirme tamamlandı. Toplam satır sayısı: {len(birlesik_veri)}")
     print(f"Sütunlar: {birlesik_veri.columns.tolist()}")
-else:
-    print("Birleştirilecek veri bulunamadı.")
\ No newline at end of file
+    return birlesik_veri
+
+
+if __name__ == "__main__":
+    birlestir()
@@ -0,0 +1,184 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = feather = pq = None
+
+
+# Aşamalar arası ara dosyalar için varsayılan biçim
+DEFAULT_SUFFIX = ".parquet"
+
+COLUMNAR_SUFFIXES = (".parquet", ".arrow", ".feather")
+EXCEL_SUFFIXES = (".xlsx", ".xls")
+TABLE_SUFFIXES = COLUMNAR_SUFFIXES + EXCEL_SUFFIXES + (".csv",)
+
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def with_suffix(path, suffix=DEFAULT_SUFFIX):
+    """Dosya yolunun uzantısını değiştir"""
+    return os.path.splitext(path)[0] + suffix
+
+
+def is_table_file(file_name, include_csv=False):
+    """Okunabilir bir tablo dosyası mı (kategori klasörlerini listelemek için)"""
+    suffixes = TABLE_SUFFIXES if include_csv else COLUMNAR_SUFFIXES + EXCEL_SUFFIXES
+    return file_name.lower().endswith(suffixes) and not os.path.basename(file_name).startswith("~$")
+
+
+def resolve_table_path(path):
+    """Yol yoksa aynı adlı başka biçimdeki dosyayı bul (ör. eski çalıştırmalardan kalan .xlsx)"""
+    if os.path.exists(path):
+        return path
+    for suffix in TABLE_SUFFIXES:
+        candidate = with_suffix(path, suffix)
+        if os.path.exists(candidate):
+            return candidate
+    return path
+
+
+def read_table(path, columns=None):
+    """Tabloyu uzantısına göre oku; Parquet/Arrow dosyaları bellek eşlemeli okunur"""
+    path = resolve_table_path(path)
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+    if suffix in (".arrow", ".feather"):
+        if feather is None:
+            raise ImportError("Arrow dosyalarını okumak için 'pyarrow' paketi gerekli")
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    if suffix in EXCEL_SUFFIXES:
+        return pd.read_excel(path, usecols=columns)
+    if suffix == ".csv":
+        return pd.read_csv(path, usecols=columns)
+    raise ValueError(f"Desteklenmeyen tablo biçimi: {path}")
+
+
+def iter_table_chunks(path, chunk_size=50_000, columns=None):
+    """Tabloyu en fazla chunk_size satırlık DataFrame parçaları halinde oku.
+
+    Parquet satır gruplarından, Arrow bellek eşlemeli kayıt gruplarından, CSV ise akış
+    olarak okunur; bellekte aynı anda tek parça tutulur. CSV'de tür bilgisi olmadığı için
+    parçalar arasında şema tutarlı kalsın diye sütunlar metin olarak okunur. Excel akış
+    olarak okunamadığı için bir kez okunup parçalara bölünür.
+    """
+    path = resolve_table_path(path)
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in COLUMNAR_SUFFIXES and pa is None:
+        raise ImportError("Parquet/Arrow dosyalarını okumak için 'pyarrow' paketi gerekli")
+
+    if suffix == ".parquet":
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif suffix in (".arrow", ".feather"):
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        for batch in table.to_batches(max_chunksize=chunk_size):
+            yield batch.to_pandas()
+    elif suffix == ".csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size, dtype=str)
+    elif suffix in EXCEL_SUFFIXES:
+        df = pd.read_excel(path, usecols=columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        raise ValueError(f"Desteklenmeyen tablo biçimi: {path}")
+
+
+class TableAppender:
+    """DataFrame parçalarını tek bir Parquet, Arrow ya da CSV dosyasına sırayla ekler.
+
+    Şema ilk parçadan alınır; sonraki parçalar bu şemaya dönüştürülür. ``with`` ile
+    kullanılabilir, ``close()`` yazılan yolu döndürür.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.suffix = os.path.splitext(path)[1].lower()
+        if self.suffix in EXCEL_SUFFIXES:
+            raise ValueError(f"Excel dosyasına parça parça yazılamaz, .parquet veya .csv kullanın: {path}")
+        if self.suffix not in TABLE_SUFFIXES:
+            raise ValueError(f"Desteklenmeyen tablo biçimi: {path}")
+        if self.suffix in COLUMNAR_SUFFIXES and pa is None:
+            raise ImportError("Parquet/Arrow dosyası yazmak için 'pyarrow' paketi gerekli (pip install pyarrow)")
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.schema = None
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df):
+        """Bir parçayı dosyanın sonuna ekle"""
+        if self.suffix == ".csv":
+            df.to_csv(self.path, index=False, mode="w" if self.rows == 0 else "a", header=self.rows == 0)
+        else:
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            if self.writer is None:
+                self.schema = table.schema
+                if self.suffix == ".parquet":
+                    self.writer = pq.ParquetWriter(self.path, self.schema)
+                else:
+                    self.writer = pa.ipc.new_file(self.path, self.schema)
+            self.writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_table(df, path, excel_path=None):
+    """Tabloyu uzantısına göre yaz; excel_path verilirse ayrıca rapor amaçlı Excel kopyası oluşturulur.
+
+    pyarrow kurulu değilse sütunlu biçimler yerine Excel'e yazılır. Yazılan yolu döndürür.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    suffix = os.path.splitext(path)[1].lower()
+
+    if suffix in COLUMNAR_SUFFIXES and feather is None:
+        print("⚠️ 'pyarrow' kurulu değil, tablo Excel olarak yazılıyor (pip install pyarrow)")
+        path, suffix = with_suffix(path, ".xlsx"), ".xlsx"
+
+    if suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif suffix in (".arrow", ".feather"):
+        feather.write_feather(df.reset_index(drop=True), path, compression="uncompressed")
+    elif suffix in EXCEL_SUFFIXES:
+        write_excel(df, path)
+    elif suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"Desteklenmeyen tablo biçimi: {path}")
+
+    if excel_path:
+        write_excel(df, excel_path)
+    return path
+
+
+def write_excel(df, path):
+    """Rapor amaçlı Excel çıktısı; Excel satır sınırını aşan tablolar kırpılır"""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    if len(df) > EXCEL_MAX_ROWS:
+        print(f"⚠️ {len(df)} satır Excel sınırını aşıyor, '{path}' ilk {EXCEL_MAX_ROWS} satırla yazılıyor")
+        df = df.iloc[:EXCEL_MAX_ROWS]
+    df.to_excel(path, index=False)
+    return path
@@ -0,0 +1,167 @@
+"""Eğitim, tahmin ve etiketlemede ortak kullanılan Türkçe metin normalizasyonu.
+
+Python'un ``lower()`` fonksiyonu Türkçe I/İ harflerini yanlış çevirir (I -> i, İ -> i̇).
+Buradaki fonksiyonlar önce I -> ı, İ -> i dönüşümünü yapar, sonra küçük harfe çevirir.
+
+``clean_texts`` sütunu satır satır işlemez: her parça tek bir metinde birleştirilip bir kez
+küçük harfe çevrilir, karakter kodlarına (numpy dizisi) açılır ve silinecek karakterler ile
+fazla boşluklar tek bir vektörel geçişte atılır. Sonuç ``clean_text`` ile birebir aynıdır.
+
+Karşılaştırma (eski satır satır uygulamaya göre):
+    python data/text_normalization.py --rows 200000
+"""
+import argparse
+import random
+import re
+import time
+
+import numpy as np
+
+
+_SEPARATOR = "\x00"
+
+# clean_text: rakamlar ve harf/rakam/boşluk dışındaki karakterler silinir
+_CLEAN_DELETE = re.compile(r'[^\w\s]|\d')
+_WHITESPACE = re.compile(r'\s')
+# turkish_normalize: noktalama, rakam ve alt çizgi boşlukla değiştirilir
+_NON_WORD = re.compile(r'[^\w\s]|\d|_')
+
+# Karakter sınıfları; her kod noktasının sınıfı ilk görüldüğünde regex ile belirlenip saklanır
+_KEEP, _DELETE, _SPACE, _BOUNDARY = 0, 1, 2, 3
+_char_classes = {0: _BOUNDARY}
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def turkish_lower(text):
+    """Türkçe kurallarıyla küçük harfe çevir (I -> ı, İ -> i)"""
+    return text.replace('I', 'ı').replace('İ', 'i').lower()
+
+
+def clean_text(text):
+    """Model girdisi için temizle: Türkçe küçük harf, rakam ve noktalama silinir, tek boşluk"""
+    if not isinstance(text, str):
+        return ""
+    return " ".join(_CLEAN_DELETE.sub('', turkish_lower(text)).split())
+
+
+def _class_table(codes):
+    """Parçada geçen kod noktaları için sınıf tablosu (kod noktası -> sınıf)"""
+    present = np.flatnonzero(np.bincount(codes))
+    table = np.zeros(int(present[-1]) + 1, dtype=np.uint8)
+    for code in present.tolist():
+        char_class = _char_classes.get(code)
+        if char_class is None:
+            char = chr(code)
+            char_class = _DELETE if _CLEAN_DELETE.match(char) else _SPACE if _WHITESPACE.match(char) else _KEEP
+            _char_classes[code] = char_class
+        table[code] = char_class
+    return table
+
+
+def _clean_chunk(texts):
+    blob = turkish_lower(_SEPARATOR.join(texts))
+    codes = np.frombuffer(blob.encode("utf-32-le"), dtype=np.uint32)
+    if not len(codes):
+        return [""] * len(texts)
+    classes = _class_table(codes)[codes]
+
+    keep = classes != _DELETE
+    codes, classes = codes[keep], classes[keep]
+    # Boşluk dizilerinin ilki dışındakiler ve yorum başındaki boşluklar atılır, kalanlar ' ' olur
+    space = classes == _SPACE
+    drop = space & np.concatenate(([True], classes[:-1] != _KEEP))
+    codes = np.where(space, np.uint32(32), codes)[~drop]
+    classes = classes[~drop]
+    # Yorum sonundaki tek boşluk atılır
+    drop = (classes == _SPACE) & np.concatenate((classes[1:] == _BOUNDARY, [True]))
+    return codes[~drop].tobytes().decode("utf-32-le").split(_SEPARATOR)
+
+
+def iter_clean_texts(texts, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Metinleri chunk_size'lık parçalar halinde temizleyip her parçanın listesini üret"""
+    texts = list(texts) if not hasattr(texts, "__getitem__") else texts
+    for start in range(0, len(texts), chunk_size):
+        chunk = [text if isinstance(text, str) else "" for text in texts[start:start + chunk_size]]
+        cleaned = _clean_chunk(chunk)
+        if len(cleaned) != len(chunk):
+            # Metnin içinde ayırıcı karakter (\x00) varsa bu parça satır satır işlenir
+            cleaned = [clean_text(text) for text in chunk]
+        yield cleaned
+
+
+def clean_texts(texts, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Bir sütunu (liste ya da Series) clean_text ile aynı sonucu verecek şekilde toplu temizle"""
+    if hasattr(texts, "tolist"):
+        texts = texts.tolist()
+    cleaned = []
+    for chunk in iter_clean_texts(texts, chunk_size):
+        cleaned.extend(chunk)
+    return cleaned
+
+
+def turkish_normalize(text):
+    """Türkçe küçük harfe çevir, noktalama ve rakamları boşlukla değiştir"""
+    if not isinstance(text, str):
+        return ""
+    return " ".join(_NON_WORD.sub(' ', turkish_lower(text)).split())
+
+
+def normalize_whitespace(text):
+    """Büyük/küçük harfe duyarlı modeller için yalnızca boşlukları normalize et"""
+    return " ".join(str(text).split())
+
+
+def _legacy_clean_text(text):
+    """Karşılaştırma için eski uygulama (satır başına üç re.sub ve str.lower)"""
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = re.sub(r'\d+', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _sample_comments(rows, seed=42):
+    words = ["Siparişim", "İADE", "kargo", "IŞIK", "geç", "geldi!", "ürün", "kırık,", "müşteri", "hizmetleri",
+             "ÇOK", "kötü...", "3", "gün", "sonra", "İstanbul'a", "teslim", "edildi.", "ödeme", "%20", "indirim"]
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(5, 60))) for _ in range(rows)]
+
+
+def benchmark(rows=200_000, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Eski satır satır temizlik ile toplu temizliği karşılaştır; milyon yorum başına süreleri döndür"""
+    import pandas as pd
+
+    series = pd.Series(_sample_comments(rows))
+
+    start_time = time.perf_counter()
+    legacy = series.apply(_legacy_clean_text)
+    legacy_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    cleaned = clean_texts(series, chunk_size)
+    new_time = time.perf_counter() - start_time
+
+    differences = sum(old != new for old, new in zip(legacy, cleaned))
+    return {
+        'yorum': rows,
+        'eski_sn_per_milyon': legacy_time / rows * 1_000_000,
+        'yeni_sn_per_milyon': new_time / rows * 1_000_000,
+        'hizlanma': legacy_time / new_time if new_time else None,
+        'farkli_satir': differences,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Türkçe metin temizliği karşılaştırması")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    sonuc = benchmark(args.rows, args.chunk_size)
+    print(f"📊 {sonuc['yorum']} yorum ile ölçüldü (1 milyon yoruma oranlandı)")
+    print(f"   Eski (Series.apply, 3x re.sub): {sonuc['eski_sn_per_milyon']:.2f} sn / milyon yorum")
+    print(f"   Yeni (toplu, vektörel):         {sonuc['yeni_sn_per_milyon']:.2f} sn / milyon yorum")
+    print(f"   Hızlanma: x{sonuc['hizlanma']:.2f}")
+    print(f"   Farklı sonuç veren satır: {sonuc['farkli_satir']} (Türkçe I/İ düzeltmesinden kaynaklanır)")
@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from data.text_normalization import turkish_normalize
+
+
+class ActiveSampler:
+    """Hedef sayılı etiketlemede sıradaki yorumları pozitif olma olasılığına göre seçer.
+
+    Başlangıçta (iki sınıftan da örnek yokken) yorumlar anahtar kelime puanına ve
+    bulunan pozitiflere TF-IDF benzerliğine göre sıralanır. İki sınıf da görülünce
+    hafif bir çevrimiçi lojistik sınıflandırıcı (SGD) her yeni etikette güncellenir.
+    ``explore_rate`` oranında seçim rastgele yapılır, ``uncertainty_rate`` oranında
+    ise modelin en kararsız olduğu yorumlar seçilir.
+    """
+
+    def __init__(self, texts, candidate_indices, prior_scores=None, max_features=20000,
+                 explore_rate=0.1, uncertainty_rate=0.2, refit_every=20, seed=42):
+        self.random = random.Random(seed)
+        self.explore_rate = explore_rate
+        self.uncertainty_rate = uncertainty_rate
+        self.refit_every = refit_every
+
+        self.candidates = list(candidate_indices)
+        self.position = {index: pos for pos, index in enumerate(self.candidates)}
+        self.available = np.ones(len(self.candidates), dtype=bool)
+
+        self.vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=(1, 2), sublinear_tf=True)
+        self.X = self.vectorizer.fit_transform([turkish_normalize(texts[i]) for i in self.candidates])
+        self.prior = np.zeros(len(self.candidates)) if prior_scores is None else np.asarray(prior_scores, dtype=float)
+        self.scores = self.prior.copy()
+
+        self.classifier = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=seed)
+        self.labeled_positions = []
+        self.labels = []
+        self.positive_sum = None
+        self.positive_count = 0
+        self._since_refit = 0
+
+    def next_batch(self, size):
+        """Henüz seçilmemiş adaylardan ``size`` tanesini seç ve döndür"""
+        open_positions = np.flatnonzero(self.available)
+        if len(open_positions) == 0:
+            return []
+        size = min(size, len(open_positions))
+
+        chosen = []
+        n_explore = sum(1 for _ in range(size) if self.random.random() < self.explore_rate)
+        n_uncertain = int(round((size - n_explore) * self.uncertainty_rate)) if self._has_classifier() else 0
+        n_exploit = size - n_explore - n_uncertain
+
+        scores = self.scores[open_positions]
+        if n_exploit > 0:
+            top = np.argpartition(-scores, min(n_exploit, len(scores) - 1))[:n_exploit]
+            chosen.extend(open_positions[top].tolist())
+        if n_uncertain > 0:
+            remaining = np.setdiff1d(open_positions, chosen, assume_unique=True)
+            margin = np.abs(self.scores[remaining] - 0.5)
+            closest = np.argsort(margin, kind='stable')[:n_uncertain]
+            chosen.extend(remaining[closest].tolist())
+        if len(chosen) < size:
+            remaining = np.setdiff1d(open_positions, chosen, assume_unique=True).tolist()
+            chosen.extend(self.random.sample(remaining, min(size - len(chosen), len(remaining))))
+
+        self.available[chosen] = False
+        return [self.candidates[pos] for pos in chosen]
+
+    def observe(self, index, label):
+        """LLM sonucunu kaydet ve gerekirse sıralamayı güncelle"""
+        pos = self.position.get(index)
+        if pos is None:
+            return
+        self.available[pos] = False
+        self.labeled_positions.append(pos)
+        self.labels.append(int(label))
+        if label == 1:
+            row = self.X[pos]
+            self.positive_sum = row if self.positive_sum is None else self.positive_sum + row
+            self.positive_count += 1
+
+        self._since_refit += 1
+        if self._since_refit >= self.refit_every:
+            self._since_refit = 0
+            self._rescore()
+
+    def _has_classifier(self):
+        return hasattr(self.classifier, 'coef_')
+
+    def _rescore(self):
+        if len(set(self.labels)) == 2:
+            positions = np.asarray(self.labeled_positions[-self.refit_every:])
+            labels = np.asarray(self.labels[-self.refit_every:])
+            if not self._has_classifier():
+                positions = np.asarray(self.labeled_positions)
+                labels = np.asarray(self.labels)
+            self.classifier.partial_fit(self.X[positions], labels, classes=np.array([0, 1]))
+            self.scores = self.classifier.predict_proba(self.X)[:, 1]
+        elif self.positive_count > 0:
+            centroid = self.positive_sum / self.positive_count
+            similarity = np.asarray(self.X @ centroid.T.toarray()).ravel()
+            self.scores = similarity + 0.1 * self.prior
@@ -2,14 +2,25 @@ import pandas as pd
 import time
 import ollama
 import os
+import sys
 from tqdm import tqdm
 import json
 import random
-from functools import lru_cache
 import colorama
 from colorama import Fore, Style
 import datetime
 
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from labeling.ollama_engine import OllamaLabelingEngine, DEFAULT_HOST
+from labeling.label_cache import LabelCache
+from labeling.checkpoint_journal import CheckpointJournal
+from labeling.keyword_prefilter import KeywordPrefilter
+from labeling.active_sampler import ActiveSampler
+from data.table_io import read_table, write_table, DEFAULT_SUFFIX
+from ml.model_bundle import find_category_model
+
 
 colorama.init()
 
@@ -18,7 +29,21 @@ CONFIG = {
     'model_name': "gemma2:9b",
     'max_retries': 3,
     'retry_delay': 1,
-    'cache_size': 1000 
+    'cache_file': os.path.join('kategori_sonuclari', 'etiket_cache.sqlite'),
+    'cache_max_entries': 1_000_000,  # Aşılınca en uzun süre kullanılmayan kararlar silinir
+    'prompt_version': 'v1',          # Prompt metni değişince artırın; eski kararlar yeniden kullanılmaz
+    'checkpoint_compact_every': 10000,  # Bu kadar atlanan yorum satırından sonra checkpoint günlüğü sıkıştırılır
+    'cascade_enabled': False,           # Anahtar kelime/model ön filtresi: açıkça uymayan yorumları LLM'e sormadan 0 say
+    'cascade_model_dirs': ['.', os.path.join('outputs', 'models')],
+    'cascade_model_threshold': 0.3,     # Model olasılığı bunun üstündeyse anahtar kelime olmasa da LLM'e sor
+    'cascade_audit_rate': 0.05,         # Atlanacak yorumların bu oranı isabet ölçümü için yine de LLM'e sorulur
+    'sampler': 'random',                # 'random' veya 'active': hedef modunda sıradaki yorumları pozitif olasılığına göre seç
+    'active_explore_rate': 0.1,         # Aktif örneklemede rastgele seçilen yorum oranı
+    'ollama_host': DEFAULT_HOST,
+    'max_workers': 4,       # Aynı anda Ollama'ya gönderilen en fazla toplu istek
+    'batch_size': 8,        # Tek prompt içinde sorulan yorum sayısı (1 = yorum başına istek)
+    'multi_batch_size': 2,  # Çoklu etiket modunda tek prompt içindeki yorum sayısı
+    'request_timeout': 120
 }
 
 def print_colored(text, color=Fore.WHITE, style=Style.NORMAL, end='\n'):
@@ -35,9 +60,39 @@ def print_subheader(text):
     """Alt başlık yazdır"""
     print_colored(f"\n--- {text} ---", Fore.YELLOW, Style.BRIGHT)
 
-@lru_cache(maxsize=CONFIG['cache_size'])
+_label_cache = None
+
+def get_label_cache():
+    """Kalıcı etiket önbelleğini aç (model değiştiyse eski modelin kararlarını temizle)"""
+    global _label_cache
+    if _label_cache is None or _label_cache.model_name != CONFIG['model_name']:
+        if _label_cache is not None:
+            # Bekleyen erişim zamanları yazılır ve bağlantı kapanır
+            _label_cache.close()
+        _label_cache = LabelCache(
+            CONFIG['cache_file'],
+            model_name=CONFIG['model_name'],
+            prompt_version=CONFIG['prompt_version'],
+            max_entries=CONFIG['cache_max_entries']
+        )
+        removed = _label_cache.invalidate_if_model_changed()
+        if removed:
+            print_colored(f"Model değişti: önbellekten {removed} eski karar silindi.", Fore.YELLOW)
+    return _label_cache
+
+def print_cache_stats():
+    """Önbellek isabet/ıskalama istatistiklerini yazdır"""
+    stats = get_label_cache().stats()
+    print_colored(f"Önbellek: {stats['hits']} isabet, {stats['misses']} ıskalama "
+                  f"(isabet oranı %{stats['hit_rate']*100:.1f}), {stats['entries']} kayıtlı karar", Fore.BLUE)
+
 def analyze_comment_for_category(comment, category, description):
     """Bir yorumu tek bir kategori için analiz et"""
+    cache = get_label_cache()
+    cached = cache.get(comment, category, description)
+    if cached is not None:
+        return int(cached)
+    
     prompt = f"""
     Lütfen aşağıdaki yorumu '{category}' kategorisi için analiz et.
     
@@ -67,6 +122,7 @@ def analyze_comment_for_category(comment, category, description):
             result = 1 if ('1' in response_text or 'evet' in response_text) else 0
             
             print_colored(f"Analiz sonucu: {result}", Fore.GREEN if result == 1 else Fore.RED)
+            cache.put(comment, category, description, result)
             return result
             
         except Exception as e:
@@ -78,6 +134,56 @@ def analyze_comment_for_category(comment, category, description):
     print_colored("Tüm denemeler başarısız oldu! Varsayılan sonuç: 0", Fore.RED, Style.BRIGHT)
     return 0
 
+def get_labeling_engine(batch_size=None):
+    """CONFIG ayarlarıyla toplu/eşzamanlı etiketleme motorunu oluştur"""
+    return OllamaLabelingEngine(
+        model_name=CONFIG['model_name'],
+        host=CONFIG['ollama_host'],
+        max_workers=CONFIG['max_workers'],
+        batch_size=batch_size or CONFIG['batch_size'],
+        max_retries=CONFIG['max_retries'],
+        retry_delay=CONFIG['retry_delay'],
+        timeout=CONFIG['request_timeout'],
+        cache=get_label_cache()
+    )
+
+def build_prefilter(category_name, category_description):
+    """Kategori için anahtar kelime (ve varsa eğitilmiş model) ön filtresini oluştur"""
+    model_path = find_category_model(category_file_name(category_name), CONFIG['cascade_model_dirs'])
+    prefilter = KeywordPrefilter(
+        category_description,
+        model_path=model_path,
+        model_threshold=CONFIG['cascade_model_threshold'],
+        audit_rate=CONFIG['cascade_audit_rate']
+    )
+    model_text = f", model: {model_path}" if prefilter.model is not None else ""
+    print_colored(f"Kaskad ön filtresi aktif: {len(prefilter.keywords)} anahtar kelime{model_text}", Fore.BLUE)
+    return prefilter
+
+def print_cascade_stats(prefilter):
+    """Kaskadın kurtardığı LLM çağrılarını ve LLM ile uyumunu yazdır"""
+    summary = prefilter.stats.summary()
+    format_ratio = lambda value: "-" if value is None else f"%{value*100:.1f}"
+    print_colored(f"Kaskad: {summary['toplam']} yorumdan {summary['kaskad_atlanan']} tanesi LLM'e sorulmadan 0 sayıldı "
+                  f"({format_ratio(summary['kurtarilan_oran'])} çağrı tasarrufu)", Fore.BLUE)
+    print_colored(f"Kaskad-LLM uyumu: {format_ratio(summary['uyum'])}, kesinlik: {format_ratio(summary['kesinlik'])}, "
+                  f"duyarlılık: {format_ratio(summary['duyarlilik'])}, denetim uyumu: {format_ratio(summary['denetim_uyum'])} "
+                  f"({summary['denetim']} denetim)", Fore.BLUE)
+
+def build_active_sampler(category_description, yorumlar, candidate_indices):
+    """Anahtar kelime puanlarını başlangıç sıralaması olarak kullanan aktif örnekleyiciyi oluştur"""
+    keyword_filter = KeywordPrefilter(category_description, audit_rate=0.0)
+    prior_scores = [keyword_filter.keyword_hits(yorumlar[i]) if isinstance(yorumlar[i], str) else 0
+                    for i in candidate_indices]
+    print_colored(f"Aktif örnekleme: {len(candidate_indices)} aday, "
+                  f"{sum(1 for score in prior_scores if score > 0)} tanesinde anahtar kelime var", Fore.BLUE)
+    return ActiveSampler(
+        [text if isinstance(text, str) else "" for text in yorumlar],
+        candidate_indices,
+        prior_scores=prior_scores,
+        explore_rate=CONFIG['active_explore_rate']
+    )
+
 def print_category_progress(category, count, target, type_label=""):
     """Kategori ilerleme durumunu yazdır"""
     percentage = (count / target * 100) if target > 0 else 0
@@ -95,10 +201,10 @@ def print_category_progress(category, count, target, type_label=""):
 def save_category_results(category, results, output_file):
     """Bir kategori için sonuçları kaydet"""
     df = pd.DataFrame(results)
-    df.to_csv(output_file, index=False)
+    write_table(df, output_file)
     print_colored(f"Sonuçlar {output_file} dosyasına kaydedildi.", Fore.GREEN, Style.BRIGHT)
 
-def process_category(category_name, category_description, target_positive, target_negative, df, file_type="all"):
+def process_category(category_name, category_description, target_positive, target_negative, df, file_type="all", use_cascade=None, sampler=None):
     """Belirtilen kategori için yorumları analiz et"""
     print_header(f"KATEGORİ: {category_name}")
     print_colored(f"Açıklama: {category_description}", Fore.CYAN)
@@ -117,49 +223,44 @@ def process_category(category_name, category_description, target_positive, targe
     os.makedirs(CONFIG['output_folder'], exist_ok=True)
     
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-    output_file = os.path.join(CONFIG['output_folder'], f"{safe_category_name}_{timestamp}.csv")
+    output_file = os.path.join(CONFIG['output_folder'], f"{safe_category_name}_{timestamp}{DEFAULT_SUFFIX}")
     
    
-    checkpoint_file = os.path.join(CONFIG['output_folder'], f"{safe_category_name}_checkpoint.json")
+    checkpoint_file = os.path.join(CONFIG['output_folder'], f"{safe_category_name}_checkpoint.jsonl")
+    legacy_checkpoint_file = os.path.join(CONFIG['output_folder'], f"{safe_category_name}_checkpoint.json")
     
-    processed_indices = []
-    if os.path.exists(checkpoint_file):
-        try:
-            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+    journal = CheckpointJournal(checkpoint_file, {
+        'category': category_name,
+        'target_positive': target_positive,
+        'target_negative': target_negative
+    }, compact_every=CONFIG['checkpoint_compact_every'])
+    
+    try:
+        resumed = journal.load()
+        if not resumed and os.path.exists(legacy_checkpoint_file) and not os.path.exists(checkpoint_file):
+            with open(legacy_checkpoint_file, 'r', encoding='utf-8') as f:
                 checkpoint = json.load(f)
-            
             if checkpoint['target_positive'] == target_positive and checkpoint['target_negative'] == target_negative and checkpoint['category'] == category_name:
-                results = checkpoint['results']
-                count_positive = checkpoint['count_positive']
-                count_negative = checkpoint['count_negative']
-                processed_indices = checkpoint.get('processed_indices', [])
-                
-                print_colored(f"Checkpoint yüklendi. Şimdiye kadar {count_positive}/{target_positive} adet pozitif eşleşme ve {count_negative}/{target_negative} adet negatif eşleşme bulundu.", Fore.GREEN)
-                print_colored(f"{len(processed_indices)} yorum işlendi.", Fore.BLUE)
-                
-                
-                remaining_indices = [i for i in range(len(df)) if i not in processed_indices]
-            else:
-                
-                results = []
-                count_positive = 0
-                count_negative = 0
-                processed_indices = []
-                remaining_indices = list(range(len(df)))
-        except Exception as e:
-            print_colored(f"Checkpoint yükleme hatası: {str(e)}. Yeniden başlanıyor.", Fore.RED)
-            results = []
-            count_positive = 0
-            count_negative = 0
-            processed_indices = []
-            remaining_indices = list(range(len(df)))
-    else:
+                journal.import_state(checkpoint['results'], checkpoint.get('processed_indices', []))
+                resumed = True
+    except Exception as e:
+        print_colored(f"Checkpoint yükleme hatası: {str(e)}. Yeniden başlanıyor.", Fore.RED)
+        resumed = False
+    
+    if resumed:
+        results = journal.results
+        count_positive = sum(1 for r in results if r.get('Sonuç') == 1)
+        count_negative = len(results) - count_positive
         
-        results = []
+        print_colored(f"Checkpoint yüklendi. Şimdiye kadar {count_positive}/{target_positive} adet pozitif eşleşme ve {count_negative}/{target_negative} adet negatif eşleşme bulundu.", Fore.GREEN)
+        print_colored(f"{len(journal.processed)} yorum işlendi.", Fore.BLUE)
+    else:
+        journal.start()
+        results = journal.results
         count_positive = 0
         count_negative = 0
-        processed_indices = []
-        remaining_indices = list(range(len(df)))
+    
+    remaining_indices = journal.processed.remaining(len(df))
     
     
     if file_type == "all":
@@ -180,6 +281,29 @@ def process_category(category_name, category_description, target_positive, targe
     start_time = time.time()
     total_target = target_positive + target_negative if file_type != "all_comments" else len(remaining_indices)
     
+    engine = get_labeling_engine()
+    use_cascade = CONFIG['cascade_enabled'] if use_cascade is None else use_cascade
+    prefilter = build_prefilter(category_name, category_description) if use_cascade else None
+    kaskad_kararlari = {}
+    yorumlar = df['Yorum'].tolist() if 'Yorum' in df.columns else [''] * len(df)
+    tarihler = df['Tarih'].tolist() if 'Tarih' in df.columns else ['Tarih Yok'] * len(df)
+    
+    sampler = CONFIG['sampler'] if sampler is None else sampler
+    active_sampler = None
+    aday_kaynagi = remaining_indices
+    if sampler == 'active' and file_type == "all" and remaining_indices:
+        active_sampler = build_active_sampler(category_description, yorumlar, remaining_indices)
+        
+        def aktif_adaylar():
+            """Örnekleyiciden sıradaki grubu iste; öncekilerin sonuçları geldikçe sıralama güncellenir"""
+            while True:
+                batch = active_sampler.next_batch(CONFIG['batch_size'])
+                if not batch:
+                    return
+                yield from batch
+        
+        aday_kaynagi = aktif_adaylar()
+    
     with tqdm(total=total_target, 
               desc=f"{category_name} İşleniyor", 
               colour="green") as pbar:
@@ -187,43 +311,53 @@ def process_category(category_name, category_description, target_positive, targe
         if file_type != "all_comments":
             pbar.update(count_positive + count_negative) 
         
-        for i in remaining_indices:
+        def gecerli_yorumlar():
+            """Boş yorumları işlenmiş say, kalanları motora sırayla ver"""
+            for i in aday_kaynagi:
+                if file_type != "all_comments" and count_positive >= target_positive and count_negative >= target_negative:
+                    return
+                comment = yorumlar[i]
+                if not isinstance(comment, str) or len(comment.strip()) == 0:
+                    journal.mark_processed(i)
+                    if file_type == "all_comments":
+                        pbar.update(1)
+                    continue
+                if prefilter is not None:
+                    decision, likely_positive = prefilter.decide(comment)
+                    kaskad_kararlari[i] = (decision, likely_positive)
+                    if decision == 'skip':
+                        yield i, comment, 0
+                        continue
+                yield i, comment
+        
+        for i, comment, result in engine.stream(gecerli_yorumlar(), category_name, category_description):
            
             if count_positive >= target_positive and count_negative >= target_negative and file_type != "all_comments":
                 print_colored(f"\n{category_name} için hedefler tamamlandı! ({target_positive} pozitif, {target_negative} negatif eşleşme bulundu)", Fore.GREEN, Style.BRIGHT)
                 break
-                
-            row = df.iloc[i]
-            date = row.get('Tarih', 'Tarih Yok')
-            comment = row.get('Yorum', '')
             
-            if not isinstance(comment, str) or len(comment.strip()) == 0:
-                processed_indices.append(i)
-                if file_type == "all_comments":
-                    pbar.update(1)
-                continue
+            etiketleyen = 'llm'
+            if prefilter is not None:
+                decision, likely_positive = kaskad_kararlari.pop(i)
+                if decision == 'skip':
+                    prefilter.stats.record_skip()
+                    etiketleyen = 'kaskad'
+                else:
+                    prefilter.stats.record_llm(likely_positive, result, audit=decision == 'audit')
+            if active_sampler is not None and etiketleyen == 'llm':
+                active_sampler.observe(i, result)
+                
+            date = tarihler[i]
             
            
-            if count_positive >= target_positive and count_negative < target_negative and file_type != "all_comments":
-               
-                result = analyze_comment_for_category(comment, category_name, category_description)
-                if result == 1:
-                   
-                    processed_indices.append(i)
-                    continue
+            if count_positive >= target_positive and count_negative < target_negative and file_type != "all_comments" and result == 1:
+                journal.mark_processed(i)
+                continue
             
           
-            if count_negative >= target_negative and count_positive < target_positive and file_type != "all_comments":
-                
-                result = analyze_comment_for_category(comment, category_name, category_description)
-                if result == 0:
-                    
-                    processed_indices.append(i)
-                    continue
-            
-            
-            if 'result' not in locals():
-                result = analyze_comment_for_category(comment, category_name, category_description)
+            if count_negative >= target_negative and count_positive < target_positive and file_type != "all_comments" and result == 0:
+                journal.mark_processed(i)
+                continue
             
            
             result_dict = {
@@ -231,10 +365,9 @@ def process_category(category_name, category_description, target_positive, targe
                 'Yorum': comment,
                 'Sonuç': result
             }
-            results.append(result_dict)
-            
-            
-            processed_indices.append(i)
+            if prefilter is not None:
+                result_dict['Etiketleyen'] = etiketleyen
+            journal.append_result(i, result_dict)
             
            
             if result == 1:
@@ -259,10 +392,6 @@ def process_category(category_name, category_description, target_positive, targe
                     print_colored(f"Yorum: {comment[:150]}..." if len(comment) > 150 else f"Yorum: {comment}", Fore.CYAN)
                     print_colored("-" * 50, Fore.YELLOW)
             
-           
-            if 'result' in locals():
-                del result
-            
             if file_type == "all_comments":
                 pbar.update(1)
             
@@ -279,19 +408,6 @@ def process_category(category_name, category_description, target_positive, targe
                 else:
                     remaining_time = 0
                 
-                checkpoint = {
-                    'category': category_name,
-                    'target_positive': target_positive,
-                    'target_negative': target_negative,
-                    'count_positive': count_positive,
-                    'count_negative': count_negative,
-                    'results': results,
-                    'processed_indices': processed_indices,
-                    'timestamp': datetime.datetime.now().isoformat()
-                }
-                with open(checkpoint_file, 'w', encoding='utf-8') as f:
-                    json.dump(checkpoint, f, ensure_ascii=False)
-                
                 if file_type != "all_comments":
                     print_category_progress(category_name, count_positive, target_positive, "Pozitif")
                     print_category_progress(category_name, count_negative, target_negative, "Negatif")
@@ -303,6 +419,7 @@ def process_category(category_name, category_description, target_positive, targe
                         print_colored(f"Tahmini kalan süre: {int(hours)}:{int(minutes):02d}:{int(seconds):02d}", Fore.BLUE)
     
 
+    journal.close()
     save_category_results(category_name, results, output_file)
 
     elapsed_time = time.time() - start_time
@@ -311,13 +428,91 @@ def process_category(category_name, category_description, target_positive, targe
     
     print_header("İŞLEM TAMAMLANDI")
     print_colored(f"Toplam süre: {int(hours)}:{int(minutes):02d}:{int(seconds):02d}", Fore.BLUE)
-    print_colored(f"İşlenen yorum sayısı: {len(processed_indices)}", Fore.YELLOW)
+    print_colored(f"İşlenen yorum sayısı: {len(journal.processed)}", Fore.YELLOW)
+    print_colored(f"Ollama istek sayısı: {engine.request_count}", Fore.YELLOW)
+    print_cache_stats()
+    if prefilter is not None:
+        print_cascade_stats(prefilter)
     print_colored(f"Bulunan pozitif eşleşme sayısı: {count_positive}/{target_positive}", Fore.GREEN)
     print_colored(f"Bulunan negatif eşleşme sayısı: {count_negative}/{target_negative}", Fore.RED)
     
 
     return (count_positive >= target_positive and count_negative >= target_negative), count_positive, count_negative, output_file
 
+def category_file_name(category):
+    """Kategori adını birleştirme/eğitim betiklerinin beklediği dosya adına çevir (ör. 'Ödeme (Seçenekler)' -> 'Ödeme_Seçenekler')"""
+    return "_".join("".join(c if c.isalnum() else " " for c in category).split())
+
+def process_all_categories(categories, descriptions, df, max_comments=None):
+    """Her yorumu tek LLM çağrısında tüm kategoriler için etiketle ve kategori başına dosya yaz"""
+    print_header(f"ÇOKLU ETİKET: {len(categories)} KATEGORİ")
+    
+    os.makedirs(CONFIG['output_folder'], exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    combined_file = os.path.join(CONFIG['output_folder'], f"coklu_etiket_{timestamp}.csv")
+    checkpoint_file = os.path.join(CONFIG['output_folder'], "coklu_etiket_checkpoint.jsonl")
+    
+    journal = CheckpointJournal(checkpoint_file, {'categories': list(categories)},
+                                compact_every=CONFIG['checkpoint_compact_every'])
+    try:
+        resumed = journal.load()
+    except Exception as e:
+        print_colored(f"Checkpoint yükleme hatası: {str(e)}. Yeniden başlanıyor.", Fore.RED)
+        resumed = False
+    if resumed:
+        print_colored(f"Checkpoint yüklendi. {len(journal.processed)} yorum işlendi.", Fore.GREEN)
+    else:
+        journal.start()
+    results = journal.results
+    
+    limit = len(df) if max_comments is None else min(len(df), max_comments)
+    remaining_indices = journal.processed.remaining(limit)
+    
+    engine = get_labeling_engine(CONFIG['multi_batch_size'])
+    yorumlar = df['Yorum'].tolist() if 'Yorum' in df.columns else [''] * len(df)
+    tarihler = df['Tarih'].tolist() if 'Tarih' in df.columns else ['Tarih Yok'] * len(df)
+    
+    def gecerli_yorumlar():
+        """Boş yorumları işlenmiş say, kalanları motora sırayla ver"""
+        for i in remaining_indices:
+            comment = yorumlar[i]
+            if not isinstance(comment, str) or len(comment.strip()) == 0:
+                journal.mark_processed(i)
+                continue
+            yield i, comment
+    
+    start_time = time.time()
+    with tqdm(total=len(remaining_indices), desc="Çoklu Etiketleme", colour="green") as pbar:
+        for i, comment, vector in engine.stream_multi(gecerli_yorumlar(), categories, descriptions):
+            result_dict = {'Tarih': tarihler[i], 'Yorum': comment}
+            result_dict.update(zip(categories, vector))
+            journal.append_result(i, result_dict)
+            pbar.update(1)
+    journal.close()
+    
+    combined = pd.DataFrame(results, columns=['Tarih', 'Yorum'] + list(categories))
+    combined.to_csv(combined_file, index=False)
+    print_colored(f"Çoklu etiket sonuçları {combined_file} dosyasına kaydedildi.", Fore.GREEN, Style.BRIGHT)
+    
+    output_files = {}
+    for category in categories:
+        category_df = combined[['Tarih', 'Yorum', category]].rename(columns={category: 'Sonuç'})
+        output_file = write_table(category_df, os.path.join(CONFIG['output_folder'], f"{category_file_name(category)}{DEFAULT_SUFFIX}"))
+        output_files[category] = output_file
+        print_colored(f"{category}: {int(category_df['Sonuç'].sum())} pozitif / {len(category_df)} yorum -> {output_file}", Fore.CYAN)
+    
+    elapsed_time = time.time() - start_time
+    hours, remainder = divmod(elapsed_time, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    
+    print_header("İŞLEM TAMAMLANDI")
+    print_colored(f"Toplam süre: {int(hours)}:{int(minutes):02d}:{int(seconds):02d}", Fore.BLUE)
+    print_colored(f"İşlenen yorum sayısı: {len(journal.processed)}", Fore.YELLOW)
+    print_colored(f"Ollama istek sayısı: {engine.request_count} (kategori başına ayrı geçişte ~{len(results) * len(categories)})", Fore.YELLOW)
+    print_cache_stats()
+    
+    return combined, output_files
+
 def get_default_categories_and_descriptions():
     """Referans için öntanımlı kategorileri ve açıklamalarını döndürür"""
     categories = [
@@ -396,16 +591,50 @@ def get_default_categories_and_descriptions():
     }
     return categories, descriptions
 
+def run_labeling(csv_file_path="filtrelenmis_yorumlar.csv", categories=None, multi_label=False,
+                 target_positive=0, target_negative=0, file_type="all", use_cascade=None, sampler=None,
+                 max_comments=None, df=None):
+    """Etiketlemeyi etkileşimsiz çalıştır.
+
+    categories verilmezse tüm öntanımlı kategoriler kullanılır. multi_label=True ise
+    tek geçişte çoklu etiketleme yapılır ve {kategori: DataFrame} döndürülür; aksi halde
+    kategoriler sırayla işlenir ve {kategori: çıktı dosyası} döndürülür.
+    """
+    default_categories, descriptions = get_default_categories_and_descriptions()
+    categories = list(categories or default_categories)
+    unknown = [category for category in categories if category not in descriptions]
+    if unknown:
+        raise ValueError(f"Tanımsız kategori(ler): {', '.join(unknown)}")
+    
+    if df is None:
+        print_colored(f"\nVeri seti yükleniyor: {csv_file_path}", Fore.BLUE)
+        df = read_table(csv_file_path)
+        print_colored(f"Veri seti yüklendi. Toplam {len(df)} yorum var.", Fore.GREEN)
+    
+    if multi_label:
+        combined, _ = process_all_categories(categories, descriptions, df, max_comments)
+        return {category: combined[['Tarih', 'Yorum', category]].rename(columns={category: 'Sonuç'})
+                for category in categories}
+    
+    output_files = {}
+    for category in categories:
+        _, _, _, output_file = process_category(
+            category, descriptions[category], target_positive, target_negative,
+            df, file_type, use_cascade, sampler
+        )
+        output_files[category] = output_file
+    return output_files
+
 def main():
     print_header("Tek Kategori Analiz Programı", 60)
     print_colored("\nVeri setini seçin:", Fore.YELLOW)
-    print_colored("1. filtrelenmis_yorumlar.csv (varsayılan)", Fore.CYAN)
-    print_colored("2. Başka bir CSV dosyası", Fore.CYAN)
+    print_colored("1. filtrelenmis_yorumlar (varsayılan; .csv/.parquet)", Fore.CYAN)
+    print_colored("2. Başka bir veri dosyası (CSV/Parquet/Arrow/Excel)", Fore.CYAN)
     
     choice = input("Seçiminiz (1/2): ").strip()
     
     if choice == "2":
-        csv_file_path = input("CSV dosya yolunu girin: ").strip()
+        csv_file_path = input("Veri dosyası yolunu girin: ").strip()
     else:
         csv_file_path = "filtrelenmis_yorumlar.csv"
     
@@ -419,10 +648,27 @@ def main():
     print_colored("\nİşlem türünü seçin:", Fore.YELLOW)
     print_colored("1. Önceden tanımlı kategorilerden birini seç", Fore.CYAN)
     print_colored("2. Özel kategori tanımla", Fore.CYAN)
+    print_colored("3. Tüm kategorileri tek geçişte etiketle (çoklu etiket, ~16 kat daha az LLM çağrısı)", Fore.CYAN)
     
-    category_choice = input("Seçiminiz (1/2): ").strip()
+    category_choice = input("Seçiminiz (1/2/3): ").strip()
     
-    if category_choice == "1":
+    if category_choice == "3":
+        limit_text = input("\nKaç yorum etiketlensin? (boş = tümü): ").strip()
+        max_comments = int(limit_text) if limit_text else None
+        try:
+            print_colored(f"\nVeri seti yükleniyor: {csv_file_path}", Fore.BLUE)
+            df = read_table(csv_file_path)
+            print_colored(f"Veri seti yüklendi. Toplam {len(df)} yorum var.", Fore.GREEN)
+        except Exception as e:
+            print_colored(f"CSV yükleme hatası: {str(e)}", Fore.RED, Style.BRIGHT)
+            return
+        
+        _, output_files = process_all_categories(categories, descriptions, df, max_comments)
+        print_header("SONUÇ RAPORU")
+        print_colored(f"{len(output_files)} kategori dosyası '{CONFIG['output_folder']}' klasörüne kaydedildi.", Fore.GREEN, Style.BRIGHT)
+        print_colored(f"\nProgram tamamlandı. Teşekkürler!", Fore.GREEN, Style.BRIGHT)
+        return
+    elif category_choice == "1":
        
         cat_index = int(input("\nKategori numarası seçin (1-16): ")) - 1
         if 0 <= cat_index < len(categories):
@@ -457,15 +703,21 @@ def main():
         target_positive = int(input("\nBu kategori için kaç tane pozitif eşleşme (1) bulmak istiyorsunuz?: "))
         target_negative = int(input("Bu kategori için kaç tane negatif eşleşme (0) bulmak istiyorsunuz?: "))
         file_type = "all"  
+        sampler_choice = input("Örnekleme yöntemi - 1. Rastgele (varsayılan) 2. Aktif (olası pozitifler önce): ").strip()
+        sampler = 'active' if sampler_choice == "2" else 'random'
     else:
         target_positive = 0  
         target_negative = 0
         file_type = "all_comments"  
+        sampler = 'random'
+    
     
+    cascade_choice = input("\nLLM öncesi anahtar kelime ön filtresi (kaskad) kullanılsın mı? (E/H): ").strip().lower()
+    use_cascade = cascade_choice == 'e'
     
     try:
         print_colored(f"\nVeri seti yükleniyor: {csv_file_path}", Fore.BLUE)
-        df = pd.read_csv(csv_file_path)
+        df = read_table(csv_file_path)
         print_colored(f"Veri seti yüklendi. Toplam {len(df)} yorum var.", Fore.GREEN)
     except Exception as e:
         print_colored(f"CSV yükleme hatası: {str(e)}", Fore.RED, Style.BRIGHT)
@@ -478,7 +730,9 @@ def main():
         target_positive,
         target_negative,
         df,
-        file_type
+        file_type,
+        use_cascade,
+        sampler
     )
     
 
@@ -0,0 +1,176 @@
+import base64
+import json
+import os
+import zlib
+
+
+class ProcessedSet:
+    """Satır başına bir bayt tutan işlenmiş-indeks kümesi; ekleme ve sorgu O(1)"""
+
+    def __init__(self, size=0):
+        self.flags = bytearray(size)
+        self.count = 0
+
+    def _grow(self, index):
+        if index >= len(self.flags):
+            self.flags.extend(bytes(index + 1 - len(self.flags)))
+
+    def add(self, index):
+        self._grow(index)
+        if not self.flags[index]:
+            self.flags[index] = 1
+            self.count += 1
+
+    def __contains__(self, index):
+        return index < len(self.flags) and self.flags[index] == 1
+
+    def __len__(self):
+        return self.count
+
+    def remaining(self, size):
+        """0..size-1 arasında henüz işlenmemiş indeksleri döndür"""
+        flags = self.flags[:size]
+        return [i for i, flag in enumerate(flags) if not flag] + list(range(len(flags), size))
+
+    def encode(self):
+        return base64.b64encode(zlib.compress(bytes(self.flags))).decode('ascii')
+
+    @classmethod
+    def decode(cls, data):
+        processed = cls()
+        processed.flags = bytearray(zlib.decompress(base64.b64decode(data)))
+        processed.count = processed.flags.count(1)
+        return processed
+
+
+class CheckpointJournal:
+    """Yalnızca ekleme yapılan JSONL checkpoint günlüğü.
+
+    Her sonuç ve atlanan indeks tek satır olarak eklenir, böylece kayıt maliyeti
+    ilerlemeden bağımsızdır. Atlanan indeks satırları ``compact_every`` sayısını
+    geçince günlük; başlık, sıkıştırılmış işlenmiş-indeks haritası ve sonuçlardan
+    oluşan tek bir anlık görüntüye yeniden yazılır.
+    """
+
+    def __init__(self, path, header, compact_every=10000):
+        self.path = path
+        self.header = dict(header)
+        self.compact_every = compact_every
+        self.results = []
+        self.processed = ProcessedSet()
+        self._skips_since_compact = 0
+        self._file = None
+
+    def load(self):
+        """Başlık eşleşirse önceki sonuçları ve işlenmiş indeksleri yükle; eşleşmezse boş başla"""
+        self.results = []
+        self.processed = ProcessedSet()
+        if not os.path.exists(self.path):
+            return False
+
+        torn = False
+        with open(self.path, 'rb') as f:
+            first = f.readline()
+            if not first:
+                return False
+            record = json.loads(first)
+            stored = {k: v for k, v in record.items() if k != 't'}
+            if record.get('t') != 'header' or stored != self.header:
+                return False
+
+            # Son tam satırın bittiği bayt; yarım kalan kuyruk buradan kesilir
+            complete_end = len(first)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    torn = True
+                    break
+                line = raw.strip()
+                if line:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        torn = True
+                        break
+                    kind = record.get('t')
+                    if kind == 'r':
+                        self.results.append(record['d'])
+                        if record['i'] is not None:
+                            self.processed.add(record['i'])
+                    elif kind == 'p':
+                        self.processed.add(record['i'])
+                        self._skips_since_compact += 1
+                    elif kind == 'map':
+                        self.processed = ProcessedSet.decode(record['data'])
+                complete_end += len(raw)
+
+        if torn:
+            # Çökme sırasında yarım kalmış satır silinir; yoksa devam eden kayıtlar ona eklenip okunamaz olur
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete_end)
+        return True
+
+    def import_state(self, results, processed_indices):
+        """Eski JSON checkpoint içeriğini günlüğe aktar"""
+        self.results = list(results)
+        self.processed = ProcessedSet()
+        for index in processed_indices:
+            self.processed.add(index)
+        self.compact()
+
+    def _open(self):
+        if self._file is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if new_file:
+                self._write({'t': 'header', **self.header})
+        return self._file
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def start(self):
+        """Günlüğü sıfırdan başlat (eşleşmeyen eski günlüğün üzerine yazar)"""
+        self.close()
+        self.results = []
+        self.processed = ProcessedSet()
+        self._skips_since_compact = 0
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'t': 'header', **self.header}, ensure_ascii=False) + "\n")
+
+    def append_result(self, index, result):
+        self._open()
+        self.results.append(result)
+        self.processed.add(index)
+        self._write({'t': 'r', 'i': index, 'd': result})
+
+    def mark_processed(self, index):
+        self._open()
+        self.processed.add(index)
+        self._write({'t': 'p', 'i': index})
+        self._skips_since_compact += 1
+        if self._skips_since_compact >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Günlüğü başlık + işlenmiş haritası + sonuçlar olarak atomik biçimde yeniden yaz"""
+        self.close()
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'t': 'header', **self.header}, ensure_ascii=False) + "\n")
+            f.write(json.dumps({'t': 'map', 'data': self.processed.encode()}) + "\n")
+            for result in self.results:
+                f.write(json.dumps({'t': 'r', 'i': None, 'd': result}, ensure_ascii=False, default=str) + "\n")
+        os.replace(tmp_path, self.path)
+        self._skips_since_compact = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,142 @@
+import random
+import re
+
+from data.text_normalization import clean_text, turkish_normalize
+from ml.model_bundle import load_model
+
+
+_VERB_SUFFIX = re.compile(r'(mek|mak)$')
+
+
+def extract_keywords(description):
+    """Kategori açıklamasındaki 'Anahtar Kelimeler:' listesini döndür"""
+    match = re.search(r'Anahtar Kelimeler\s*:(.*)', description, re.S)
+    if not match:
+        return []
+    return [keyword.strip() for keyword in match.group(1).split(',') if keyword.strip()]
+
+
+def build_keyword_pattern(keywords, min_prefix=4):
+    """Anahtar kelimelerden tek bir derlenmiş regex oluştur.
+
+    Türkçe ekleri yakalamak için kelimeler önek olarak eşleşir ('teslimat' -> 'teslimatım');
+    fiillerde '-mek/-mak' atılır ('silmek' -> 'sil'). ``min_prefix`` karakterden kısa
+    kökler yanlış eşleşmeleri önlemek için tam kelime olarak aranır ('ev', 'gün').
+    """
+    alternatives = set()
+    for keyword in keywords:
+        words = turkish_normalize(keyword).split()
+        if not words:
+            continue
+        stem = _VERB_SUFFIX.sub('', words[-1]) if len(words[-1]) > 5 else words[-1]
+        words = words[:-1] + [stem]
+        phrase = r'\s+'.join(re.escape(word) for word in words)
+        alternatives.add(phrase if len(stem) >= min_prefix else phrase + r'\b')
+    if not alternatives:
+        return None
+    ordered = sorted(alternatives, key=len, reverse=True)
+    return re.compile(r'\b(?:' + '|'.join(ordered) + ')')
+
+
+class CascadeStats:
+    """Kaskadın kaç LLM çağrısı kurtardığını ve LLM ile ne kadar uyuştuğunu tutar"""
+
+    def __init__(self):
+        self.skipped = 0
+        self.sent = 0
+        self.audited = 0
+        self.audit_agree = 0
+        self.true_positive = 0
+        self.false_positive = 0
+        self.false_negative = 0
+        self.true_negative = 0
+
+    def record_llm(self, likely_positive, llm_result, audit=False):
+        self.sent += 1
+        if audit:
+            self.audited += 1
+            self.audit_agree += int(llm_result == 0)
+        if likely_positive and llm_result == 1:
+            self.true_positive += 1
+        elif likely_positive:
+            self.false_positive += 1
+        elif llm_result == 1:
+            self.false_negative += 1
+        else:
+            self.true_negative += 1
+
+    def record_skip(self):
+        self.skipped += 1
+
+    def summary(self):
+        total = self.skipped + self.sent
+        decided = self.true_positive + self.false_positive + self.false_negative + self.true_negative
+        predicted_positive = self.true_positive + self.false_positive
+        actual_positive = self.true_positive + self.false_negative
+        return {
+            'toplam': total,
+            'llm_gonderilen': self.sent,
+            'kaskad_atlanan': self.skipped,
+            'kurtarilan_oran': self.skipped / total if total else 0.0,
+            'denetim': self.audited,
+            'denetim_uyum': self.audit_agree / self.audited if self.audited else None,
+            'uyum': (self.true_positive + self.true_negative) / decided if decided else None,
+            'kesinlik': self.true_positive / predicted_positive if predicted_positive else None,
+            'duyarlilik': self.true_positive / actual_positive if actual_positive else None,
+        }
+
+
+class KeywordPrefilter:
+    """LLM'den önce yorumları anahtar kelime (ve varsa eğitilmiş model) ile puanlayan ucuz aşama.
+
+    Anahtar kelime eşleşmesi olmayan ve modelin düşük olasılık verdiği yorumlar
+    LLM'e gönderilmeden 0 olarak etiketlenir; ``audit_rate`` oranında bir kısmı
+    kaskadın isabetini ölçmek için yine de LLM'e sorulur.
+    """
+
+    def __init__(self, description, model_path=None, model_threshold=0.3, audit_rate=0.05, seed=42):
+        self.keywords = extract_keywords(description)
+        self.pattern = build_keyword_pattern(self.keywords)
+        self.model_threshold = model_threshold
+        self.audit_rate = audit_rate
+        self.random = random.Random(seed)
+        self.stats = CascadeStats()
+        self.model = None
+        self.vectorizer = None
+        if model_path:
+            self._load_model(model_path)
+
+    def _load_model(self, model_path):
+        try:
+            self.model, self.vectorizer = load_model(model_path)
+        except Exception as e:
+            print(f"⚠️ Kaskad modeli yüklenemedi ({model_path}): {str(e)}. Sadece anahtar kelimeler kullanılacak.")
+            self.model, self.vectorizer = None, None
+
+    def keyword_hits(self, comment):
+        if self.pattern is None:
+            return 0
+        return len(self.pattern.findall(turkish_normalize(comment)))
+
+    def model_probability(self, comment):
+        if self.model is None or self.vectorizer is None:
+            return None
+        try:
+            # Modeller clean_text ile temizlenmiş yorumlarla eğitildi
+            X = self.vectorizer.transform([clean_text(comment)])
+            return float(self.model.predict_proba(X)[0][1])
+        except Exception:
+            return None
+
+    def decide(self, comment):
+        """('llm' | 'audit' | 'skip', muhtemelen_pozitif) döndür"""
+        hits = self.keyword_hits(comment)
+        probability = self.model_probability(comment)
+        likely_positive = hits > 0 or (probability is not None and probability >= self.model_threshold)
+        if self.pattern is None and probability is None:
+            return 'llm', likely_positive
+        if likely_positive:
+            return 'llm', True
+        if self.random.random() < self.audit_rate:
+            return 'audit', False
+        return 'skip', False
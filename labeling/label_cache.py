@@ -0,0 +1,196 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from data.text_normalization import turkish_lower
+
+
+def normalize_comment(comment):
+    """Önbellek anahtarı için yorumu normalize et (Türkçe küçük harf, tek boşluk)"""
+    return " ".join(turkish_lower(str(comment)).split())
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LabelCache:
+    """LLM etiket kararlarını SQLite içinde kalıcı olarak saklayan içerik adresli önbellek.
+
+    Anahtar: (normalize yorum özeti, kategori, açıklama özeti, model adı, prompt sürümü).
+    Girdi sayısı ``max_entries`` değerini aşınca en uzun süre kullanılmayanlar silinir.
+    ``normalize`` yorumun anahtara girmeden önceki normalizasyonunu belirler. Okumalar veritabanına
+    yazmaz: erişim zamanları bellekte biriktirilir ve bir sonraki yazmada, ``access_flush_every``
+    erişimde bir, ``stats`` ya da ``close`` çağrısında tek işlemde kaydedilir.
+    """
+
+    def __init__(self, path, model_name, prompt_version="v1", max_entries=1_000_000, evict_every=1000,
+                 normalize=normalize_comment, access_flush_every=1000):
+        self.path = path
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.normalize = normalize
+        self.access_flush_every = access_flush_every
+        self._pending_access = {}
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_evict = 0
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, value TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_labels_access ON labels(last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_labels_model ON labels(model)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def make_key(self, comment, category, description):
+        parts = [
+            _sha256(self.normalize(comment)),
+            category,
+            _sha256(" ".join(str(description).split())),
+            self.model_name,
+            self.prompt_version,
+        ]
+        return _sha256("\x1f".join(parts))
+
+    def get(self, comment, category, description):
+        """Önbellekteki kararı döndür, yoksa None"""
+        key = self.make_key(comment, category, description)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM labels WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch([key])
+            return row[0]
+
+    def _touch(self, keys):
+        """Erişim zamanlarını biriktir; sınır aşılınca tek işlemde yaz (kilit altında çağrılır)"""
+        now = time.time()
+        for key in keys:
+            self._pending_access[key] = now
+        if len(self._pending_access) >= self.access_flush_every:
+            self._flush_access()
+            self._conn.commit()
+
+    def _flush_access(self):
+        """Biriken erişim zamanlarını açık işleme ekle (kilit altında, commit çağıranda)"""
+        if self._pending_access:
+            self._conn.executemany("UPDATE labels SET last_access = ? WHERE key = ?",
+                                   [(now, key) for key, now in self._pending_access.items()])
+            self._pending_access.clear()
+
+    def put(self, comment, category, description, value):
+        """Kararı kaydet, gerekirse boyut sınırına göre eski girdileri sil"""
+        key = self.make_key(comment, category, description)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO labels (key, model, value, last_access) VALUES (?, ?, ?, ?)",
+                (key, self.model_name, str(value), time.time())
+            )
+            self._flush_access()
+            self._conn.commit()
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.evict_every:
+                self._puts_since_evict = 0
+                self._evict()
+
+    def get_many(self, comments, category, description):
+        """Birden çok yorumun kararlarını tek işlemde döndür (bulunmayanlar None)"""
+        keys = [self.make_key(comment, category, description) for comment in comments]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, value FROM labels WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+            self._touch(found)
+            hits = sum(key in found for key in keys)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return [found.get(key) for key in keys]
+
+    def put_many(self, comments, category, description, values):
+        """Birden çok kararı tek işlemde kaydet"""
+        now = time.time()
+        rows = [(self.make_key(comment, category, description), self.model_name, str(value), now)
+                for comment, value in zip(comments, values)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO labels (key, model, value, last_access) VALUES (?, ?, ?, ?)", rows
+            )
+            self._flush_access()
+            self._conn.commit()
+            self._puts_since_evict += len(rows)
+            if self._puts_since_evict >= self.evict_every:
+                self._puts_since_evict = 0
+                self._evict()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM labels WHERE key IN (SELECT key FROM labels ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._conn.commit()
+
+    def invalidate_model(self, model_name=None):
+        """Verilen modelin (varsayılan: mevcut model dışındaki tüm modellerin) girdilerini sil"""
+        with self._lock:
+            if model_name is None:
+                cursor = self._conn.execute("DELETE FROM labels WHERE model != ?", (self.model_name,))
+            else:
+                cursor = self._conn.execute("DELETE FROM labels WHERE model = ?", (model_name,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def invalidate_if_model_changed(self):
+        """Son kullanılan model değiştiyse eski modelin girdilerini sil; silinen girdi sayısını döndür"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'model_name'").fetchone()
+        removed = 0
+        if row is not None and row[0] != self.model_name:
+            removed = self.invalidate_model()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('model_name', ?)", (self.model_name,))
+            self._conn.commit()
+        return removed
+
+    def stats(self):
+        with self._lock:
+            if self._pending_access:
+                self._flush_access()
+                self._conn.commit()
+            entries = self._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
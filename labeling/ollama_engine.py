@@ -0,0 +1,301 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+
+DEFAULT_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+
+
+def build_batch_prompt(comments, category, description):
+    """Birden fazla yorumu tek istekte soran, JSON cevap bekleyen prompt oluştur"""
+    numbered = "\n".join(f'{idx}. "{comment}"' for idx, comment in enumerate(comments, 1))
+    return f"""
+    Lütfen aşağıdaki {len(comments)} yorumu '{category}' kategorisi için ayrı ayrı analiz et.
+
+    YORUMLAR:
+    {numbered}
+
+    Her yorum için '{category}' kategorisine uyuyorsa 1 (evet), uymuyorsa 0 (hayır) ver.
+    Cevabı SADECE şu JSON formatında ver, yorum sırasını koru:
+    {{"sonuclar": [{{"id": 1, "sonuc": 0}}, {{"id": 2, "sonuc": 1}}]}}
+
+    KATEGORİ AÇIKLAMASI:
+    {description}
+    """
+
+
+def build_multi_prompt(comments, categories, descriptions):
+    """Yorumları tek istekte tüm kategoriler için soran, JSON cevap bekleyen prompt oluştur"""
+    numbered = "\n".join(f'{idx}. "{comment}"' for idx, comment in enumerate(comments, 1))
+    category_lines = "\n".join(f"- {category}: {' '.join(descriptions[category].split())}" for category in categories)
+    example = ", ".join(f'"{category}": 0' for category in categories[:2])
+    return f"""
+    Lütfen aşağıdaki {len(comments)} yorumu verilen {len(categories)} kategorinin HER BİRİ için ayrı ayrı analiz et.
+
+    YORUMLAR:
+    {numbered}
+
+    KATEGORİLER VE AÇIKLAMALARI:
+{category_lines}
+
+    Her yorum ve her kategori için yorum kategoriye uyuyorsa 1 (evet), uymuyorsa 0 (hayır) ver.
+    Kategori adlarını aynen kullan. Cevabı SADECE şu JSON formatında ver, yorum sırasını koru:
+    {{"yorumlar": [{{"id": 1, "etiketler": {{{example}, ...}}}}]}}
+    """
+
+
+def _to_label(value):
+    """JSON/metin cevabındaki tek bir değeri 0/1 etikete çevir"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return 1 if value >= 1 else 0
+    text = str(value).strip().lower()
+    return 1 if ('1' in text or 'evet' in text) else 0
+
+
+def parse_batch_response(response_text, expected_count):
+    """Toplu cevabı ayrıştır; sayı tutmazsa None döndür"""
+    try:
+        data = json.loads(response_text)
+    except (TypeError, ValueError):
+        return None
+
+    if isinstance(data, dict):
+        data = data.get('sonuclar', data.get('results'))
+    if not isinstance(data, list) or len(data) != expected_count:
+        return None
+
+    labels = [None] * expected_count
+    for position, item in enumerate(data):
+        if isinstance(item, dict):
+            idx = item.get('id', position + 1)
+            value = item.get('sonuc', item.get('result'))
+            try:
+                idx = int(idx) - 1
+            except (TypeError, ValueError):
+                return None
+            if not 0 <= idx < expected_count or value is None:
+                return None
+            labels[idx] = _to_label(value)
+        else:
+            labels[position] = _to_label(item)
+
+    if any(label is None for label in labels):
+        return None
+    return labels
+
+
+def parse_multi_response(response_text, expected_count, categories):
+    """Çoklu etiket cevabını kategori sırasında 0/1 vektörlerine ayrıştır; tutarsızsa None döndür"""
+    try:
+        data = json.loads(response_text)
+    except (TypeError, ValueError):
+        return None
+
+    if isinstance(data, dict):
+        data = data.get('yorumlar', data.get('results'))
+    if not isinstance(data, list) or len(data) != expected_count:
+        return None
+
+    vectors = [None] * expected_count
+    for position, item in enumerate(data):
+        if not isinstance(item, dict):
+            return None
+        try:
+            idx = int(item.get('id', position + 1)) - 1
+        except (TypeError, ValueError):
+            return None
+        labels = item.get('etiketler', item.get('labels'))
+        if not 0 <= idx < expected_count:
+            return None
+        if isinstance(labels, list) and len(labels) == len(categories):
+            vectors[idx] = [_to_label(value) for value in labels]
+        elif isinstance(labels, dict):
+            vectors[idx] = [_to_label(labels.get(category, 0)) for category in categories]
+        else:
+            return None
+
+    if any(vector is None for vector in vectors):
+        return None
+    return vectors
+
+
+class OllamaLabelingEngine:
+    """Ollama HTTP API üzerinden sınırlı sayıda eşzamanlı, toplu etiketleme istekleri yürütür"""
+
+    def __init__(self, model_name, host=DEFAULT_HOST, max_workers=4, batch_size=8,
+                 max_retries=3, retry_delay=1, timeout=120, temperature=0.1, cache=None):
+        self.model_name = model_name
+        self.host = host.rstrip('/')
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.temperature = temperature
+        self.cache = cache
+        self.session = requests.Session()
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    def chat(self, prompt, json_format=True):
+        """Tek bir /api/chat isteği gönder ve cevap metnini döndür"""
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": False,
+            "options": {"temperature": self.temperature},
+        }
+        if json_format:
+            payload["format"] = "json"
+
+        last_error = None
+        for attempt in range(self.max_retries):
+            try:
+                response = self.session.post(f"{self.host}/api/chat", json=payload, timeout=self.timeout)
+                response.raise_for_status()
+                with self._lock:
+                    self.request_count += 1
+                return response.json()['message']['content']
+            except Exception as e:
+                last_error = e
+                if attempt < self.max_retries - 1:
+                    time.sleep(self.retry_delay)
+        raise RuntimeError(f"Ollama isteği {self.max_retries} denemede başarısız oldu: {last_error}")
+
+    def _cached(self, comments, category, description, ask_fn, encode, decode):
+        """Önbellekte olanları oradan al, kalanları ask_fn ile sor; başarısız cevaplar önbelleğe yazılmaz"""
+        answers = [None] * len(comments)
+        if self.cache is not None:
+            for k, value in enumerate(self.cache.get_many(comments, category, description)):
+                if value is not None:
+                    answers[k] = decode(value)
+        missing = [k for k, answer in enumerate(answers) if answer is None]
+        if missing:
+            fresh = ask_fn([comments[k] for k in missing])
+            for k, answer in zip(missing, fresh):
+                answers[k] = answer
+            answered = [k for k in missing if answers[k] is not None]
+            if answered and self.cache is not None:
+                self.cache.put_many([comments[k] for k in answered], category, description,
+                                    [encode(answers[k]) for k in answered])
+        return answers
+
+    def _ask_batch(self, comments, category, description):
+        """Bir grup yorumu tek prompt ile etiketle, ayrıştırılamazsa yorum yorum tekrar sor"""
+        if len(comments) > 1:
+            try:
+                labels = parse_batch_response(self.chat(build_batch_prompt(comments, category, description)), len(comments))
+            except RuntimeError:
+                labels = None
+            if labels is not None:
+                return labels
+
+        labels = []
+        for comment in comments:
+            try:
+                parsed = parse_batch_response(self.chat(build_batch_prompt([comment], category, description)), 1)
+                labels.append(parsed[0] if parsed is not None else None)
+            except RuntimeError:
+                labels.append(None)
+        return labels
+
+    def label_batch(self, comments, category, description):
+        """Bir grup yorumu etiketle (önbellek + toplu istek); cevap alınamayanlar 0 sayılır"""
+        labels = self._cached(comments, category, description,
+                              lambda missing: self._ask_batch(missing, category, description),
+                              encode=str, decode=int)
+        return [0 if label is None else label for label in labels]
+
+    def _ask_multi_batch(self, comments, categories, descriptions):
+        """Bir grup yorumu tek prompt ile tüm kategoriler için etiketle (yorum başına etiket vektörü)"""
+        if len(comments) > 1:
+            try:
+                vectors = parse_multi_response(self.chat(build_multi_prompt(comments, categories, descriptions)),
+                                               len(comments), categories)
+            except RuntimeError:
+                vectors = None
+            if vectors is not None:
+                return vectors
+
+        vectors = []
+        for comment in comments:
+            try:
+                parsed = parse_multi_response(self.chat(build_multi_prompt([comment], categories, descriptions)),
+                                              1, categories)
+                vectors.append(parsed[0] if parsed is not None else None)
+            except RuntimeError:
+                vectors.append(None)
+        return vectors
+
+    def label_multi_batch(self, comments, categories, descriptions):
+        """Bir grup yorumu tüm kategoriler için etiketle; cevap alınamayanlar sıfır vektörü sayılır"""
+        cache_category = "|".join(categories)
+        cache_description = "\n".join(descriptions[category] for category in categories)
+        vectors = self._cached(comments, cache_category, cache_description,
+                               lambda missing: self._ask_multi_batch(missing, categories, descriptions),
+                               encode=lambda vector: "".join(str(label) for label in vector),
+                               decode=lambda value: [int(label) for label in value])
+        return [[0] * len(categories) if vector is None else vector for vector in vectors]
+
+    def stream(self, items, category, description, batch_fn=None):
+        """(index, yorum) çiftlerini sırayı bozmadan (index, yorum, sonuç) olarak akıt.
+
+        En fazla ``max_workers`` toplu istek aynı anda havadadır; tüketici durduğunda
+        (ör. hedefler tamamlandığında) yeni istek gönderilmez. Öğe (index, yorum, sonuç)
+        üçlüsü olarak gelirse ve sonuç None değilse LLM'e sorulmadan sırasında aktarılır.
+        """
+        if batch_fn is None:
+            batch_fn = lambda comments: self.label_batch(comments, category, description)
+
+        items = iter(items)
+        pending = deque()
+        max_batch_items = self.batch_size * 32
+
+        def submit_next(executor):
+            batch = []
+            asked = 0
+            for item in items:
+                index, comment = item[0], item[1]
+                known = item[2] if len(item) > 2 else None
+                batch.append((index, comment, known))
+                if known is None:
+                    asked += 1
+                if asked >= self.batch_size or len(batch) >= max_batch_items:
+                    break
+            if not batch:
+                return False
+            to_ask = [comment for _, comment, known in batch if known is None]
+            if to_ask:
+                future = executor.submit(batch_fn, to_ask)
+            else:
+                future = Future()
+                future.set_result([])
+            pending.append((batch, future))
+            return True
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while len(pending) < self.max_workers and submit_next(executor):
+                pass
+            while pending:
+                batch, future = pending.popleft()
+                answers = iter(future.result())
+                submit_next(executor)
+                for index, comment, known in batch:
+                    yield index, comment, next(answers) if known is None else known
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def stream_multi(self, items, categories, descriptions):
+        """(index, yorum) çiftlerini sırayı bozmadan (index, yorum, etiket vektörü) olarak akıt"""
+        return self.stream(items, None, None,
+                           batch_fn=lambda comments: self.label_multi_batch(comments, categories, descriptions))
@@ -0,0 +1,223 @@
+import math
+import time
+
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, get_scorer
+from sklearn.model_selection import ParameterGrid, ParameterSampler, train_test_split
+
+
+def _fit_and_score(estimator, params, X, y, train, test, scorer):
+    start_time = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(X[train], y[train])
+    return scorer(model, X[test], y[test]), time.perf_counter() - start_time
+
+
+def _rung_sizes(n_samples, n_candidates, factor, min_resources):
+    """Her turda kullanılacak örnek sayıları; son tur tüm veridir"""
+    n_rungs = max(1, math.ceil(math.log(max(n_candidates, 1), factor)) + 1)
+    sizes = [n_samples]
+    while len(sizes) < n_rungs and sizes[-1] // factor >= min_resources:
+        sizes.append(sizes[-1] // factor)
+    return sizes[::-1]
+
+
+def _estimate_fit_seconds(fit_seconds, size):
+    """Bir fold fit'inin tahmini süresi; ölçülen iki en büyük veri boyutundan doğrusal tahmin (en fazla orantılı)"""
+    if fit_seconds.get(size):
+        return float(np.mean(fit_seconds[size]))
+    if not fit_seconds:
+        return 0.0
+    measured = sorted(fit_seconds)[-2:]
+    means = [float(np.mean(fit_seconds[n])) for n in measured]
+    if len(measured) == 1:
+        # Tek ölçüm varsa süre veriyle orantılı kabul edilir (temkinli tahmin)
+        return means[0] * max(1.0, size / measured[0])
+    slope = max(0.0, (means[1] - means[0]) / (measured[1] - measured[0]))
+    proportional = means[1] * max(1.0, size / measured[1])
+    return min(proportional, max(means[1], means[1] + slope * (size - measured[1])))
+
+
+def _subsample(X, y, size, random_state):
+    """Sınıf oranlarını koruyarak size kadar örnek seç"""
+    if size >= len(y):
+        return X, y
+    indices, _ = train_test_split(np.arange(len(y)), train_size=size, stratify=y, random_state=random_state)
+    return X[indices], y[indices]
+
+
+def successive_halving_search(estimator, param_grid, X, y, cv, budget_seconds, n_candidates=24, factor=3,
+                              min_resources=60, scoring="accuracy", n_jobs=-1, random_state=42):
+    """Süre bütçeli ardışık yarılama ile hiperparametre araması; (en iyi model, rapor) döndür.
+
+    param_grid'den n_candidates aday rastgele seçilir. İlk turda adaylar verinin küçük bir
+    altkümesinde çapraz doğrulanır, her turda en iyi 1/factor'ü kalır ve veri factor kat büyür;
+    son tur tüm veridir. Bir adayın katları, önceki ölçümlere göre tahmini süresi kalan bütçeye
+    sığıyorsa başlatılır (çalışan fit kesilmez). Bütçe dolunca arama durur ve en büyük veriyle
+    ölçülmüş en iyi aday seçilir. Seçilen model en sonda tüm veriyle yeniden eğitilir (bu fit de
+    bütçeden ayrılır). Hiç aday ölçülemezse estimator varsayılan ayarlarıyla eğitilir.
+
+    Rapor: fit sayısı, süre, en iyi skor ve parametreler, tamamlanan tur, bütçe aşıldı mı.
+    """
+    start_time = time.perf_counter()
+    deadline = start_time + budget_seconds
+    X, y = X.tocsr() if hasattr(X, "tocsr") else np.asarray(X), np.asarray(y)
+    scorer = get_scorer(scoring)
+
+    n_candidates = min(n_candidates, len(ParameterGrid(param_grid)))
+    candidates = list(ParameterSampler(param_grid, n_candidates, random_state=random_state))
+    # En küçük altkümede bile azınlık sınıfı her katta bulunmalı
+    minority = np.unique(y, return_counts=True)[1].min()
+    min_resources = max(min_resources, math.ceil(cv.get_n_splits() * len(y) / minority))
+    sizes = _rung_sizes(len(y), len(candidates), factor, min(min_resources, len(y)))
+    workers = effective_n_jobs(n_jobs)
+
+    fits = 0
+    fit_seconds = {}  # örnek sayısı -> tek fold fit süreleri
+    best = None  # (örnek sayısı, skor, parametreler)
+    completed_rungs = 0
+    stopped = False
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rung, size in enumerate(sizes):
+            X_rung, y_rung = _subsample(X, y, size, random_state)
+            splits = list(cv.split(X_rung, y_rung))
+            scores = []
+            for params in candidates:
+                estimate = _estimate_fit_seconds(fit_seconds, size) * math.ceil(len(splits) / min(workers, len(splits)))
+                # Son yeniden eğitim için de tam veride bir fit süresi ayrılır
+                refit_estimate = _estimate_fit_seconds(fit_seconds, len(y))
+                if time.perf_counter() + estimate + refit_estimate > deadline:
+                    stopped = True
+                    break
+                results = parallel(delayed(_fit_and_score)(estimator, params, X_rung, y_rung, train, test, scorer)
+                                   for train, test in splits)
+                fits += len(results)
+                fit_seconds.setdefault(size, []).extend(seconds for _, seconds in results)
+                score = float(np.mean([fold_score for fold_score, _ in results]))
+                scores.append((score, params))
+                if best is None or size > best[0] or (size == best[0] and score > best[1]):
+                    best = (size, score, params)
+            if stopped:
+                break
+            completed_rungs = rung + 1
+            scores.sort(key=lambda item: item[0], reverse=True)
+            candidates = [params for _, params in scores[:max(1, math.ceil(len(scores) / factor))]]
+
+    best_params = best[2] if best is not None else {}
+    model = clone(estimator).set_params(**best_params)
+    model.fit(X, y)
+    fits += 1
+    report = {
+        'fit': fits,
+        'sure': time.perf_counter() - start_time,
+        'butce': budget_seconds,
+        'aday': n_candidates,
+        'tur': completed_rungs,
+        'toplam_tur': len(sizes),
+        'en_iyi_skor': best[1] if best is not None else None,
+        'en_iyi_ornek': best[0] if best is not None else 0,
+        'en_iyi_parametreler': best_params,
+        'butce_asildi': stopped,
+    }
+    return model, report
+
+
+def print_search_report(report):
+    """Arama sonucunu yazdır"""
+    print(f"   ℹ️ Ardışık yarılama: {report['fit']} fit, {report['sure']:.1f} sn (bütçe {report['butce']:.0f} sn), "
+          f"{report['aday']} aday, {report['tur']}/{report['toplam_tur']} tur tamamlandı")
+    if report['en_iyi_skor'] is None:
+        print("   ⚠️ Bütçe içinde hiç aday ölçülemedi, varsayılan ayarlar kullanıldı")
+        return
+    if report['butce_asildi']:
+        print("   ⚠️ Bütçe doldu, arama erken durduruldu")
+    print(f"   ℹ️ En iyi CV skoru: {report['en_iyi_skor']:.4f} ({report['en_iyi_ornek']} örnekle), "
+          f"parametreler: {report['en_iyi_parametreler']}")
+
+
+def _fit_base_proba(estimator, params, X, y, train, test):
+    start_time = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(X[train], y[train])
+    return model.predict_proba(X[test]), time.perf_counter() - start_time
+
+
+def _base_settings(ensemble, param_grid):
+    """param_grid'i alt modellere ayır: {alt model adı: [o modelin parametre ayarları]}"""
+    settings = {name: {} for name, estimator in ensemble.estimators if estimator != "drop"}
+    for key, values in param_grid.items():
+        name, _, param = key.partition("__")
+        if name not in settings or not param:
+            raise ValueError(f"Önbellekli arama yalnızca alt model parametrelerini destekler: {key}")
+        settings[name][param] = values
+    return {name: list(ParameterGrid(grid)) for name, grid in settings.items()}
+
+
+def _setting_key(params):
+    return tuple(sorted(params.items()))
+
+
+def cached_voting_search(ensemble, param_grid, X, y, cv, score_func=accuracy_score, n_jobs=-1):
+    """Soft voting ensemble için alt model olasılıklarını önbelleğe alan tam grid araması; (en iyi model, rapor) döndür.
+
+    Her alt model, her katta kendi parametre ayarı başına yalnızca bir kez eğitilir ve kat dışı
+    olasılıkları saklanır. Grid kombinasyonları bu olasılıkların (ensemble ağırlıklarıyla)
+    ortalamasından skorlanır; fit sayısı ayar sayılarının çarpımı yerine toplamıyla büyür.
+    Skorlar, seçilen parametreler ve eşitlikte ilk kombinasyonun seçilmesi GridSearchCV ile aynıdır.
+    En iyi kombinasyonla ensemble tüm veride yeniden eğitilir.
+    """
+    if getattr(ensemble, "voting", None) != "soft":
+        raise ValueError("Önbellekli arama yalnızca voting='soft' ensemble'lar için kullanılabilir")
+    start_time = time.perf_counter()
+    X, y = X.tocsr() if hasattr(X, "tocsr") else np.asarray(X), np.asarray(y)
+    estimators = {name: estimator for name, estimator in ensemble.estimators if estimator != "drop"}
+    settings = _base_settings(ensemble, param_grid)
+    splits = list(cv.split(X, y))
+
+    tasks = [(name, params, fold) for name in estimators for params in settings[name] for fold in range(len(splits))]
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_base_proba)(estimators[name], params, X, y, *splits[fold]) for name, params, fold in tasks)
+    probabilities = {(name, _setting_key(params), fold): proba
+                     for (name, params, fold), (proba, _) in zip(tasks, results)}
+
+    classes = np.unique(y)
+    weights = None
+    if ensemble.weights is not None:
+        weights = [weight for (_, estimator), weight in zip(ensemble.estimators, ensemble.weights) if estimator != "drop"]
+    combinations = list(ParameterGrid(param_grid))
+    best_score, best_params = None, {}
+    for combination in combinations:
+        own = {name: {} for name in estimators}
+        for key, value in combination.items():
+            name, _, param = key.partition("__")
+            own[name][param] = value
+        fold_scores = []
+        for fold, (_, test) in enumerate(splits):
+            # VotingClassifier.predict_proba ile aynı ağırlıklı ortalama
+            average = np.average([probabilities[name, _setting_key(own[name]), fold] for name in estimators],
+                                 axis=0, weights=weights)
+            fold_scores.append(score_func(y[test], classes[np.argmax(average, axis=1)]))
+        score = float(np.mean(fold_scores))
+        if best_score is None or score > best_score:
+            best_score, best_params = score, combination
+
+    model = clone(ensemble).set_params(**best_params)
+    model.fit(X, y)
+    report = {
+        'fit': len(tasks) + len(estimators),
+        'grid_fit': (len(combinations) * len(splits) + 1) * len(estimators),
+        'kombinasyon': len(combinations),
+        'sure': time.perf_counter() - start_time,
+        'en_iyi_skor': best_score,
+        'en_iyi_parametreler': best_params,
+    }
+    return model, report
+
+
+def print_cached_search_report(report):
+    """Önbellekli grid aramasının sonucunu yazdır"""
+    print(f"   ℹ️ Önbellekli grid araması: {report['kombinasyon']} kombinasyon, {report['fit']} alt model fit'i "
+          f"(GridSearchCV: {report['grid_fit']}), {report['sure']:.1f} sn")
+    print(f"   ℹ️ En iyi CV skoru: {report['en_iyi_skor']:.4f}, parametreler: {report['en_iyi_parametreler']}")
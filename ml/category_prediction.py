@@ -1,24 +1,19 @@
 import pandas as pd
 import numpy as np
-import joblib
 import os
-import re
+import sys
 import time
 import warnings
 warnings.filterwarnings('ignore')
 
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-   
-    text = text.lower()
-   
-    text = re.sub(r'\d+', '', text)
-  
-    text = re.sub(r'[^\w\s]', '', text)
-   
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.table_io import TableAppender, iter_table_chunks, read_table, resolve_table_path, write_table
+from ml.model_bundle import find_models, has_student
+from ml.multilabel_predictor import MultiLabelPredictor
+# clean_text: eski modellerin yüklenmesi için bu modülden de erişilebilir kalır
+from data.text_normalization import clean_text, clean_texts
 
 def make_dense(X):
     if hasattr(X, "toarray"):
@@ -26,113 +21,214 @@ def make_dense(X):
     return X
 
 
-start_time = time.time()
-
-print("🚀 TAHMİN İŞLEMİ BAŞLADI")
-print("-----------------------")
-
 
 # --- CONFIGURATION ---
 # Define the input file for prediction.
 # IMPORTANT: Place your Excel file to be predicted in the 'data/processed_data' directory.
 input_dir = os.path.join("data", "processed_data")
 tahmin_excel = os.path.join(input_dir, "cleaned_data2.xlsx")
+# >1: kategoriler bu kadar süreçte paralel tahmin edilir (her süreç modelini bir kez yükler)
+workers = 1
+# Verilirse girdi bu kadar satırlık parçalar halinde okunur, tahmin edilir ve çıktıya eklenir (akış modu)
+chunk_size = None
+# True: damıtılmış öğrenci modeli olan kategorilerde ensemble yerine hızlı lojistik regresyon kullanılır
+use_student = False
+# Verilirse yorumların n-gram sayımları bu klasörde saklanır; aynı veri tekrar tahmin edilirken tokenize edilmez
+feature_cache_dir = None
 # --- END CONFIGURATION ---  
 
 
-if not os.path.exists(tahmin_excel):
-    print(f"⚠️ HATA: Excel dosyası bulunamadı!")
-    print(f"Aranan konum: {tahmin_excel}")
-    print("Lütfen dosya yolunu kontrol edin.")
-    exit()
+def predict_categories(input_path=tahmin_excel, df=None, model_dir=".", output_path=os.path.join("outputs", "tahmin_sonuclari.parquet"),
+                       excel_path=None, workers=workers, use_student=use_student, feature_cache_dir=feature_cache_dir):
+    """Eğitilmiş model paketleri (ya da eski model_*.pkl dosyaları) ile tüm kategoriler için tahmin yap.
 
+    Girdi Excel, Parquet, Arrow veya CSV olabilir (uzantıdan anlaşılır). df verilirse dosya
+    okunmaz; output_path None ise sonuç yalnızca döndürülür, excel_path verilirse ayrıca
+    rapor amaçlı Excel kopyası yazılır. workers > 1 ise kategoriler süreç havuzunda
+    paralel tahmin edilir. use_student=True ise paketlerdeki damıtılmış öğrenci modeller kullanılır.
+    feature_cache_dir verilirse sayımlar özellik deposundan okunur/yazılır. Hata durumunda None döndürür.
+    """
+    start_time = time.time()
 
-model_files = [f for f in os.listdir() if f.startswith("model_") and f.endswith(".pkl")]
-if not model_files:
-    print("⚠️ Hiç model dosyası bulunamadı. Önce 'model_egitim.py' dosyasını çalıştırın.")
-    exit()
+    print("🚀 TAHMİN İŞLEMİ BAŞLADI")
+    print("-----------------------")
 
-print(f"📁 Bulunan model sayısı: {len(model_files)}")
+    if df is None:
+        input_path = resolve_table_path(input_path)
+    if df is None and not os.path.exists(input_path):
+        print(f"⚠️ HATA: Excel dosyası bulunamadı!")
+        print(f"Aranan konum: {input_path}")
+        print("Lütfen dosya yolunu kontrol edin.")
+        return None
 
 
-try:
-    predict_data = pd.read_excel(tahmin_excel)
-    print(f"📥 Tahmin edilecek veri seti yüklendi: {len(predict_data)} örnek")
-    
-    
-    if 'Yorum' not in predict_data.columns:
-        print("⚠️ Excel dosyasında 'Yorum' sütunu bulunamadı!")
-        exit()
-except FileNotFoundError:
-    print(f"⚠️ '{tahmin_excel}' dosyası bulunamadı!")
-    exit()
-except Exception as e:
-    print(f"⚠️ Excel dosyası yüklenirken hata oluştu: {str(e)}")
-    exit()
+    model_paths = find_models(model_dir)
+    if not model_paths:
+        print("⚠️ Hiç model dosyası bulunamadı. Önce 'model_egitim.py' dosyasını çalıştırın.")
+        return None
 
+    print(f"📁 Bulunan model sayısı: {len(model_paths)}")
 
-print("🧹 Metinler temizleniyor...")
-predict_data['Temiz_Yorum'] = predict_data['Yorum'].apply(clean_text)
 
+    try:
+        predict_data = read_table(input_path) if df is None else df.copy()
+        print(f"📥 Tahmin edilecek veri seti yüklendi: {len(predict_data)} örnek")
+        
+        
+        if 'Yorum' not in predict_data.columns:
+            print("⚠️ Excel dosyasında 'Yorum' sütunu bulunamadı!")
+            return None
+    except FileNotFoundError:
+        print(f"⚠️ '{input_path}' dosyası bulunamadı!")
+        return None
+    except Exception as e:
+        print(f"⚠️ Excel dosyası yüklenirken hata oluştu: {str(e)}")
+        return None
 
-categories = []
-for model_file in model_files:
-    category = model_file.replace("model_", "").replace(".pkl", "")
-    categories.append(category)
-  
-    predict_data[category] = 0
 
-print(f"📊 Toplam {len(categories)} kategori için tahmin yapılacak: {', '.join(categories)}")
+    print("🧹 Metinler temizleniyor...")
+    predict_data['Temiz_Yorum'] = clean_texts(predict_data['Yorum'])
 
 
-for model_file in model_files:
-    category = model_file.replace("model_", "").replace(".pkl", "")
-    print(f"\n🔄 İşleniyor: {category}")
-    
-    try:
-        
-        saved_data = joblib.load(model_file)
-       
-        if isinstance(saved_data, tuple) and len(saved_data) == 2:
-            model, vectorizer = saved_data
-        elif isinstance(saved_data, dict):
-            model = saved_data.get('model')
-            vectorizer = saved_data.get('vectorizer')
-        else:
-            raise ValueError("Beklenmeyen model dosyası formatı. Tuple (model, vectorizer) veya dict {'model','vectorizer'} bekleniyor.")
-        
-    
-        X_predict = vectorizer.transform(predict_data['Temiz_Yorum'])
-        
-       
-        y_predict = model.predict(X_predict)
-        
+    predictor, load_errors = MultiLabelPredictor.from_dir(model_dir, model_paths, student=use_student,
+                                                            feature_cache_dir=feature_cache_dir)
+    if use_student:
+        print(f"⚡ Hızlı yol: {sum(has_student(path) for path in model_paths.values())}/{len(model_paths)} kategori "
+              "damıtılmış öğrenci modelle tahmin edilecek")
+    categories = list(model_paths)
+    for category in categories:
+        predict_data[category] = 0
+
+    print(f"📊 Toplam {len(categories)} kategori için tahmin yapılacak: {', '.join(categories)}")
+    for category, error in load_errors.items():
+        print(f"⚠️ {category} için tahmin yapılırken hata oluştu: {str(error)}")
 
+
+    # Yorumlar ortak sözlük grubu başına bir kez tokenize edilir, tüm kategoriler tek geçişte tahmin edilir
+    try:
+        labels = predictor.predict(predict_data['Temiz_Yorum'].tolist(), workers=workers)
+    finally:
+        predictor.close()
+    stats = predictor.last_stats
+    print(f"🧠 {stats['kategori']} model, {stats['grup']} ortak sözlük grubunda vektörleştirildi "
+          f"({stats['vektorlestirme_sn']:.2f} sn, toplam {stats['sure']:.2f} sn, {stats['isci']} süreç)")
+    if stats['kategori_sn']:
+        en_yavas = max(stats['kategori_sn'], key=stats['kategori_sn'].get)
+        print(f"   ➤ En yavaş kategori: {en_yavas} ({stats['kategori_sn'][en_yavas]:.2f} sn)")
+
+    for column, category in enumerate(predictor.categories):
+        print(f"\n🔄 İşleniyor: {category}")
+        if category in predictor.last_errors:
+            print(f"⚠️ {category} için tahmin yapılırken hata oluştu: {str(predictor.last_errors[category])}")
+            continue
+
+        y_predict = labels[:, column]
         predict_data[category] = y_predict
-        
-        
-        positive_count = sum(y_predict)
-        print(f"   ➤ Toplam: {len(y_predict)}, Pozitif Tahmin: {positive_count} ({positive_count/len(y_predict)*100:.2f}%)")
-        
-    except Exception as e:
-        print(f"⚠️ {category} için tahmin yapılırken hata oluştu: {str(e)}")
 
+        positive_count = int(y_predict.sum())
+        print(f"   ➤ Toplam: {len(y_predict)}, Pozitif Tahmin: {positive_count} ({positive_count/len(y_predict)*100 if len(y_predict) else 0:.2f}%)")
 
-predict_data = predict_data.drop(columns=['Temiz_Yorum'])
 
+    predict_data = predict_data.drop(columns=['Temiz_Yorum'])
 
-try:
-    # Create an 'outputs' directory if it doesn't exist
-    output_dir = "outputs"
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "tahmin_sonuclari.xlsx")
-    
-    predict_data.to_excel(output_path, index=False)
-    print(f"\n💾 Tahmin sonuçları '{output_path}' dosyasına kaydedildi.")
-except Exception as e:
-    print(f"⚠️ Excel dosyası oluşturulurken hata oluştu: {str(e)}")
 
+    if output_path:
+        try:
+            output_path = write_table(predict_data, output_path, excel_path)
+            print(f"\n💾 Tahmin sonuçları '{output_path}' dosyasına kaydedildi.")
+        except Exception as e:
+            print(f"⚠️ Sonuç dosyası oluşturulurken hata oluştu: {str(e)}")
+
+
+    total_time = time.time() - start_time
+    print(f"\n⏱️ Toplam çalışma süresi: {total_time:.2f} saniye")
+    print("\n✅ Tahmin işlemi tamamlandı!")
+    return predict_data
+
+
+def predict_categories_streaming(input_path=tahmin_excel, model_dir=".",
+                                 output_path=os.path.join("outputs", "tahmin_sonuclari.parquet"),
+                                 chunk_size=chunk_size or 50_000, workers=workers, use_student=use_student,
+                                 feature_cache_dir=feature_cache_dir):
+    """Girdiyi chunk_size satırlık parçalar halinde okuyup tahmin et ve sonuçları çıktıya parça parça ekle.
+
+    Bellekte aynı anda tek parça tutulur, bu yüzden bellek kullanımı veri boyutundan bağımsızdır.
+    Çıktı Parquet, Arrow veya CSV olmalıdır. feature_cache_dir verilirse her parçanın sayımları
+    özellik deposunda saklanır. İşlenen satır sayısını, hata durumunda None döndürür.
+    """
+    start_time = time.time()
 
-total_time = time.time() - start_time
-print(f"\n⏱️ Toplam çalışma süresi: {total_time:.2f} saniye")
-print("\n✅ Tahmin işlemi tamamlandı!") 
\ No newline at end of file
+    print("🚀 TAHMİN İŞLEMİ BAŞLADI (akış modu)")
+    print("-----------------------")
+
+    input_path = resolve_table_path(input_path)
+    if not os.path.exists(input_path):
+        print(f"⚠️ HATA: Girdi dosyası bulunamadı!")
+        print(f"Aranan konum: {input_path}")
+        return None
+
+    model_paths = find_models(model_dir)
+    if not model_paths:
+        print("⚠️ Hiç model dosyası bulunamadı. Önce 'model_egitim.py' dosyasını çalıştırın.")
+        return None
+
+    predictor, load_errors = MultiLabelPredictor.from_dir(model_dir, model_paths, student=use_student,
+                                                            feature_cache_dir=feature_cache_dir)
+    if use_student:
+        print(f"⚡ Hızlı yol: {sum(has_student(path) for path in model_paths.values())}/{len(model_paths)} kategori "
+              "damıtılmış öğrenci modelle tahmin edilecek")
+    categories = list(model_paths)
+    print(f"📊 Toplam {len(categories)} kategori için tahmin yapılacak: {', '.join(categories)}")
+    for category, error in load_errors.items():
+        print(f"⚠️ {category} için tahmin yapılırken hata oluştu: {str(error)}")
+    print(f"📦 Girdi {chunk_size} satırlık parçalar halinde işlenecek: {input_path}")
+
+    pozitifler = dict.fromkeys(categories, 0)
+    hatali = set(load_errors)
+    toplam = 0
+    try:
+        with predictor, TableAppender(output_path) as appender:
+            for parca_no, chunk in enumerate(iter_table_chunks(input_path, chunk_size), 1):
+                parca_baslangic = time.perf_counter()
+                if 'Yorum' not in chunk.columns:
+                    print("⚠️ Girdi dosyasında 'Yorum' sütunu bulunamadı!")
+                    return None
+
+                labels = predictor.predict(clean_texts(chunk['Yorum']), workers=workers)
+                sutunlar = dict.fromkeys(categories, 0)
+                for column, category in enumerate(predictor.categories):
+                    if category in predictor.last_errors:
+                        if category not in hatali:
+                            hatali.add(category)
+                            print(f"⚠️ {category} için tahmin yapılırken hata oluştu: "
+                                  f"{str(predictor.last_errors[category])}")
+                        continue
+                    sutunlar[category] = labels[:, column]
+                    pozitifler[category] += int(labels[:, column].sum())
+                appender.write(chunk.assign(**sutunlar))
+
+                toplam += len(chunk)
+                gecen = time.perf_counter() - parca_baslangic
+                print(f"   ➤ Parça {parca_no}: {len(chunk)} satır, {gecen:.2f} sn "
+                      f"({len(chunk) / gecen if gecen else 0:.0f} satır/sn), toplam {toplam} satır")
+    except Exception as e:
+        print(f"⚠️ Akış modunda tahmin yapılırken hata oluştu: {str(e)}")
+        return None
+
+    print(f"\n💾 Tahmin sonuçları '{output_path}' dosyasına kaydedildi.")
+    for category in categories:
+        if category not in hatali:
+            print(f"   {category}: Pozitif Tahmin: {pozitifler[category]} "
+                  f"({pozitifler[category] / toplam * 100 if toplam else 0:.2f}%)")
+
+    total_time = time.time() - start_time
+    print(f"\n⏱️ Toplam çalışma süresi: {total_time:.2f} saniye ({toplam / total_time if total_time else 0:.0f} satır/sn)")
+    print("\n✅ Tahmin işlemi tamamlandı!")
+    return toplam
+
+
+if __name__ == "__main__":
+    if chunk_size:
+        predict_categories_streaming()
+    else:
+        predict_categories()
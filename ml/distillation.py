@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+from scipy.sparse import issparse, vstack
+from sklearn.linear_model import LogisticRegression
+
+
+def teacher_probabilities(teacher, X):
+    """Öğretmen modelin pozitif sınıf olasılıkları; predict_proba yoksa sert tahminler"""
+    if hasattr(teacher, "predict_proba"):
+        try:
+            probabilities = teacher.predict_proba(X)
+            classes = list(teacher.classes_)
+            return probabilities[:, classes.index(1) if 1 in classes else len(classes) - 1]
+        except AttributeError:
+            # voting='hard' ensemble'larda predict_proba çağrıldığında hata verir
+            pass
+    return np.asarray(teacher.predict(X), dtype=np.float64)
+
+
+def fit_student(X, soft_targets, C=10.0, max_iter=1000):
+    """Lojistik regresyonu öğretmenin yumuşak oylarına uydur.
+
+    Her örnek iki kez (etiket 1, ağırlık p) ve (etiket 0, ağırlık 1-p) olarak eklenir; bu,
+    yumuşak hedeflerle çapraz entropiyi en aza indirmekle aynıdır.
+    """
+    n_samples = X.shape[0]
+    X_double = vstack([X, X]).tocsr() if issparse(X) else np.vstack([X, X])
+    y_double = np.concatenate([np.ones(n_samples, dtype=np.int64), np.zeros(n_samples, dtype=np.int64)])
+    weights = np.concatenate([soft_targets, 1.0 - soft_targets])
+    keep = weights > 0
+    student = LogisticRegression(C=C, max_iter=max_iter)
+    student.fit(X_double[keep], y_double[keep], sample_weight=weights[keep])
+    return student
+
+
+def _microseconds_per_row(model, X):
+    start_time = time.perf_counter()
+    model.predict(X)
+    return (time.perf_counter() - start_time) / max(1, X.shape[0]) * 1e6
+
+
+def distill_model(teacher, X_train, X_eval, y_eval=None, C=10.0):
+    """Ensemble'ı tek bir lojistik regresyon öğrenciye damıt; (öğrenci, rapor) döndür.
+
+    Rapor: değerlendirme setinde öğretmenle etiket uyumu, (y_eval verilirse) iki modelin
+    doğruluğu ve yorum başına tahmin süreleri (mikrosaniye).
+    """
+    soft_targets = teacher_probabilities(teacher, X_train)
+    if soft_targets.max() <= 0 or soft_targets.min() >= 1:
+        raise ValueError("Öğretmen tek bir sınıf tahmin ediyor, damıtma yapılamaz")
+    student = fit_student(X_train, soft_targets, C=C)
+
+    teacher_labels = np.asarray(teacher.predict(X_eval))
+    student_labels = student.predict(X_eval)
+    report = {
+        'uyum': float(np.mean(teacher_labels == student_labels)) if len(student_labels) else None,
+        'ogretmen_us_per_yorum': _microseconds_per_row(teacher, X_eval),
+        'ogrenci_us_per_yorum': _microseconds_per_row(student, X_eval),
+    }
+    if y_eval is not None:
+        y_eval = np.asarray(y_eval)
+        report['ogretmen_dogruluk'] = float(np.mean(teacher_labels == y_eval))
+        report['ogrenci_dogruluk'] = float(np.mean(student_labels == y_eval))
+    return student, report
+
+
+def print_distillation_report(report):
+    """Damıtma sonucunu yazdır"""
+    print(f"   🧪 Öğrenci model (lojistik regresyon) öğretmenle uyumu: %{report['uyum']*100:.2f}")
+    if 'ogretmen_dogruluk' in report:
+        print(f"     ◆ Test doğruluğu: öğretmen {report['ogretmen_dogruluk']:.4f}, öğrenci {report['ogrenci_dogruluk']:.4f}")
+    speedup = report['ogretmen_us_per_yorum'] / report['ogrenci_us_per_yorum'] if report['ogrenci_us_per_yorum'] else 0
+    print(f"     ◆ Tahmin süresi: öğretmen {report['ogretmen_us_per_yorum']:.1f} µs/yorum, "
+          f"öğrenci {report['ogrenci_us_per_yorum']:.1f} µs/yorum (x{speedup:.1f})")
@@ -0,0 +1,231 @@
+"""Derlem başına bir kez hesaplanan n-gram sayım matrisleri (özellik deposu).
+
+Bir derlemin (yorum listesinin) sayım matrisi, metinlerin özetinden ve tokenizasyon
+ayarlarından türetilen bir anahtarla diskte saklanır:
+
+    {cache_dir}/{anahtar}/counts.{data,indices,indptr}.npy   CSR sayım matrisi (mmap_mode='r' ile açılır)
+    {cache_dir}/{anahtar}/meta.json                          sürüm, ayarlar, boyut ve sütun terimleri
+
+Eğitim ve tahmin metinleri yeniden tokenize etmek yerine bu sayımlardan kategori başına
+TF-IDF görünümleri türetir: ``fit_transform(vectorizer, texts)``, vektörleştiricinin aynı
+metinlerle ``fit_transform`` çağrısıyla kuracağı sözlüğü (max_features, min_df, max_df
+dahil) ve idf değerlerini sayımlardan hesaplayıp vektörleştiriciye yazar. Sonuç ve kaydedilen
+vektörleştirici normal eğitilmiş olanla aynıdır. Klasör istenildiğinde silinebilir.
+
+Eğitim süreçlerine ``subset(texts)`` ile yalnızca kategorinin satırları gönderilir. Diskteki
+bir anlık görüntü pickle edilirken sayımlar kopyalanmaz; süreç klasör yolu ve satır
+numaralarıyla sayımları ``load_shared_csr`` ile yeniden (bellek eşlemeli) açar.
+"""
+import hashlib
+import json
+import os
+import shutil
+from numbers import Integral
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+from ml.multilabel_predictor import (ANALYZER_PARAMS, build_projection, load_shared_csr, project_counts,
+                                     save_shared_csr)
+
+
+STORE_VERSION = 1
+META_FILE = "meta.json"
+COUNTS_PREFIX = "counts"
+DEFAULT_CACHE_DIR = os.path.join("outputs", "features")
+
+# Görünümün depoyla aynı olması gereken ayarlar; ngram_range deponun aralığı içinde olabilir
+_TOKENIZER_PARAMS = tuple(name for name in ANALYZER_PARAMS if name != "ngram_range")
+
+
+def _param_value(value):
+    if isinstance(value, (list, set, frozenset)):
+        return sorted(value)
+    return value
+
+
+def vectorizer_params(vectorizer):
+    """Vektörleştiricinin tokenizasyon ayarları (depo bu ayarlarla kurulur)"""
+    return {name: getattr(vectorizer, name) for name in ANALYZER_PARAMS}
+
+
+class FeatureSnapshot:
+    """Bir derlemin sayım matrisi ve sütun terimleri; satırlar metinle aranır"""
+
+    def __init__(self, counts, terms, texts, ngram_range, from_cache=False, path=None):
+        self.counts = counts
+        self.terms = terms
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.row_index = {text: row for row, text in enumerate(texts)}
+        self.ngram_range = tuple(ngram_range)
+        self.from_cache = from_cache
+        self.path = path
+        self._ngram_lengths = None
+
+    def subset(self, texts):
+        """Yalnızca verilen metinlerin satırlarını gösteren görünüm; sayımlar ve terimler paylaşılır"""
+        unique = list(dict.fromkeys(texts))
+        return self._view(dict(zip(unique, self.rows(unique).tolist())))
+
+    def _view(self, row_index):
+        view = object.__new__(FeatureSnapshot)
+        view.__dict__.update(self.__dict__)
+        view.row_index = row_index
+        return view
+
+    def __reduce__(self):
+        texts = list(self.row_index)
+        rows = np.fromiter(self.row_index.values(), dtype=np.intp, count=len(texts))
+        if self.path is not None:
+            # Sayımlar kopyalanmaz; süreç klasörü bellek eşlemesiyle yeniden açar
+            return _open_snapshot, (self.path, self.counts.shape, texts, rows, self.ngram_range)
+        # Depo diskte değilse yalnızca bu metinlerin satırları taşınır
+        return FeatureSnapshot, (self.counts[rows], self.terms, texts, self.ngram_range)
+
+    def rows(self, texts):
+        """Metinlerin sayım matrisindeki satır numaraları"""
+        return np.fromiter((self.row_index[text] for text in texts), dtype=np.intp, count=len(texts))
+
+    def ngram_lengths(self):
+        """Her sütun teriminin kelime sayısı"""
+        if self._ngram_lengths is None:
+            self._ngram_lengths = np.fromiter((term.count(" ") + 1 for term in self.terms), dtype=np.int64,
+                                              count=len(self.terms))
+        return self._ngram_lengths
+
+    def fit_transform(self, vectorizer, texts):
+        """``vectorizer.fit_transform(texts)`` ile aynı sonucu sayımlardan üret; vektörleştirici eğitilmiş olur"""
+        counts = self.counts[self.rows(texts)]
+        n_doc = counts.shape[0]
+        dfs = np.bincount(counts.indices, minlength=counts.shape[1])
+        columns = np.flatnonzero(dfs)
+        low, high = vectorizer.ngram_range
+        if (low, high) != self.ngram_range:
+            lengths = self.ngram_lengths()[columns]
+            columns = columns[(lengths >= low) & (lengths <= high)]
+
+        # CountVectorizer._limit_features ile aynı seçim; sütunlar terim sırasında olduğundan
+        # max_features eşitliklerinde de aynı terimler seçilir
+        max_df, min_df = vectorizer.max_df, vectorizer.min_df
+        max_doc_count = max_df if isinstance(max_df, Integral) else max_df * n_doc
+        min_doc_count = min_df if isinstance(min_df, Integral) else min_df * n_doc
+        if max_doc_count < min_doc_count:
+            raise ValueError("max_df corresponds to < documents than min_df")
+        mask = (dfs[columns] <= max_doc_count) & (dfs[columns] >= min_doc_count)
+        limit = vectorizer.max_features
+        if limit is not None and mask.sum() > limit:
+            if vectorizer.binary:
+                tfs = dfs[columns].astype(vectorizer.dtype)
+            else:
+                tfs = np.bincount(counts.indices, weights=counts.data, minlength=counts.shape[1])[columns]
+                tfs = tfs.astype(vectorizer.dtype)
+            mask_inds = (-tfs[mask]).argsort()[:limit]
+            new_mask = np.zeros(len(columns), dtype=bool)
+            new_mask[np.where(mask)[0][mask_inds]] = True
+            mask = new_mask
+        kept = columns[mask]
+        if not len(kept):
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+        X = counts[:, kept].astype(vectorizer.dtype)
+        if vectorizer.binary:
+            X.data.fill(1)
+        vectorizer.vocabulary_ = {self.terms[column]: index for index, column in enumerate(kept.tolist())}
+        vectorizer.fixed_vocabulary_ = False
+        # TfidfVectorizer.fit ile aynı: idf, seçilen sütunların sayımlarından öğrenilir
+        vectorizer._tfidf = TfidfTransformer(norm=vectorizer.norm, use_idf=vectorizer.use_idf,
+                                             smooth_idf=vectorizer.smooth_idf,
+                                             sublinear_tf=vectorizer.sublinear_tf).fit(X)
+        return vectorizer._tfidf.transform(X, copy=False)
+
+    def transform(self, vectorizer, texts):
+        """``vectorizer.transform(texts)`` ile aynı matrisi sayımlardan üret"""
+        return project_counts(self.counts[self.rows(texts)], build_projection(vectorizer, self.vocabulary),
+                              vectorizer.binary, getattr(vectorizer, "sublinear_tf", False),
+                              getattr(vectorizer, "norm", None), vectorizer.dtype)
+
+
+# Süreç başına son açılan disk anlık görüntüsü; aynı süreçteki görevler sayımları yeniden açmaz
+_opened = {}
+
+
+def _open_snapshot(path, shape, texts, rows, ngram_range):
+    """Pickle'dan dönüş: diskteki sayımları bellek eşlemesiyle aç, verilen satırları göster"""
+    if path not in _opened:
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            terms = json.load(f)["terimler"]
+        counts = load_shared_csr(os.path.join(path, COUNTS_PREFIX), tuple(shape))
+        _opened.clear()
+        _opened[path] = FeatureSnapshot(counts, terms, [], ngram_range, from_cache=True, path=path)
+    return _opened[path]._view(dict(zip(texts, rows.tolist())))
+
+
+class FeatureStore:
+    """Sayım matrislerini metin özetine göre diskte saklayan özellik deposu.
+
+    ``snapshot(texts)`` derlemin sayımlarını önbellekten açar ya da bir kez hesaplayıp yazar.
+    cache_dir None ise sayımlar yalnızca bellekte tutulur. Son açılan anlık görüntü bellekte
+    kalır; aynı derlem için tekrar çağrılar diske de gitmez.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, **analyzer_params):
+        self.cache_dir = cache_dir
+        self.counter = CountVectorizer(**analyzer_params)
+        self._last = (None, None)
+
+    @classmethod
+    def for_vectorizer(cls, vectorizer, cache_dir=DEFAULT_CACHE_DIR):
+        """Vektörleştiriciyle aynı tokenizasyon ayarlarını kullanan depo"""
+        return cls(cache_dir, **vectorizer_params(vectorizer))
+
+    def supports(self, vectorizer):
+        """Vektörleştiricinin görünümü bu depodaki sayımlardan türetilebilir mi"""
+        if not all(_param_value(getattr(vectorizer, name, None)) == _param_value(getattr(self.counter, name))
+                   for name in _TOKENIZER_PARAMS):
+            return False
+        if getattr(vectorizer, "analyzer", None) != "word":
+            return False
+        low, high = vectorizer.ngram_range
+        store_low, store_high = self.counter.ngram_range
+        return store_low <= low <= high <= store_high
+
+    def _key(self, texts):
+        params = {name: _param_value(getattr(self.counter, name)) for name in ANALYZER_PARAMS}
+        digest = hashlib.sha256(repr((STORE_VERSION, sorted(params.items()))).encode("utf-8"))
+        digest.update("\x00".join(map(str, texts)).encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()[:32]
+
+    def snapshot(self, texts):
+        """Metinlerin sayım matrisini döndür; tekrar eden metinler tek satırda tutulur"""
+        unique = list(dict.fromkeys(texts))
+        key = self._key(unique)
+        if self._last[0] == key:
+            return self._last[1]
+
+        path = os.path.join(self.cache_dir, key) if self.cache_dir else None
+        if path and os.path.exists(os.path.join(path, META_FILE)):
+            with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            counts = load_shared_csr(os.path.join(path, COUNTS_PREFIX), tuple(meta["sekil"]))
+            snapshot = FeatureSnapshot(counts, meta["terimler"], unique, self.counter.ngram_range, from_cache=True,
+                                       path=path)
+        else:
+            counts = self.counter.fit_transform(unique).tocsr()
+            terms = self.counter.get_feature_names_out().tolist()
+            if path:
+                self._save(path, counts, terms)
+            snapshot = FeatureSnapshot(counts, terms, unique, self.counter.ngram_range, path=path)
+        self._last = (key, snapshot)
+        return snapshot
+
+    def _save(self, path, counts, terms):
+        """Sayımları geçici klasöre yazıp yerine taşı; yarım kalan kayıt okunmaz"""
+        temp_path = path + ".tmp"
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+        save_shared_csr(counts, os.path.join(temp_path, COUNTS_PREFIX))
+        meta = {"surum": STORE_VERSION, "yorum": counts.shape[0], "sekil": list(counts.shape), "terimler": terms}
+        with open(os.path.join(temp_path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temp_path, path)
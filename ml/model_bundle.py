@@ -0,0 +1,204 @@
+"""Kategori modelleri için sürümlü model paketi biçimi.
+
+Bir paket, ``model_{kategori}.bundle`` adlı bir klasördür:
+
+    manifest.json   biçim sürümü, kategori, model türü, özellik ayarları, metrikler, eğitim zamanı
+    model.joblib    {'model': ..., 'vectorizer': ...}; sıkıştırmasız yazılır, böylece numpy
+                    dizileri (katsayılar, IDF vektörü, destek vektörleri...) ``mmap_mode='r'``
+                    ile kopyalanmadan açılır ve aynı makinedeki süreçler sayfaları paylaşır
+    student.joblib  (isteğe bağlı) ensemble'dan damıtılmış lojistik regresyon; hızlı yol için
+                    ``load_model(path, student=True)`` ile yüklenir, uyum raporu manifest'tedir
+
+Eski ``model_{kategori}.pkl`` dosyaları ((model, vectorizer) tuple ya da dict) okunmaya devam eder.
+
+Eski modelleri pakete çevirmek için:
+    python ml/model_bundle.py outputs/models
+"""
+import datetime
+import json
+import os
+import shutil
+import sys
+
+import joblib
+import sklearn
+
+
+BUNDLE_FORMAT = "kategori-modeli"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+LEGACY_SUFFIX = ".pkl"
+MANIFEST_FILE = "manifest.json"
+PAYLOAD_FILE = "model.joblib"
+STUDENT_FILE = "student.joblib"
+
+VECTORIZER_PARAMS = ("max_features", "ngram_range", "min_df", "max_df", "lowercase", "analyzer",
+                     "binary", "use_idf", "sublinear_tf", "norm")
+
+
+def bundle_path(model_dir, category):
+    return os.path.join(model_dir, f"model_{category}{BUNDLE_SUFFIX}")
+
+
+def legacy_path(model_dir, category):
+    return os.path.join(model_dir, f"model_{category}{LEGACY_SUFFIX}")
+
+
+def is_bundle(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def _json_value(value):
+    """numpy sayılarını ve diğer JSON dışı değerleri manifest'e yazılabilir hale getir"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def vectorizer_config(vectorizer):
+    """Manifest için vektörleştiricinin özellik ayarlarını özetle"""
+    config = {"tur": type(vectorizer).__name__}
+    for name in VECTORIZER_PARAMS:
+        if hasattr(vectorizer, name):
+            value = getattr(vectorizer, name)
+            config[name] = list(value) if isinstance(value, tuple) else value
+    stop_words = getattr(vectorizer, "stop_words", None)
+    if stop_words is not None:
+        config["stop_words"] = stop_words if isinstance(stop_words, str) else len(stop_words)
+    if hasattr(vectorizer, "vocabulary_"):
+        config["ozellik_sayisi"] = len(vectorizer.vocabulary_)
+    return config
+
+
+def save_bundle(model, vectorizer, model_dir, category, metrics=None, student=None, student_report=None):
+    """Modeli ve vektörleştiriciyi manifest'li bir paket olarak kaydet; paket yolunu döndür.
+
+    Paket önce geçici klasöre yazılır, sonra eski paketin yerine taşınır; yarım kalan
+    bir kayıt çalışan tahminleri bozmaz. student verilirse damıtılmış öğrenci model de
+    pakete eklenir, student_report manifest'e yazılır.
+    """
+    path = bundle_path(model_dir, category)
+    temp_path = path + ".tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+
+    joblib.dump({'model': model, 'vectorizer': vectorizer}, os.path.join(temp_path, PAYLOAD_FILE), compress=0)
+    if student is not None:
+        joblib.dump(student, os.path.join(temp_path, STUDENT_FILE), compress=0)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "surum": BUNDLE_VERSION,
+        "kategori": category,
+        "model": type(model).__name__,
+        "ozellikler": vectorizer_config(vectorizer),
+        "metrikler": metrics or {},
+        "egitim_zamani": datetime.datetime.now().isoformat(timespec="seconds"),
+        "sklearn": sklearn.__version__,
+    }
+    if student is not None:
+        manifest["ogrenci"] = {"model": type(student).__name__, **(student_report or {})}
+    with open(os.path.join(temp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, default=_json_value)
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(temp_path, path)
+    return path
+
+
+def read_manifest(path):
+    """Paketin manifest'ini oku ve biçim/sürümünü doğrula"""
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Tanınmayan model paketi biçimi: {path}")
+    if manifest.get("surum", 0) > BUNDLE_VERSION:
+        raise ValueError(f"Model paketi daha yeni bir sürümle kaydedilmiş (v{manifest['surum']}): {path}")
+    return manifest
+
+
+def load_bundle(path, mmap_mode="r"):
+    """Paketi yükle; (model, vectorizer, manifest) döndür. Diziler varsayılan olarak bellek eşlemeli açılır"""
+    manifest = read_manifest(path)
+    saved_data = joblib.load(os.path.join(path, PAYLOAD_FILE), mmap_mode=mmap_mode)
+    return saved_data['model'], saved_data['vectorizer'], manifest
+
+
+def has_student(path):
+    """Pakette damıtılmış öğrenci model var mı"""
+    return is_bundle(path) and os.path.exists(os.path.join(path, STUDENT_FILE))
+
+
+def load_model(path, mmap_mode="r", student=False):
+    """Paket klasöründen ya da eski model_*.pkl dosyasından (model, vectorizer) çiftini oku.
+
+    student=True ise ve pakette öğrenci model varsa ensemble yerine o döndürülür.
+    """
+    if is_bundle(path):
+        if student and has_student(path):
+            read_manifest(path)
+            vectorizer = joblib.load(os.path.join(path, PAYLOAD_FILE), mmap_mode=mmap_mode)['vectorizer']
+            return joblib.load(os.path.join(path, STUDENT_FILE), mmap_mode=mmap_mode), vectorizer
+        model, vectorizer, _ = load_bundle(path, mmap_mode)
+        return model, vectorizer
+
+    saved_data = joblib.load(path)
+    if isinstance(saved_data, tuple) and len(saved_data) == 2:
+        return saved_data
+    if isinstance(saved_data, dict):
+        return saved_data.get('model'), saved_data.get('vectorizer')
+    raise ValueError("Beklenmeyen model dosyası formatı. Tuple (model, vectorizer) veya dict {'model','vectorizer'} bekleniyor.")
+
+
+def category_from_path(path):
+    """model_{kategori}.bundle / .pkl yolundan kategori adını çıkar"""
+    name = os.path.basename(os.path.normpath(path))
+    for suffix in (BUNDLE_SUFFIX, LEGACY_SUFFIX):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name[len("model_"):] if name.startswith("model_") else name
+
+
+def find_models(model_dir):
+    """Klasördeki modelleri {kategori: yol} olarak döndür; aynı kategori için paket .pkl'e tercih edilir"""
+    models = {}
+    for name in sorted(os.listdir(model_dir)):
+        path = os.path.join(model_dir, name)
+        if not name.startswith("model_"):
+            continue
+        if name.endswith(BUNDLE_SUFFIX) and is_bundle(path):
+            models[category_from_path(path)] = path
+        elif name.endswith(LEGACY_SUFFIX):
+            models.setdefault(category_from_path(path), path)
+    return models
+
+
+def find_category_model(category, model_dirs):
+    """Kategorinin modelini klasörlerde sırayla ara; önce paket, sonra eski .pkl"""
+    for model_dir in model_dirs:
+        for path in (bundle_path(model_dir, category), legacy_path(model_dir, category)):
+            if os.path.exists(path) and (path.endswith(LEGACY_SUFFIX) or is_bundle(path)):
+                return path
+    return None
+
+
+def convert_legacy_models(model_dir):
+    """Klasördeki eski model_*.pkl dosyalarını pakete çevir (.pkl dosyaları silinmez)"""
+    converted = []
+    for category, path in find_models(model_dir).items():
+        if is_bundle(path):
+            continue
+        model, vectorizer = load_model(path)
+        converted.append(save_bundle(model, vectorizer, model_dir, category))
+        print(f"📦 {os.path.basename(path)} -> {os.path.basename(converted[-1])}")
+    return converted
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # Betik olarak eğitilen eski modeller __main__.make_dense / clean_text referansı taşır
+    from ml.category_prediction import clean_text, make_dense
+
+    hedef = sys.argv[1] if len(sys.argv) > 1 else os.path.join("outputs", "models")
+    paketler = convert_legacy_models(hedef)
+    print(f"✅ {len(paketler)} model pakete çevrildi: {hedef}")
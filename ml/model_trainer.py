@@ -1,8 +1,8 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
-import re  # Eklendi - metin temizleme için
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import VotingClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
@@ -12,19 +12,29 @@ from sklearn.naive_bayes import GaussianNB, MultinomialNB
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.pipeline import make_pipeline
-from sklearn.preprocessing import FunctionTransformer
 from sklearn.model_selection import StratifiedKFold
 from imblearn.over_sampling import SMOTE
-import joblib
 import time
 import warnings
 warnings.filterwarnings('ignore')
 
-# Define function outside of lambda for pickling compatibility
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.table_io import read_table, is_table_file
+from ml.model_bundle import save_bundle
+from ml.distillation import distill_model, print_distillation_report
+from ml.feature_store import FeatureStore
+from ml.training_scheduler import run_scheduled
+from ml.budgeted_search import (cached_voting_search, print_cached_search_report, print_search_report,
+                                 successive_halving_search)
+from data.text_normalization import clean_texts
+
+# Eski ensemble'lar MultinomialNB'yi bu fonksiyonla yoğunlaştırıyordu; kayıtlı modellerin yüklenmesi için kalır
 def make_dense(X):
     return X.toarray()
 
+
 # 📁 Excel klasörü - BURAYA EXCEL DOSYALARININ YOLUNU GİRİN
 # --- CONFIGURATION ---
 # Directory containing the labeled Excel files from the LLM labeling step.
@@ -35,16 +45,23 @@ output_dir = "outputs"
 model_dir = os.path.join(output_dir, "models")
 report_dir = os.path.join(output_dir, "reports")
 
-# Create directories if they don't exist
-os.makedirs(model_dir, exist_ok=True)
-os.makedirs(report_dir, exist_ok=True)
-# --- END CONFIGURATION ---
+# True: her ensemble, tahminde hızlı yol için tek bir lojistik regresyon öğrenciye de damıtılır
+distill = False
+
+# Parametre araması: "halving" (kategori başına süre bütçeli ardışık yarılama) ya da "grid" (önbellekli tam grid)
+search_mode = "halving"
+# Kategori başına arama süresi (saniye); bütçe dolunca arama durur ve o ana kadarki en iyi aday seçilir
+search_budget = 60
+# Ardışık yarılamanın ilk turunda param_grid'den rastgele seçilen aday sayısı
+search_candidates = 12
 
-# Klasör yoksa hata ver
-if not os.path.exists(excel_folder):
-    print(f"⚠️ '{excel_folder}' klasörü bulunamadı!")
-    print("Excel klasörü yolunu doğru şekilde güncellemeniz gerekiyor.")
-    exit()
+# Eğitimin kullanacağı toplam çekirdek (None: tümü); eşzamanlı kategoriler ve arama işçileri arasında bölünür
+training_cores = None
+
+# Yorumların n-gram sayımları bu klasörde saklanır; kategoriler ve tekrar eğitimler aynı sayımları kullanır (None: kapalı)
+feature_cache_dir = os.path.join(output_dir, "features")
+
+# --- END CONFIGURATION ---
 
 # Türkçe stop word listesi - Genişletildi ve daha agresif hale getirildi
 turkish_stop_words = [
@@ -69,48 +86,11 @@ TARGET_ACCURACY_MAX = 0.85
 # Eğitim ve test seti arasındaki maksimum kabul edilebilir fark
 MAX_ACC_DIFF = 0.15  # %15'e düşürüldü - daha az overfitting istiyoruz
 
-# Öğrenme seti performans sonuçlarını tutacak liste
-ogrenme_performanslari = []
-
-# Test seti performans sonuçlarını tutacak liste
-test_performanslari = []
-
-# Zaman ölçümü başlat
-start_time = time.time()
-
-print("🚀 MODEL EĞİTİMİ BAŞLADI")
-print("------------------------")
-print(f"📂 Excel klasörü: {excel_folder}")
-print(f"🎯 Hedef doğruluk aralığı: %{TARGET_ACCURACY_MIN*100:.0f}-%{TARGET_ACCURACY_MAX*100:.0f}")
-print(f"🔍 Maksimum kabul edilebilir eğitim-test farkı: %{MAX_ACC_DIFF*100:.0f}")
-
-# Excel dosyalarını al
-try:
-    excel_files = [f for f in os.listdir(excel_folder) if f.endswith('.xlsx') or f.endswith('.xls')]
-    if not excel_files:
-        print("⚠️ Klasörde Excel dosyası bulunamadı!")
-        exit()
-    print(f"\n📁 Toplam işlenecek dosya sayısı: {len(excel_files)}\n")
-except Exception as e:
-    print(f"⚠️ Klasör okuma hatası: {str(e)}")
-    exit()
-
-# Metin temizleme fonksiyonu
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-    # Küçük harfe dönüştür
-    text = text.lower()
-    # Rakamları kaldır
-    text = re.sub(r'\d+', '', text)
-    # Özel karakterleri kaldır
-    text = re.sub(r'[^\w\s]', '', text)
-    # Fazla boşlukları temizle
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-# Dense Transformer - lambda kullanmadan
-dense_transformer = FunctionTransformer(make_dense, accept_sparse=True)
+
+def make_vectorizer():
+    """Kategori modelleri için TF-IDF vektörleştirici (daha az özellik - 300 ile sınırlandırıldı)"""
+    return TfidfVectorizer(max_features=300, stop_words=turkish_stop_words, ngram_range=(1, 2))
+
 
 # 7 algoritmalı ensemble model oluştur (daha güçlü regularizasyon parametreleri)
 models = [
@@ -120,7 +100,7 @@ models = [
     ('bagging', BaggingClassifier(n_estimators=100, max_samples=0.7, max_features=0.7, random_state=42)),
     ('lr', LogisticRegression(C=0.2, max_iter=1000, penalty='l2', random_state=42)),  # C değeri daha da düşürüldü
     ('svm', SVC(C=0.2, probability=True, kernel='linear', random_state=42)),  # C değeri daha da düşürüldü
-    ('mnb', make_pipeline(dense_transformer, MultinomialNB(alpha=2.0))),  # Alpha değeri daha da artırıldı
+    ('mnb', MultinomialNB(alpha=2.0)),  # Alpha değeri daha da artırıldı; sparse TF-IDF doğrudan kullanılır
     ('gb', GradientBoostingClassifier(n_estimators=100, max_depth=3, learning_rate=0.03, subsample=0.7, 
                                      validation_fraction=0.2, n_iter_no_change=5, random_state=42))  # Early stopping eklendi
 ]
@@ -128,12 +108,13 @@ models = [
 # Ensemble model
 ensemble = VotingClassifier(estimators=models, voting='soft')
 
-# GridSearch için daha fazla zaman tanı
-print("⚙️ Grid Search çalışıyor (daha uzun sürebilir)...")
 
 # 10-katlı çapraz doğrulama (daha iyi genelleme için)
 cv = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
 
+# Ardışık yarılamada adaylar 3 katlı çapraz doğrulamayla karşılaştırılır (grid modu yukarıdaki cv'yi kullanır)
+search_cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
+
 # GridSearch parametre gridi (düşük overfitting için daha güçlü regularizasyon)
 param_grid = {
     'rf__n_estimators': [100, 150, 200],
@@ -148,318 +129,438 @@ param_grid = {
 # TF-IDF ile metin özellikleştirme (daha az özellik - 400 ile sınırlandırıldı)
 tfidf = TfidfVectorizer(max_features=300, stop_words=turkish_stop_words, ngram_range=(1, 2))
 
-# Her Excel dosyası için model eğitimi yap
-for file_idx, file in enumerate(excel_files):
-    print(f"\n🔄 İşleniyor: {file} ({file_idx+1}/{len(excel_files)})")
+def read_category_excel(file_path):
+    """Etiketli kategori Excel dosyasını oku; okunamazsa None döndür"""
+    # Excel dosyasını oku
+    print(f"   📄 Dosya yolu: {file_path}")
     
-    try:
-        # Excel dosyasını oku
-        file_path = os.path.join(excel_folder, file)
-        print(f"   📄 Dosya yolu: {file_path}")
+    if not os.path.exists(file_path):
+        print(f"⚠️ Dosya bulunamadı: {file_path}")
+        return None
         
-        if not os.path.exists(file_path):
-            print(f"⚠️ Dosya bulunamadı: {file_path}")
-            continue
-            
+    if not file_path.lower().endswith(('.xlsx', '.xls')):
         try:
-            df = pd.read_excel(file_path, engine='openpyxl')
+            return read_table(file_path)
         except Exception as e:
-            print(f"⚠️ Excel okuma hatası (openpyxl): {str(e)}")
-            print("   🔄 'xlrd' motoru ile yeniden deneniyor...")
-            try:
-                df = pd.read_excel(file_path, engine='xlrd')
-            except Exception as e2:
-                print(f"⚠️ Excel okuma hatası (xlrd): {str(e2)}")
-                print("   ⏭️ Bu dosya atlanıyor.")
-                continue
-        
-        # Temel kontroller
-        if df.empty:
-            print(f"⚠️ Excel dosyası boş: {file}")
-            continue
-            
-        print(f"   ℹ️ Sütunlar: {', '.join(df.columns.tolist())}")
+            print(f"⚠️ Dosya okuma hatası: {str(e)}")
+            print("   ⏭️ Bu dosya atlanıyor.")
+            return None
         
-        # Özel kontrol - beklenen sütunların varlığı ('Tarih', 'Yorum', 'Sonuç')
-        expected_columns = ['Yorum', 'Sonuç']
-        
-        # Sütun adları ile çalışırken büyük/küçük harf ve boşluk sorunları için düzeltme
-        df.columns = df.columns.str.strip()
-        column_mapping = {}
-        for col in df.columns:
-            clean_col = col.lower().strip()
-            if clean_col == 'yorum':
-                column_mapping[col] = 'Yorum'
-            elif clean_col == 'sonuç' or clean_col == 'sonuc':
-                column_mapping[col] = 'Sonuç'
-            elif clean_col == 'tarih':
-                column_mapping[col] = 'Tarih'
-        
-        if column_mapping:
-            df = df.rename(columns=column_mapping)
-        
-        missing_columns = [col for col in expected_columns if col not in df.columns]
-        if missing_columns:
-            print(f"⚠️ Uyarı: {file} dosyasında gerekli sütunlar {', '.join(missing_columns)} bulunamadı!")
-            print(f"   Mevcut sütunlar: {', '.join(df.columns.tolist())}")
-            continue
-            
-        # NaN değerleri temizle
-        row_count_before = len(df)
-        df.dropna(subset=['Yorum', 'Sonuç'], inplace=True)
-        row_count_after = len(df)
-        
-        if row_count_before != row_count_after:
-            print(f"   ℹ️ {row_count_before - row_count_after} satır NaN değerler nedeniyle kaldırıldı")
-        
-        if df.empty:
-            print(f"⚠️ NaN temizlemeden sonra veri kalmadı: {file}")
-            continue
-        
-        # Veri tiplerini kontrol et
+    try:
+        df = pd.read_excel(file_path, engine='openpyxl')
+    except Exception as e:
+        print(f"⚠️ Excel okuma hatası (openpyxl): {str(e)}")
+        print("   🔄 'xlrd' motoru ile yeniden deneniyor...")
         try:
-            # 'Sonuç' sütununun içeriğini görüntüle
-            print(f"   ℹ️ 'Sonuç' sütunu değerleri: {df['Sonuç'].value_counts().to_dict()}")
-            
-            # Sonuç değerleri 0 ve 1 olacak şekilde dönüştür
-            df['Sonuç'] = df['Sonuç'].astype(str).str.strip()
-            
-            # Sonuç değerlerini dönüştür - function kullanımı (lambda yerine)
-            def convert_to_binary(x):
-                if x.lower() in ['1', 'true', 'evet', 'yes', 'positive', 'pozitif']:
-                    return 1
-                return 0
-                
-            df['Sonuç'] = df['Sonuç'].apply(convert_to_binary)
-            print(f"   ℹ️ Dönüştürülmüş 'Sonuç' sütunu değerleri: {df['Sonuç'].value_counts().to_dict()}")
-        except Exception as e:
-            print(f"⚠️ 'Sonuç' sütunu dönüştürme hatası: {str(e)}")
-            # Farklı hata ayıklama bilgileri ekleyelim
-            print(f"   ℹ️ 'Sonuç' sütunu veri tipi: {df['Sonuç'].dtype}")
-            print(f"   ℹ️ İlk 5 'Sonuç' değeri: {df['Sonuç'].head().tolist()}")
-            continue
-        
-        # Metin temizleme uygula
-        df['Yorum'] = df['Yorum'].apply(clean_text)
-        
-        # Boş yorumları kaldır
-        df = df[df['Yorum'].str.strip() != '']
-        
-        # Kategori ismi oluştur (dosya adından)
-        category = file.split('.')[0]
-        
-        # Veriyi ayır
-        X = df['Yorum'].astype(str)  # String'e dönüştür
-        y = df['Sonuç']
-        
-        print(f"📊 Veri seti: Toplam={len(df)}, Pozitif={sum(y)}, Negatif={len(df)-sum(y)}")
-        
-        # Orta seviye test-train split (%30 test)
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.30, random_state=42, stratify=y)
+            df = pd.read_excel(file_path, engine='xlrd')
+        except Exception as e2:
+            print(f"⚠️ Excel okuma hatası (xlrd): {str(e2)}")
+            print("   ⏭️ Bu dosya atlanıyor.")
+            return None
+    
+    return df
+
+def prepare_category_frame(df, name):
+    """Sütun adlarını düzelt, 'Sonuç' değerlerini 0/1'e çevir ve yorumları temizle; uygun değilse None döndür"""
+    # Temel kontroller
+    if df.empty:
+        print(f"⚠️ Excel dosyası boş: {name}")
+        return None
+        
+    print(f"   ℹ️ Sütunlar: {', '.join(df.columns.tolist())}")
+    
+    # Özel kontrol - beklenen sütunların varlığı ('Tarih', 'Yorum', 'Sonuç')
+    expected_columns = ['Yorum', 'Sonuç']
+    
+    # Sütun adları ile çalışırken büyük/küçük harf ve boşluk sorunları için düzeltme
+    df.columns = df.columns.str.strip()
+    column_mapping = {}
+    for col in df.columns:
+        clean_col = col.lower().strip()
+        if clean_col == 'yorum':
+            column_mapping[col] = 'Yorum'
+        elif clean_col == 'sonuç' or clean_col == 'sonuc':
+            column_mapping[col] = 'Sonuç'
+        elif clean_col == 'tarih':
+            column_mapping[col] = 'Tarih'
+    
+    if column_mapping:
+        df = df.rename(columns=column_mapping)
+    
+    missing_columns = [col for col in expected_columns if col not in df.columns]
+    if missing_columns:
+        print(f"⚠️ Uyarı: {name} dosyasında gerekli sütunlar {', '.join(missing_columns)} bulunamadı!")
+        print(f"   Mevcut sütunlar: {', '.join(df.columns.tolist())}")
+        return None
+        
+    # NaN değerleri temizle
+    row_count_before = len(df)
+    df.dropna(subset=['Yorum', 'Sonuç'], inplace=True)
+    row_count_after = len(df)
+    
+    if row_count_before != row_count_after:
+        print(f"   ℹ️ {row_count_before - row_count_after} satır NaN değerler nedeniyle kaldırıldı")
+    
+    if df.empty:
+        print(f"⚠️ NaN temizlemeden sonra veri kalmadı: {name}")
+        return None
+    
+    # Veri tiplerini kontrol et
+    try:
+        # 'Sonuç' sütununun içeriğini görüntüle
+        print(f"   ℹ️ 'Sonuç' sütunu değerleri: {df['Sonuç'].value_counts().to_dict()}")
         
-        print(f"   ℹ️ Eğitim/test oranı: {len(X_train)}/{len(X_test)} (%{len(X_train)*100/len(X):.0f}/%{len(X_test)*100/len(X):.0f})")
+        # Sonuç değerleri 0 ve 1 olacak şekilde dönüştür
+        df['Sonuç'] = df['Sonuç'].astype(str).str.strip()
         
-        # TF-IDF ile metin özellikleştirme (daha az özellik - 400 ile sınırlandırıldı)
-        tfidf = TfidfVectorizer(max_features=300, stop_words=turkish_stop_words, ngram_range=(1, 2))
+        # Sonuç değerlerini dönüştür - function kullanımı (lambda yerine)
+        def convert_to_binary(x):
+            if x.lower() in ['1', 'true', 'evet', 'yes', 'positive', 'pozitif']:
+                return 1
+            return 0
+            
+        df['Sonuç'] = df['Sonuç'].apply(convert_to_binary)
+        print(f"   ℹ️ Dönüştürülmüş 'Sonuç' sütunu değerleri: {df['Sonuç'].value_counts().to_dict()}")
+    except Exception as e:
+        print(f"⚠️ 'Sonuç' sütunu dönüştürme hatası: {str(e)}")
+        # Farklı hata ayıklama bilgileri ekleyelim
+        print(f"   ℹ️ 'Sonuç' sütunu veri tipi: {df['Sonuç'].dtype}")
+        print(f"   ℹ️ İlk 5 'Sonuç' değeri: {df['Sonuç'].head().tolist()}")
+        return None
+    
+    # Metin temizleme uygula
+    df['Yorum'] = clean_texts(df['Yorum'])
+    
+    # Boş yorumları kaldır
+    df = df[df['Yorum'].str.strip() != '']
+    
+    return df
+
+def train_category(category, df, model_dir=model_dir, distill=distill, features=None, search_mode=search_mode,
+                   search_budget=search_budget, n_jobs=-1):
+    """Tek bir kategori için ensemble modeli eğit ve kaydet; (öğrenme, test) performanslarını döndür.
+
+    distill=True ise ensemble'ın yumuşak oylarına bir lojistik regresyon öğrenci uydurulup pakete
+    eklenir; öğretmenle test setindeki uyumu performans tablosuna yazılır. features (özellik
+    deposu anlık görüntüsü) verilirse TF-IDF, metinler yeniden tokenize edilmeden sayımlardan kurulur.
+    search_mode="halving" ise parametre araması search_budget saniyeyle sınırlıdır. n_jobs, aramanın
+    kullanacağı çekirdek sayısıdır (zamanlayıcı kategorilere bölüştürür).
+    """
+    print(f"\n🔄 İşleniyor: {category}")
+    # Veriyi ayır
+    X = df['Yorum'].astype(str)  # String'e dönüştür
+    y = df['Sonuç']
+    
+    print(f"📊 Veri seti: Toplam={len(df)}, Pozitif={sum(y)}, Negatif={len(df)-sum(y)}")
+    
+    # Orta seviye test-train split (%30 test)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.30, random_state=42, stratify=y)
+    
+    print(f"   ℹ️ Eğitim/test oranı: {len(X_train)}/{len(X_test)} (%{len(X_train)*100/len(X):.0f}/%{len(X_test)*100/len(X):.0f})")
+    
+    # TF-IDF ile metin özellikleştirme
+    tfidf = make_vectorizer()
+    if features is not None:
+        X_train_vec = features.fit_transform(tfidf, X_train)
+        X_test_vec = features.transform(tfidf, X_test)
+    else:
         X_train_vec = tfidf.fit_transform(X_train)
         X_test_vec = tfidf.transform(X_test)
+    
+    print(f"   ℹ️ Özellik sayısı: {X_train_vec.shape[1]}")
+    
+    # SMOTE ile dengeleme
+    try:
+        smote = SMOTE(random_state=42)
+        X_train_res, y_train_res = smote.fit_resample(X_train_vec, y_train)
+        print(f"   ℹ️ SMOTE sonrası eğitim seti: Pozitif={sum(y_train_res)}, Negatif={len(y_train_res)-sum(y_train_res)}")
+    except Exception as e:
+        print(f"   ⚠️ SMOTE hatası: {str(e)}")
+        X_train_res, y_train_res = X_train_vec, y_train
+        print("   ℹ️ SMOTE kullanılamadı, orijinal veri kullanılıyor.")
+    
+    search_report = None
+    try:
+        if search_mode == "grid":
+            print("⚙️ Grid Search çalışıyor (alt model olasılıkları önbellekte)...")
+            # GridSearch daha kısa sürede tamamlanması için değerlerin sayısını azalt (en fazla 2 değer)
+            param_sample = {param: values[:2] for param, values in param_grid.items()}
+            # Her alt model kat ve kendi ayarı başına bir kez eğitilir; sonuç GridSearchCV ile aynıdır
+            best_model, search_report = cached_voting_search(ensemble, param_sample, X_train_res, y_train_res, cv,
+                                                             n_jobs=n_jobs)
+            print_cached_search_report(search_report)
+        else:
+            print(f"⚙️ Ardışık yarılama ile parametre araması (bütçe: {search_budget:.0f} sn)...")
+            best_model, search_report = successive_halving_search(ensemble, param_grid, X_train_res, y_train_res,
+                                                                  search_cv, search_budget, n_candidates=search_candidates,
+                                                                  n_jobs=n_jobs)
+            print_search_report(search_report)
+        best_model_name = "ensemble"
+    except Exception as e:
+        print(f"⚠️ Parametre araması hatası: {str(e)}")
+        print("   🔄 Daha basit model kullanılacak...")
         
-        print(f"   ℹ️ Özellik sayısı: {X_train_vec.shape[1]}")
-        
-        # SMOTE ile dengeleme
+        # Basit model ile devam et
+        best_model = models[0][1]  # RandomForest
+        best_model.fit(X_train_res, y_train_res)
+        best_model_name = "ensemble"  # Her durumda ensemble olarak adlandır
+    
+    # Eğitim setinde performans kontrolü
+    y_train_pred = best_model.predict(X_train_res)
+    train_acc = accuracy_score(y_train_res, y_train_pred)
+    
+    # Test setinde performans kontrolü (overfitting değerlendirmesi için)
+    y_test_pred = best_model.predict(X_test_vec)
+    test_acc = accuracy_score(y_test, y_test_pred)
+    
+    print(f"   ℹ️ Train Accuracy: {train_acc:.4f}, Test Accuracy: {test_acc:.4f}")
+    print(f"   ℹ️ Accuracy Farkı: {train_acc - test_acc:.4f}")
+    
+    # Overfitting değerlendirmesi
+    if train_acc - test_acc > MAX_ACC_DIFF:
+        print(f"   ⚠️ DİKKAT: Yüksek overfitting! Eğitim-Test farkı %{(train_acc-test_acc)*100:.1f}")
+    else:
+        print(f"   ✅ Makul genelleme: Eğitim-Test farkı %{(train_acc-test_acc)*100:.1f}")
+    
+    # Performans metrikleri
+    train_prec = precision_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
+    train_rec = recall_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
+    train_f1 = f1_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
+    
+    test_prec = precision_score(y_test, y_test_pred, average='weighted', zero_division=0)
+    test_rec = recall_score(y_test, y_test_pred, average='weighted', zero_division=0)
+    test_f1 = f1_score(y_test, y_test_pred, average='weighted', zero_division=0)
+    
+    # Öğrenme seti performanslarını kaydet
+    train_perf = {
+        'Kategori': category,
+        'Model': best_model_name,
+        'Accuracy': train_acc,
+        'Precision': train_prec,
+        'Recall': train_rec,
+        'F1': train_f1
+    }
+    
+    # Test seti performanslarını kaydet
+    test_perf = {
+        'Kategori': category,
+        'Model': best_model_name,
+        'Accuracy': test_acc,
+        'Precision': test_prec,
+        'Recall': test_rec,
+        'F1': test_f1,
+        'Acc_Fark': train_acc - test_acc
+    }
+    if search_report is not None:
+        test_perf['Arama_Fit'] = search_report['fit']
+        test_perf['Arama_Sure'] = search_report['sure']
+        test_perf['CV_Skor'] = search_report['en_iyi_skor']
+    
+    student, student_report = None, None
+    if distill:
         try:
-            smote = SMOTE(random_state=42)
-            X_train_res, y_train_res = smote.fit_resample(X_train_vec, y_train)
-            print(f"   ℹ️ SMOTE sonrası eğitim seti: Pozitif={sum(y_train_res)}, Negatif={len(y_train_res)-sum(y_train_res)}")
+            student, student_report = distill_model(best_model, X_train_res, X_test_vec, y_test)
+            print_distillation_report(student_report)
+            test_perf['Ogrenci_Uyum'] = student_report['uyum']
         except Exception as e:
-            print(f"   ⚠️ SMOTE hatası: {str(e)}")
-            X_train_res, y_train_res = X_train_vec, y_train
-            print("   ℹ️ SMOTE kullanılamadı, orijinal veri kullanılıyor.")
-        
-        # GridSearch için daha fazla zaman tanı
-        print("⚙️ Grid Search çalışıyor (daha uzun sürebilir)...")
-        
-        try:
-            # GridSearch'e maksimum 5 dakika tanı
-            grid_search_start = time.time()
-            grid_search_max_time = 5 * 60  # 5 dakika
-            
-            print(f"   ℹ️ GridSearch için maksimum süre: 5 dakika")
-            
-            # GridSearch için timeout kontrolü
-            def timeout_handler():
-                if time.time() - grid_search_start > grid_search_max_time:
-                    print("   ⚠️ GridSearch zaman aşımı - işlem durduruldu")
-                    return True
-                return False
-            
-            # GridSearch daha kısa sürede tamamlanması için
-            param_sample = {}
-            for param, values in param_grid.items():
-                # Değerlerin sayısını azalt (en fazla 2 değer)
-                param_sample[param] = values[:2] if len(values) > 2 else values
-            
-            # Küçültülmüş parametre seti ile GridSearch
-            grid_search = GridSearchCV(ensemble, param_sample, cv=cv, scoring='accuracy', n_jobs=-1, verbose=1)
-            
-            try:
-                # GridSearch çalıştır, zaman aşımı kontrolü yap
-                grid_search.fit(X_train_res, y_train_res)
-            except Exception as timeout_e:
-                print(f"   ⚠️ GridSearch işlemi yarıda kesildi: {str(timeout_e)}")
-                # Default modele geri dön
-                best_model = ensemble
-                best_model.fit(X_train_res, y_train_res)
-                best_model_name = "ensemble"
-                print("   ℹ️ Default ensemble model kullanılıyor.")
+            print(f"   ⚠️ Damıtma yapılamadı: {str(e)}")
+    
+    # Modeli manifest'li paket olarak kaydet (diziler sıkıştırmasız, bellek eşlemeli yüklenebilir)
+    model_path = save_bundle(best_model, tfidf, model_dir, category,
+                             metrics={'ogrenme': train_perf, 'test': test_perf},
+                             student=student, student_report=student_report)
+    print(f"💾 Model kaydedildi: {os.path.basename(model_path)}")
+    
+    print(f"✅ {category} için model eğitildi")
+    print(f"   ➤ Öğrenme Seti Performansı:")
+    print(f"     ◆ Accuracy:  {train_acc:.4f}")
+    print(f"     ◆ Precision: {train_prec:.4f}")
+    print(f"     ◆ Recall:    {train_rec:.4f}")
+    print(f"     ◆ F1-Score:  {train_f1:.4f}")
+    print(f"   ➤ Test Seti Performansı:")
+    print(f"     ◆ Accuracy:  {test_acc:.4f}")
+    print(f"     ◆ Precision: {test_prec:.4f}")
+    print(f"     ◆ Recall:    {test_rec:.4f}")
+    print(f"     ◆ F1-Score:  {test_f1:.4f}")
+    print(f"   ➤ Overfitting Değerlendirmesi:")
+    print(f"     ◆ Accuracy Farkı: {train_acc - test_acc:.4f}")
+    
+    return train_perf, test_perf
+
+def save_reports(ogrenme_performanslari, test_performanslari, report_dir=report_dir):
+    """Öğrenme/test performanslarını ve özet tabloyu Excel'e kaydet"""
+    # Öğrenme ve test seti performanslarını Excel'e kaydet
+    try:
+        if ogrenme_performanslari:
+            performans_df = pd.DataFrame(ogrenme_performanslari)
+            performans_df.to_excel(os.path.join(report_dir, "ogrenme_seti_performanslari.xlsx"), index=False)
+            print("\n✅ Öğrenme seti performans metrikleri 'ogrenme_seti_performanslari.xlsx' dosyasına kaydedildi.")
+    
+        if test_performanslari:
+            test_performans_df = pd.DataFrame(test_performanslari)
+            test_performans_df.to_excel(os.path.join(report_dir, "test_seti_performanslari.xlsx"), index=False)
+            print("\n✅ Test seti performans metrikleri 'test_seti_performanslari.xlsx' dosyasına kaydedildi.")
+        
+            # Genel başarı analizi
+            avg_test_acc = test_performans_df['Accuracy'].mean()
+            avg_train_acc = performans_df['Accuracy'].mean()
+            avg_diff = avg_train_acc - avg_test_acc
+        
+            print("\n📊 GENEL PERFORMANS ANALİZİ:")
+            print(f"   → Ortalama Eğitim Doğruluğu: {avg_train_acc:.4f}")
+            print(f"   → Ortalama Test Doğruluğu: {avg_test_acc:.4f}")
+            print(f"   → Ortalama Fark: {avg_diff:.4f}")
+        
+            if avg_diff > MAX_ACC_DIFF:
+                print(f"   ⚠️ DİKKAT: Genel olarak yüksek overfitting eğilimi!")
             else:
-                grid_search_time = time.time() - grid_search_start
-                print(f"   ℹ️ GridSearch süresi: {grid_search_time/60:.2f} dakika")
-                
-                best_model = grid_search.best_estimator_
-                best_model_name = "ensemble"
-        except Exception as e:
-            print(f"⚠️ GridSearch hatası: {str(e)}")
-            print("   🔄 Daha basit model kullanılacak...")
-            
-            # Basit model ile devam et
-            best_model = models[0][1]  # RandomForest
-            best_model.fit(X_train_res, y_train_res)
-            best_model_name = "ensemble"  # Her durumda ensemble olarak adlandır
-        
-        # Eğitim setinde performans kontrolü
-        y_train_pred = best_model.predict(X_train_res)
-        train_acc = accuracy_score(y_train_res, y_train_pred)
-        
-        # Test setinde performans kontrolü (overfitting değerlendirmesi için)
-        y_test_pred = best_model.predict(X_test_vec)
-        test_acc = accuracy_score(y_test, y_test_pred)
-        
-        print(f"   ℹ️ Train Accuracy: {train_acc:.4f}, Test Accuracy: {test_acc:.4f}")
-        print(f"   ℹ️ Accuracy Farkı: {train_acc - test_acc:.4f}")
-        
-        # Overfitting değerlendirmesi
-        if train_acc - test_acc > MAX_ACC_DIFF:
-            print(f"   ⚠️ DİKKAT: Yüksek overfitting! Eğitim-Test farkı %{(train_acc-test_acc)*100:.1f}")
-        else:
-            print(f"   ✅ Makul genelleme: Eğitim-Test farkı %{(train_acc-test_acc)*100:.1f}")
-        
-        # Performans metrikleri
-        train_prec = precision_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
-        train_rec = recall_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
-        train_f1 = f1_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
-        
-        test_prec = precision_score(y_test, y_test_pred, average='weighted', zero_division=0)
-        test_rec = recall_score(y_test, y_test_pred, average='weighted', zero_division=0)
-        test_f1 = f1_score(y_test, y_test_pred, average='weighted', zero_division=0)
-        
-        # Öğrenme seti performanslarını kaydet
-        ogrenme_performanslari.append({
-            'Kategori': category,
-            'Model': best_model_name,
-            'Accuracy': train_acc,
-            'Precision': train_prec,
-            'Recall': train_rec,
-            'F1': train_f1
-        })
-        
-        # Test seti performanslarını kaydet
-        test_performanslari.append({
-            'Kategori': category,
-            'Model': best_model_name,
-            'Accuracy': test_acc,
-            'Precision': test_prec,
-            'Recall': test_rec,
-            'F1': test_f1,
-            'Acc_Fark': train_acc - test_acc
-        })
-        
-        # Modeli kaydet
-        model_filename = f"model_{category}.pkl"
-        model_path = os.path.join(model_dir, model_filename)
-        joblib.dump({'model': best_model, 'vectorizer': tfidf}, model_path)
-        print(f"💾 Model kaydedildi: {model_filename}")
-        
-        print(f"✅ {category} için model eğitildi")
-        print(f"   ➤ Öğrenme Seti Performansı:")
-        print(f"     ◆ Accuracy:  {train_acc:.4f}")
-        print(f"     ◆ Precision: {train_prec:.4f}")
-        print(f"     ◆ Recall:    {train_rec:.4f}")
-        print(f"     ◆ F1-Score:  {train_f1:.4f}")
-        print(f"   ➤ Test Seti Performansı:")
-        print(f"     ◆ Accuracy:  {test_acc:.4f}")
-        print(f"     ◆ Precision: {test_prec:.4f}")
-        print(f"     ◆ Recall:    {test_rec:.4f}")
-        print(f"     ◆ F1-Score:  {test_f1:.4f}")
-        print(f"   ➤ Overfitting Değerlendirmesi:")
-        print(f"     ◆ Accuracy Farkı: {train_acc - test_acc:.4f}")
+                print(f"   ✅ Genel olarak makul genelleme")
+    
+        # Özet tablosu oluştur ve kaydet
+        summary_data = []
+        for i in range(len(test_performanslari)):
+            summary_data.append({
+                'Kategori': test_performanslari[i]['Kategori'],
+                'Model': test_performanslari[i]['Model'],
+                'Train_Accuracy': ogrenme_performanslari[i]['Accuracy'],
+                'Test_Accuracy': test_performanslari[i]['Accuracy'],
+                'Accuracy_Farkı': ogrenme_performanslari[i]['Accuracy'] - test_performanslari[i]['Accuracy'],
+                'Train_F1': ogrenme_performanslari[i]['F1'],
+                'Test_F1': test_performanslari[i]['F1'],
+                'Sure_Sn': test_performanslari[i].get('Sure_Sn'),
+                'CPU_Kullanim': test_performanslari[i].get('CPU_Kullanim')
+            })
+    
+        summary_df = pd.DataFrame(summary_data)
+        summary_df.to_excel(os.path.join(report_dir, "model_ozet.xlsx"), index=False)
+        print("\n✅ Model özet tablosu 'model_ozet.xlsx' dosyasına kaydedildi.")
         
     except Exception as e:
-        print(f"⚠️ {file} dosyası işlenirken hata oluştu: {str(e)}")
-        import traceback
-        print(traceback.format_exc())  # Detaylı hata mesajını yazdır
+        print(f"\n⚠️ Excel dosyası oluşturulurken hata: {str(e)}")
+        # Ekrana yazdır
+        if ogrenme_performanslari:
+            print("\n📊 ÖĞRENME SETİ PERFORMANS METRİKLERİ:")
+            for perf in ogrenme_performanslari:
+                print(f"   → {perf['Kategori']} ({perf['Model']}): Accuracy={perf['Accuracy']:.4f}, F1={perf['F1']:.4f}")
+    
+        if test_performanslari:
+            print("\n📊 TEST SETİ PERFORMANS METRİKLERİ:")
+            for perf in test_performanslari:
+                print(f"   → {perf['Kategori']} ({perf['Model']}): Accuracy={perf['Accuracy']:.4f}, F1={perf['F1']:.4f}, Fark={perf['Acc_Fark']:.4f}")
+        else:
+            print("\n⚠️ Hiçbir model eğitilemedi.")
 
-# Öğrenme ve test seti performanslarını Excel'e kaydet
-try:
-    if ogrenme_performanslari:
-        performans_df = pd.DataFrame(ogrenme_performanslari)
-        performans_df.to_excel(os.path.join(report_dir, "ogrenme_seti_performanslari.xlsx"), index=False)
-        print("\n✅ Öğrenme seti performans metrikleri 'ogrenme_seti_performanslari.xlsx' dosyasına kaydedildi.")
-    
-    if test_performanslari:
-        test_performans_df = pd.DataFrame(test_performanslari)
-        test_performans_df.to_excel(os.path.join(report_dir, "test_seti_performanslari.xlsx"), index=False)
-        print("\n✅ Test seti performans metrikleri 'test_seti_performanslari.xlsx' dosyasına kaydedildi.")
-        
-        # Genel başarı analizi
-        avg_test_acc = test_performans_df['Accuracy'].mean()
-        avg_train_acc = performans_df['Accuracy'].mean()
-        avg_diff = avg_train_acc - avg_test_acc
-        
-        print("\n📊 GENEL PERFORMANS ANALİZİ:")
-        print(f"   → Ortalama Eğitim Doğruluğu: {avg_train_acc:.4f}")
-        print(f"   → Ortalama Test Doğruluğu: {avg_test_acc:.4f}")
-        print(f"   → Ortalama Fark: {avg_diff:.4f}")
+def train_models(excel_folder=excel_folder, model_dir=model_dir, report_dir=report_dir, frames=None, distill=distill,
+                 feature_cache_dir=feature_cache_dir, search_mode=search_mode, search_budget=search_budget,
+                 cores=training_cores):
+    """Tüm kategoriler için model eğit.
+
+    frames ({kategori: DataFrame}) verilirse Excel klasörü okunmaz; etiketleme aşamasının
+    çıktısı doğrudan kullanılır. distill=True ise her model için öğrenci model de kaydedilir.
+    Tüm kategorilerin yorumları bir kez tokenize edilir; sayımlar feature_cache_dir'de saklanır
+    (None ise yalnızca bellekte). Kategoriler cores çekirdeklik bütçe altında eşzamanlı eğitilir;
+    süre ve CPU kullanımı rapora yazılır. Test seti performanslarının listesini döndürür.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    os.makedirs(report_dir, exist_ok=True)
+    
+    # Öğrenme seti performans sonuçlarını tutacak liste
+    ogrenme_performanslari = []
+    
+    # Test seti performans sonuçlarını tutacak liste
+    test_performanslari = []
+    
+    # Zaman ölçümü başlat
+    start_time = time.time()
+    
+    print("🚀 MODEL EĞİTİMİ BAŞLADI")
+    print("------------------------")
+    if frames is None:
+        print(f"📂 Excel klasörü: {excel_folder}")
+    print(f"🎯 Hedef doğruluk aralığı: %{TARGET_ACCURACY_MIN*100:.0f}-%{TARGET_ACCURACY_MAX*100:.0f}")
+    print(f"🔍 Maksimum kabul edilebilir eğitim-test farkı: %{MAX_ACC_DIFF*100:.0f}")
+    
+    if frames is None:
+        # Klasör yoksa hata ver
+        if not os.path.exists(excel_folder):
+            print(f"⚠️ '{excel_folder}' klasörü bulunamadı!")
+            print("Excel klasörü yolunu doğru şekilde güncellemeniz gerekiyor.")
+            return []
+        
+        # Excel dosyalarını al
+        try:
+            excel_files = [f for f in os.listdir(excel_folder) if is_table_file(f)]
+            if not excel_files:
+                print("⚠️ Klasörde Excel/Parquet dosyası bulunamadı!")
+                return []
+            print(f"\n📁 Toplam işlenecek dosya sayısı: {len(excel_files)}\n")
+        except Exception as e:
+            print(f"⚠️ Klasör okuma hatası: {str(e)}")
+            return []
         
-        if avg_diff > MAX_ACC_DIFF:
-            print(f"   ⚠️ DİKKAT: Genel olarak yüksek overfitting eğilimi!")
-        else:
-            print(f"   ✅ Genel olarak makul genelleme")
-    
-    # Özet tablosu oluştur ve kaydet
-    summary_data = []
-    for i in range(len(test_performanslari)):
-        summary_data.append({
-            'Kategori': test_performanslari[i]['Kategori'],
-            'Model': test_performanslari[i]['Model'],
-            'Train_Accuracy': ogrenme_performanslari[i]['Accuracy'],
-            'Test_Accuracy': test_performanslari[i]['Accuracy'],
-            'Accuracy_Farkı': ogrenme_performanslari[i]['Accuracy'] - test_performanslari[i]['Accuracy'],
-            'Train_F1': ogrenme_performanslari[i]['F1'],
-            'Test_F1': test_performanslari[i]['F1']
-        })
-    
-    summary_df = pd.DataFrame(summary_data)
-    summary_df.to_excel(os.path.join(report_dir, "model_ozet.xlsx"), index=False)
-    print("\n✅ Model özet tablosu 'model_ozet.xlsx' dosyasına kaydedildi.")
+        # Kategori ismi dosya adından oluşturulur
+        sources = [(os.path.splitext(file)[0], os.path.join(excel_folder, file)) for file in excel_files]
+    else:
+        sources = list(frames.items())
+    
+    # Kategori verilerini hazırla
+    prepared = []
+    for file_idx, (category, source) in enumerate(sources):
+        print(f"\n📥 Hazırlanıyor: {category} ({file_idx+1}/{len(sources)})")
         
-except Exception as e:
-    print(f"\n⚠️ Excel dosyası oluşturulurken hata: {str(e)}")
-    # Ekrana yazdır
+        try:
+            df = read_category_excel(source) if isinstance(source, str) else source.copy()
+            if df is None:
+                continue
+            
+            df = prepare_category_frame(df, category)
+            if df is None:
+                continue
+            prepared.append((category, df))
+        except Exception as e:
+            print(f"⚠️ {category} işlenirken hata oluştu: {str(e)}")
+            import traceback
+            print(traceback.format_exc())  # Detaylı hata mesajını yazdır
+    
+    # Tüm kategorilerin yorumları tek seferde sayıma çevrilir (ya da özellik deposundan açılır)
+    features = None
+    if prepared:
+        try:
+            feature_start = time.time()
+            store = FeatureStore.for_vectorizer(make_vectorizer(), feature_cache_dir)
+            features = store.snapshot([text for _, df in prepared for text in df['Yorum'].astype(str)])
+            kaynak = "özellik deposundan açıldı" if features.from_cache else "hesaplandı"
+            print(f"\n🧮 Sayım matrisi {kaynak}: {features.counts.shape[0]} benzersiz yorum, "
+                  f"{features.counts.shape[1]} terim ({time.time() - feature_start:.2f} sn)")
+        except Exception as e:
+            print(f"⚠️ Özellik deposu kullanılamadı, her kategori ayrı vektörleştirilecek: {str(e)}")
+    
+    # Kategoriler tek çekirdek bütçesi altında eşzamanlı eğitilir; her göreve yalnızca kendi
+    # satırları gider, disk deposundaki sayımlar işçide bellek eşlemesiyle yeniden açılır
+    tasks = []
+    for category, df in prepared:
+        category_features = features.subset(df['Yorum'].astype(str)) if features is not None else None
+        tasks.append((category, (category, df, model_dir, distill, category_features, search_mode, search_budget)))
+    for category, (performances, stats) in run_scheduled(train_category, tasks, cores).items():
+        if isinstance(performances, Exception):
+            print(f"⚠️ {category} işlenirken hata oluştu: {str(performances)}")
+            continue
+        performances[1].update(stats)
+        print(f"⏱️ {category}: {stats['Sure_Sn']:.1f} sn, CPU {stats['CPU_Sn']:.1f} sn, "
+              f"{stats['Cekirdek']} çekirdekte %{stats['CPU_Kullanim']*100:.0f} kullanım")
+        ogrenme_performanslari.append(performances[0])
+        test_performanslari.append(performances[1])
+    
+    save_reports(ogrenme_performanslari, test_performanslari, report_dir)
+    
+    total_time = time.time() - start_time
+    print(f"\n⏱️ Toplam çalışma süresi: {total_time/60:.2f} dakika")
+    print("\n✅ İşlem tamamlandı!")
     if ogrenme_performanslari:
-        print("\n📊 ÖĞRENME SETİ PERFORMANS METRİKLERİ:")
-        for perf in ogrenme_performanslari:
-            print(f"   → {perf['Kategori']} ({perf['Model']}): Accuracy={perf['Accuracy']:.4f}, F1={perf['F1']:.4f}")
-    
-    if test_performanslari:
-        print("\n📊 TEST SETİ PERFORMANS METRİKLERİ:")
-        for perf in test_performanslari:
-            print(f"   → {perf['Kategori']} ({perf['Model']}): Accuracy={perf['Accuracy']:.4f}, F1={perf['F1']:.4f}, Fark={perf['Acc_Fark']:.4f}")
-    else:
-        print("\n⚠️ Hiçbir model eğitilemedi.")
+        print("\n👉 Tahmin yapmak için 'tahmin.py' dosyasını çalıştırabilirsiniz.")
+    
+    return test_performanslari
+
 
-total_time = time.time() - start_time
-print(f"\n⏱️ Toplam çalışma süresi: {total_time/60:.2f} dakika")
-print("\n✅ İşlem tamamlandı!")
-if ogrenme_performanslari:
-    print("\n👉 Tahmin yapmak için 'tahmin.py' dosyasını çalıştırabilirsiniz.") 
\ No newline at end of file
+if __name__ == "__main__":
+    train_models()
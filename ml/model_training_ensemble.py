@@ -1,4 +1,5 @@
 import os
+import sys
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split, GridSearchCV
@@ -7,23 +8,26 @@ from sklearn.ensemble import VotingClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier, BaggingClassifier, AdaBoostClassifier, GradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.naive_bayes import GaussianNB, MultinomialNB
+from sklearn.naive_bayes import MultinomialNB
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.pipeline import make_pipeline
-from sklearn.preprocessing import FunctionTransformer
 from imblearn.over_sampling import SMOTE
 from sklearn.model_selection import StratifiedKFold
-import joblib
 import time
 from textblob import TextBlob
-from tqdm import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
-# Zaman ölçümü başlat
-start_time = time.time()
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.table_io import read_table, is_table_file
+from ml.model_bundle import save_bundle
+from ml.distillation import distill_model, print_distillation_report
+from ml.feature_store import FeatureStore
+from ml.training_scheduler import run_scheduled
+from ml.sparse_naive_bayes import SparseGaussianNB
 
 # ✅ Türkçe stop word listesi
 turkish_stop_words = [
@@ -42,60 +46,15 @@ output_dir = "outputs"
 model_dir = os.path.join(output_dir, "models")
 report_dir = os.path.join(output_dir, "reports")
 
-# Create directories if they don't exist
-os.makedirs(model_dir, exist_ok=True)
-os.makedirs(report_dir, exist_ok=True)
-# --- END CONFIGURATION ---
-
-# 📄 Performans sonuçlarını tutacağımız listeler
-train_results = []
-test_results = []
-all_predictions = []  # Tüm tahminleri tutacak liste
-all_data = pd.DataFrame()  # Tüm verileri birleştirmek için
-
-# Excel dosyalarını al
-excel_files = [f for f in os.listdir(excel_folder) if f.endswith('.xlsx') or f.endswith('.xls')]
-print(f"\n📁 Toplam işlenecek dosya sayısı: {len(excel_files)}\n")
-
-# Tüm verileri bir araya toplama
-for file_idx, file in enumerate(excel_files):
-    print(f"📥 Veri yükleniyor: {file} ({file_idx+1}/{len(excel_files)})")
-    df = pd.read_excel(os.path.join(excel_folder, file))
-    df.dropna(subset=['Yorum', 'Sonuç'], inplace=True)
-    df['Kategori'] = file.split('.')[0]
-    all_data = pd.concat([all_data, df])
-
-print(f"\n✅ Toplam veri sayısı: {len(all_data)}")
-
-# Eğitim ve tahmin veri setlerini oluştur
-train_data = pd.DataFrame()
-predict_data = pd.DataFrame()
-
-for category in all_data['Kategori'].unique():
-    category_data = all_data[all_data['Kategori'] == category].copy()
-    positives = category_data[category_data['Sonuç'] == 1]
-    negatives = category_data[category_data['Sonuç'] == 0]
-    
-    # Pozitif ve negatif örneklerden 400'er tane al (veya mevcut tüm örnekleri)
-    positives_400 = positives.sample(min(400, len(positives)), random_state=42)
-    negatives_400 = negatives.sample(min(400, len(negatives)), random_state=42)
-    
-    # Eğitim setine ekle
-    category_train = pd.concat([positives_400, negatives_400])
-    train_data = pd.concat([train_data, category_train])
-    
-    # Kalan verileri tahmin setine ekle
-    remaining_positives = positives.drop(positives_400.index)
-    remaining_negatives = negatives.drop(negatives_400.index)
-    category_predict = pd.concat([remaining_positives, remaining_negatives])
-    predict_data = pd.concat([predict_data, category_predict])
+# True: her ensemble, tahminde hızlı yol için tek bir lojistik regresyon öğrenciye de damıtılır
+distill = False
 
-print(f"📊 Eğitim veri seti büyüklüğü: {len(train_data)}")
-print(f"📊 Tahmin edilecek veri seti büyüklüğü: {len(predict_data)}")
+# Yorumların kelime sayımları bu klasörde saklanır; kategoriler ve tekrar eğitimler aynı sayımları kullanır (None: kapalı)
+feature_cache_dir = os.path.join(output_dir, "features")
 
-# Eğitim veri setini kaydet
-train_data.to_csv("egitim_veri_seti.csv", index=False)
-predict_data.to_csv("tahmin_edilecek_veri_seti.csv", index=False)
+# Eğitimin kullanacağı toplam çekirdek (None: tümü); eşzamanlı kategoriler ve grid araması arasında bölünür
+training_cores = None
+# --- END CONFIGURATION ---
 
 # Basitleştirilmiş hızlı parametre gridi
 simple_param_grid = {
@@ -114,29 +73,30 @@ extended_param_grid = {
     'ada__n_estimators': [50]
 }
 
-# Her kategori için model eğitimi
-for category in tqdm(train_data['Kategori'].unique(), desc="Kategori İşleniyor"):
+
+def train_ensemble_category(category, category_train, predict_category, model_dir=model_dir, distill=distill,
+                            features=None, n_jobs=-1):
+    """Tek kategori için ensemble modeli eğit, kaydet ve tahmin yap; (eğitim, test, tahminler) döndür.
+
+    n_jobs, grid aramasının kullanacağı çekirdek sayısıdır (zamanlayıcı kategorilere bölüştürür).
+    """
     print(f"\n🔄 İşleniyor: {category}")
-    
+
     # Kategori verilerini al
-    category_train = train_data[train_data['Kategori'] == category].copy()
     X = category_train['Yorum']
     y = category_train['Sonuç']
-    
+
     # TF-IDF ile metin özellik çıkarımı
     tfidf = TfidfVectorizer(max_features=1000, stop_words=turkish_stop_words)
-    X_tfidf = tfidf.fit_transform(X)
-    
+    X_tfidf = features.fit_transform(tfidf, X) if features is not None else tfidf.fit_transform(X)
+
     # Veriyi ayırma
     X_train, X_test, y_train, y_test = train_test_split(X_tfidf, y, test_size=0.2, random_state=42, stratify=y)
-    
+
     # SMOTE ile veri dengeleme
     smote = SMOTE(random_state=42)
     X_train_res, y_train_res = smote.fit_resample(X_train, y_train)
-    
-    # Dense Transformer - sparse matrisi yoğun matrise dönüştürür
-    dense_transformer = FunctionTransformer(lambda x: x.toarray(), accept_sparse=True)
-    
+
     # 11 model oluşturma
     models = [
         ('rf', RandomForestClassifier(random_state=42)),
@@ -146,67 +106,78 @@ for category in tqdm(train_data['Kategori'].unique(), desc="Kategori İşleniyor
         ('knn', KNeighborsClassifier()),
         ('svm', SVC(probability=True, random_state=42)),
         ('dt', DecisionTreeClassifier(random_state=42)),
-        ('gnb', make_pipeline(dense_transformer, GaussianNB())),
-        ('mnb', make_pipeline(dense_transformer, MultinomialNB())),  # 11. algoritma
+        ('gnb', SparseGaussianNB()),  # sparse TF-IDF yoğunlaştırılmadan kullanılır
+        ('mnb', MultinomialNB()),  # 11. algoritma
         ('gb', GradientBoostingClassifier(random_state=42)),
         ('ada', AdaBoostClassifier(random_state=42))
     ]
-    
+
     # Ensemble model oluşturma
     ensemble = VotingClassifier(estimators=models, voting='soft')
-    
+
     # Hızlı grid search ile model eğitimi
     print("⚙️ Grid Search çalışıyor (basit parametre gridi)...")
-    grid_search = GridSearchCV(ensemble, simple_param_grid, cv=3, scoring='accuracy', n_jobs=-1, verbose=1)
+    grid_search = GridSearchCV(ensemble, simple_param_grid, cv=3, scoring='accuracy', n_jobs=n_jobs, verbose=1)
     grid_search.fit(X_train_res, y_train_res)
-    
+
     best_model = grid_search.best_estimator_
-    
+
     # Eğitim seti üzerindeki performans kontrolü
     y_train_pred = best_model.predict(X_train_res)
     train_acc = accuracy_score(y_train_res, y_train_pred)
-    
+
     # Accuracy < 0.80 ise daha kapsamlı grid search çalıştır
     if train_acc < 0.80:
         print(f"⚠️ Uyarı: Eğitim accuracy ({train_acc:.4f}) 0.80'in altında!")
         print("⚙️ Gelişmiş Grid Search çalışıyor...")
-        
+    
         grid_search_extended = GridSearchCV(ensemble, extended_param_grid, cv=3, 
-                                           scoring='accuracy', n_jobs=-1, verbose=1)
+                                           scoring='accuracy', n_jobs=n_jobs, verbose=1)
         grid_search_extended.fit(X_train_res, y_train_res)
         best_model = grid_search_extended.best_estimator_
-        
+    
         # Tekrar performans kontrolü
         y_train_pred = best_model.predict(X_train_res)
         train_acc = accuracy_score(y_train_res, y_train_pred)
-        
+    
         if train_acc < 0.80:
             print(f"⚠️ Hala accuracy yetersiz: {train_acc:.4f}")
-    
+
     # Tüm performans metriklerini hesapla
     train_prec = precision_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
     train_rec = recall_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
     train_f1 = f1_score(y_train_res, y_train_pred, average='weighted', zero_division=0)
-    
+
     # Test seti üzerindeki performans
     y_test_pred = best_model.predict(X_test)
     test_acc = accuracy_score(y_test, y_test_pred)
     test_prec = precision_score(y_test, y_test_pred, average='weighted', zero_division=0)
     test_rec = recall_score(y_test, y_test_pred, average='weighted', zero_division=0)
     test_f1 = f1_score(y_test, y_test_pred, average='weighted', zero_division=0)
-    
-    # Modeli kaydetme
-    model_filename = f"model_{category}.pkl"
-    model_path = os.path.join(model_dir, model_filename)
-    joblib.dump((best_model, tfidf), model_path)
-    print(f"💾 Model kaydedildi: {model_filename}")
-    
+
+    # Modeli manifest'li paket olarak kaydetme
+    metrikler = {
+        'ogrenme': {'Accuracy': train_acc, 'Precision': train_prec, 'Recall': train_rec, 'F1-Score': train_f1},
+        'test': {'Accuracy': test_acc, 'Precision': test_prec, 'Recall': test_rec, 'F1-Score': test_f1},
+    }
+    student, student_report = None, None
+    if distill:
+        try:
+            student, student_report = distill_model(best_model, X_train_res, X_test, y_test)
+            print_distillation_report(student_report)
+        except Exception as e:
+            print(f"   ⚠️ Damıtma yapılamadı: {str(e)}")
+    model_path = save_bundle(best_model, tfidf, model_dir, category, metrics=metrikler,
+                             student=student, student_report=student_report)
+    print(f"💾 Model kaydedildi: {os.path.basename(model_path)}")
+
     # Tahmin edilecek veriler için tahmin yap
-    predict_category = predict_data[predict_data['Kategori'] == category].copy()
+    predictions = []
     if len(predict_category) > 0:
-        X_predict = tfidf.transform(predict_category['Yorum'])
+        X_predict = (features.transform(tfidf, predict_category['Yorum']) if features is not None
+                     else tfidf.transform(predict_category['Yorum']))
         y_predict = best_model.predict(X_predict)
-        
+    
         # Tahmin sonuçlarını sakla
         for idx, row in predict_category.iterrows():
             try:
@@ -215,8 +186,8 @@ for category in tqdm(train_data['Kategori'].unique(), desc="Kategori İşleniyor
             except:
                 sentiment = 0
                 sentiment_label = "Nötr"
-                
-            all_predictions.append({
+            
+            predictions.append({
                 'Yorum_ID': idx,
                 'Tarih': row.get('Tarih', 'Belirtilmemiş'),
                 'Yorum': row['Yorum'],
@@ -226,26 +197,27 @@ for category in tqdm(train_data['Kategori'].unique(), desc="Kategori İşleniyor
                 'Duygu_Polaritesi': sentiment,
                 'Duygu': sentiment_label
             })
-    
+
     # Eğitim ve test performansını kaydet
-    train_results.append({
+    train_result = {
         'Kategori': category,
         'Veri_Seti': 'Eğitim',
         'Accuracy': train_acc,
         'Precision': train_prec,
         'Recall': train_rec,
         'F1-Score': train_f1
-    })
-    
-    test_results.append({
+    }
+
+    test_result = {
         'Kategori': category,
         'Veri_Seti': 'Test',
         'Accuracy': test_acc,
         'Precision': test_prec,
         'Recall': test_rec,
-        'F1-Score': test_f1
-    })
-    
+        'F1-Score': test_f1,
+        **({'Ogrenci_Uyum': student_report['uyum']} if student_report else {})
+    }
+
     print(f"✅ Tamamlandı: {category}")
     print(f"   ➤ EĞİTİM SETİ PERFORMANSI:")
     print(f"     ◆ Accuracy:  {train_acc:.4f}")
@@ -258,47 +230,157 @@ for category in tqdm(train_data['Kategori'].unique(), desc="Kategori İşleniyor
     print(f"     ◆ Recall:    {test_rec:.4f}")
     print(f"     ◆ F1-Score:  {test_f1:.4f}\n")
 
-# ------- SONUÇLARI EXCEL DOSYALARINA YAZMA -------
-
-# 1. Performans sonuçları
-all_results = train_results + test_results
-results_df = pd.DataFrame(all_results)
-results_df.to_excel(os.path.join(report_dir, "ensemble_model_tum_performanslar.xlsx"), index=False)
-
-# 2. Özet performans tablosu
-pivot_df = results_df.pivot_table(index='Kategori', 
-                                 columns='Veri_Seti', 
-                                 values=['Accuracy', 'Precision', 'Recall', 'F1-Score'],
-                                 aggfunc='first')
-pivot_df.to_excel(os.path.join(report_dir, "ensemble_model_ozet_performanslar.xlsx"))
-
-# 3. Tüm tahminleri içeren tablo
-predictions_df = pd.DataFrame(all_predictions)
-
-# 4. Kategori sütunlarını oluşturma
-categories = train_data['Kategori'].unique()
-for category in categories:
-    predictions_df[category] = 0
-
-# Her kategori için 1/0 değerlerini atama
-for idx, row in predictions_df.iterrows():
-    if row['Tahmin'] == 1:  # Eğer tahmin 1 ise
-        predictions_df.at[idx, row['Kategori']] = 1
-
-# Son formatta tahmin sonuçlarını kaydetme
-final_columns = ['Yorum_ID', 'Tarih', 'Yorum', 'Duygu', 'Duygu_Polaritesi'] + list(categories)
-predictions_df[final_columns].to_excel(os.path.join(report_dir, "ensemble_tahmin_sonuclari.xlsx"), index=False)
-
-# Sadece 1 atanan yorumlar için duygu analizi sonuçlarını kaydetme
-positives_df = predictions_df[predictions_df['Tahmin'] == 1]
-positives_df.to_excel(os.path.join(report_dir, "pozitif_tahmin_duygu_analizi.xlsx"), index=False)
-
-total_time = time.time() - start_time
-print(f"\n⏱️ Toplam çalışma süresi: {total_time/60:.2f} dakika")
-print("\n📊 Tüm sonuçlar Excel dosyalarına kaydedildi:")
-print("   ➤ 'egitim_veri_seti.csv' - Eğitim için kullanılan 12.000~ veri seti")
-print("   ➤ 'tahmin_edilecek_veri_seti.csv' - Tahmin için kullanılan 63.000~ veri seti")
-print("   ➤ 'ensemble_model_tum_performanslar.xlsx' - Tüm performans metrikleri")
-print("   ➤ 'ensemble_model_ozet_performanslar.xlsx' - Kategori bazlı özet performans")
-print("   ➤ 'ensemble_tahmin_sonuclari.xlsx' - Tüm tahmin sonuçları ve kategori atamaları")
-print("   ➤ 'pozitif_tahmin_duygu_analizi.xlsx' - 1 atanan yorumlar için duygu analizi")
+    return train_result, test_result, predictions
+
+
+def train_ensemble_models(excel_folder=excel_folder, model_dir=model_dir, report_dir=report_dir, frames=None,
+                          distill=distill, feature_cache_dir=feature_cache_dir, cores=training_cores):
+    """Tüm kategoriler için 11 algoritmalı ensemble modeli eğit, tahmin ve rapor dosyalarını kaydet.
+
+    frames ({kategori: DataFrame}) verilirse Excel klasörü okunmaz. distill=True ise her
+    ensemble lojistik regresyon öğrenciye damıtılıp pakete eklenir. Yorumlar bir kez tokenize
+    edilir, sayımlar feature_cache_dir'de saklanır. Kategoriler cores çekirdeklik bütçe altında
+    eşzamanlı eğitilir. Test performanslarını döndürür.
+    """
+    # Zaman ölçümü başlat
+    start_time = time.time()
+
+    # Create directories if they don't exist
+    os.makedirs(model_dir, exist_ok=True)
+    os.makedirs(report_dir, exist_ok=True)
+
+    # 📄 Performans sonuçlarını tutacağımız listeler
+    train_results = []
+    test_results = []
+    all_predictions = []  # Tüm tahminleri tutacak liste
+    all_data = pd.DataFrame()  # Tüm verileri birleştirmek için
+
+    if frames is None:
+        # Excel dosyalarını al
+        excel_files = [f for f in os.listdir(excel_folder) if is_table_file(f)]
+        print(f"\n📁 Toplam işlenecek dosya sayısı: {len(excel_files)}\n")
+        sources = [(os.path.splitext(file)[0], os.path.join(excel_folder, file)) for file in excel_files]
+    else:
+        sources = list(frames.items())
+
+    # Tüm verileri bir araya toplama
+    for file_idx, (category, source) in enumerate(sources):
+        print(f"📥 Veri yükleniyor: {category} ({file_idx+1}/{len(sources)})")
+        df = read_table(source) if isinstance(source, str) else source.copy()
+        df.dropna(subset=['Yorum', 'Sonuç'], inplace=True)
+        df['Kategori'] = category
+        all_data = pd.concat([all_data, df])
+
+    print(f"\n✅ Toplam veri sayısı: {len(all_data)}")
+
+    # Eğitim ve tahmin yorumları tek seferde sayıma çevrilir (ya da özellik deposundan açılır)
+    features = None
+    try:
+        store = FeatureStore.for_vectorizer(TfidfVectorizer(stop_words=turkish_stop_words), feature_cache_dir)
+        features = store.snapshot(all_data['Yorum'].tolist())
+        kaynak = "özellik deposundan açıldı" if features.from_cache else "hesaplandı"
+        print(f"🧮 Sayım matrisi {kaynak}: {features.counts.shape[0]} benzersiz yorum, {features.counts.shape[1]} terim")
+    except Exception as e:
+        print(f"⚠️ Özellik deposu kullanılamadı, her kategori ayrı vektörleştirilecek: {str(e)}")
+
+    # Eğitim ve tahmin veri setlerini oluştur
+    train_data = pd.DataFrame()
+    predict_data = pd.DataFrame()
+
+    for category in all_data['Kategori'].unique():
+        category_data = all_data[all_data['Kategori'] == category].copy()
+        positives = category_data[category_data['Sonuç'] == 1]
+        negatives = category_data[category_data['Sonuç'] == 0]
+    
+        # Pozitif ve negatif örneklerden 400'er tane al (veya mevcut tüm örnekleri)
+        positives_400 = positives.sample(min(400, len(positives)), random_state=42)
+        negatives_400 = negatives.sample(min(400, len(negatives)), random_state=42)
+    
+        # Eğitim setine ekle
+        category_train = pd.concat([positives_400, negatives_400])
+        train_data = pd.concat([train_data, category_train])
+    
+        # Kalan verileri tahmin setine ekle
+        remaining_positives = positives.drop(positives_400.index)
+        remaining_negatives = negatives.drop(negatives_400.index)
+        category_predict = pd.concat([remaining_positives, remaining_negatives])
+        predict_data = pd.concat([predict_data, category_predict])
+
+    print(f"📊 Eğitim veri seti büyüklüğü: {len(train_data)}")
+    print(f"📊 Tahmin edilecek veri seti büyüklüğü: {len(predict_data)}")
+
+    # Eğitim veri setini kaydet
+    train_data.to_csv("egitim_veri_seti.csv", index=False)
+    predict_data.to_csv("tahmin_edilecek_veri_seti.csv", index=False)
+
+    # Kategoriler tek çekirdek bütçesi altında eşzamanlı eğitilir
+    tasks = []
+    for category in train_data['Kategori'].unique():
+        category_train = train_data[train_data['Kategori'] == category].copy()
+        predict_category = predict_data[predict_data['Kategori'] == category].copy()
+        # Göreve yalnızca kategorinin satırları gider; disk deposundaki sayımlar işçide yeniden açılır
+        category_features = (features.subset(pd.concat([category_train['Yorum'], predict_category['Yorum']]))
+                             if features is not None else None)
+        tasks.append((category, (category, category_train, predict_category, model_dir, distill, category_features)))
+    for category, (result, stats) in run_scheduled(train_ensemble_category, tasks, cores).items():
+        if isinstance(result, Exception):
+            print(f"⚠️ {category} işlenirken hata oluştu: {str(result)}")
+            continue
+        train_result, test_result, predictions = result
+        test_result.update(stats)
+        print(f"⏱️ {category}: {stats['Sure_Sn']:.1f} sn, CPU {stats['CPU_Sn']:.1f} sn, "
+              f"{stats['Cekirdek']} çekirdekte %{stats['CPU_Kullanim']*100:.0f} kullanım")
+        train_results.append(train_result)
+        test_results.append(test_result)
+        all_predictions.extend(predictions)
+
+    # ------- SONUÇLARI EXCEL DOSYALARINA YAZMA -------
+
+    # 1. Performans sonuçları
+    all_results = train_results + test_results
+    results_df = pd.DataFrame(all_results)
+    results_df.to_excel(os.path.join(report_dir, "ensemble_model_tum_performanslar.xlsx"), index=False)
+
+    # 2. Özet performans tablosu
+    pivot_df = results_df.pivot_table(index='Kategori', 
+                                     columns='Veri_Seti', 
+                                     values=['Accuracy', 'Precision', 'Recall', 'F1-Score'],
+                                     aggfunc='first')
+    pivot_df.to_excel(os.path.join(report_dir, "ensemble_model_ozet_performanslar.xlsx"))
+
+    # 3. Tüm tahminleri içeren tablo
+    predictions_df = pd.DataFrame(all_predictions)
+
+    # 4. Kategori sütunlarını oluşturma
+    categories = train_data['Kategori'].unique()
+    for category in categories:
+        predictions_df[category] = 0
+
+    # Her kategori için 1/0 değerlerini atama
+    for idx, row in predictions_df.iterrows():
+        if row['Tahmin'] == 1:  # Eğer tahmin 1 ise
+            predictions_df.at[idx, row['Kategori']] = 1
+
+    # Son formatta tahmin sonuçlarını kaydetme
+    final_columns = ['Yorum_ID', 'Tarih', 'Yorum', 'Duygu', 'Duygu_Polaritesi'] + list(categories)
+    predictions_df[final_columns].to_excel(os.path.join(report_dir, "ensemble_tahmin_sonuclari.xlsx"), index=False)
+
+    # Sadece 1 atanan yorumlar için duygu analizi sonuçlarını kaydetme
+    positives_df = predictions_df[predictions_df['Tahmin'] == 1]
+    positives_df.to_excel(os.path.join(report_dir, "pozitif_tahmin_duygu_analizi.xlsx"), index=False)
+
+    total_time = time.time() - start_time
+    print(f"\n⏱️ Toplam çalışma süresi: {total_time/60:.2f} dakika")
+    print("\n📊 Tüm sonuçlar Excel dosyalarına kaydedildi:")
+    print("   ➤ 'egitim_veri_seti.csv' - Eğitim için kullanılan 12.000~ veri seti")
+    print("   ➤ 'tahmin_edilecek_veri_seti.csv' - Tahmin için kullanılan 63.000~ veri seti")
+    print("   ➤ 'ensemble_model_tum_performanslar.xlsx' - Tüm performans metrikleri")
+    print("   ➤ 'ensemble_model_ozet_performanslar.xlsx' - Kategori bazlı özet performans")
+    print("   ➤ 'ensemble_tahmin_sonuclari.xlsx' - Tüm tahmin sonuçları ve kategori atamaları")
+    print("   ➤ 'pozitif_tahmin_duygu_analizi.xlsx' - 1 atanan yorumlar için duygu analizi")
+
+    return test_results
+
+
+if __name__ == "__main__":
+    train_ensemble_models()
@@ -0,0 +1,300 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from ml.model_bundle import find_models, load_model
+
+
+# Bu parametreleri aynı olan vektörleştiriciler metni aynı şekilde tokenize edip n-gram üretir
+ANALYZER_PARAMS = ("input", "encoding", "decode_error", "strip_accents", "lowercase", "preprocessor",
+                   "tokenizer", "stop_words", "token_pattern", "ngram_range", "analyzer")
+
+
+def _freeze(value):
+    if isinstance(value, (list, set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def analyzer_signature(vectorizer):
+    """Ortak sözlükte birleştirilebilecek vektörleştiriciler için anahtar; desteklenmiyorsa None"""
+    if not isinstance(vectorizer, CountVectorizer) or not hasattr(vectorizer, "vocabulary_"):
+        return None
+    try:
+        signature = tuple(_freeze(getattr(vectorizer, name)) for name in ANALYZER_PARAMS)
+        hash(signature)
+    except TypeError:
+        return None
+    return signature
+
+
+def _scale_counts(counts, binary, sublinear_tf):
+    """Sayım matrisine vektörleştiricinin terim frekansı ayarlarını uygula"""
+    if not binary and not sublinear_tf:
+        return counts
+    counts = counts.astype(np.float64)
+    if binary:
+        counts.data.fill(1)
+    if sublinear_tf:
+        np.log(counts.data, counts.data)
+        counts.data += 1
+    return counts
+
+
+def build_projection(vectorizer, vocabulary):
+    """Ortak sözlük sütunlarını kategorinin özellik sırasına taşıyan ve idf ile ölçekleyen seyrek matris.
+
+    Ortak sözlükte olmayan terimlerin sütunu boş kalır (sayımları zaten sıfırdır).
+    """
+    rows = np.fromiter((vocabulary.get(term, -1) for term in vectorizer.vocabulary_), dtype=np.int64,
+                       count=len(vectorizer.vocabulary_))
+    cols = np.fromiter(vectorizer.vocabulary_.values(), dtype=np.int64, count=len(vectorizer.vocabulary_))
+    n_features = int(cols.max()) + 1 if len(cols) else 0
+    if getattr(vectorizer, "use_idf", False):
+        weights = np.asarray(vectorizer.idf_, dtype=np.float64)[cols]
+    else:
+        weights = np.ones(len(cols))
+    found = rows >= 0
+    return csr_matrix((weights[found], (rows[found], cols[found])), shape=(len(vocabulary), n_features))
+
+
+def project_counts(counts, projection, binary=False, sublinear_tf=False, norm=None, dtype=np.float64):
+    """Ortak sayım matrisinden tek kategorinin TF-IDF özelliklerini üret"""
+    X = _scale_counts(counts, binary, sublinear_tf) @ projection
+    if norm:
+        X = normalize(X, norm=norm, copy=False)
+    return X.astype(dtype, copy=False)
+
+
+def save_shared_csr(matrix, prefix):
+    """CSR matrisini işçilerin bellek eşlemeli okuyacağı .npy dosyalarına yaz; (önek, boyut) döndür"""
+    matrix = matrix.tocsr()
+    for name in ("data", "indices", "indptr"):
+        np.save(f"{prefix}.{name}.npy", getattr(matrix, name))
+    return prefix, matrix.shape
+
+
+def load_shared_csr(prefix, shape):
+    """save_shared_csr ile yazılan matrisi kopyalamadan, salt okunur bellek eşlemesiyle aç"""
+    arrays = tuple(np.load(f"{prefix}.{name}.npy", mmap_mode="r") for name in ("data", "indices", "indptr"))
+    return csr_matrix(arrays, shape=shape, copy=False)
+
+
+# İşçi süreç başına önbellekler: her model süreçte bir kez yüklenir, paylaşılan matrisler
+# yalnızca aynı predict çağrısı (aynı geçici klasör) boyunca açık tutulur
+_worker_models = {}
+_worker_matrices = {}
+
+
+def _predict_category_worker(model_path, student, matrix_prefix, shape, projection_spec):
+    """İşçi süreç: modeli ve paylaşılan matrisi (ilk seferde) aç, kategoriyi tahmin et"""
+    start_time = time.perf_counter()
+    if (model_path, student) not in _worker_models:
+        _worker_models[model_path, student] = load_model(model_path, student=student)[0]
+    if matrix_prefix not in _worker_matrices:
+        if any(os.path.dirname(prefix) != os.path.dirname(matrix_prefix) for prefix in _worker_matrices):
+            _worker_matrices.clear()
+        _worker_matrices[matrix_prefix] = load_shared_csr(matrix_prefix, shape)
+    X = _worker_matrices[matrix_prefix]
+    if projection_spec is not None:
+        X = project_counts(X, *projection_spec)
+    return _worker_models[model_path, student].predict(X), time.perf_counter() - start_time
+
+
+class MultiLabelPredictor:
+    """Tüm kategori modellerini tek geçişte çalıştıran çoklu etiket tahmin motoru.
+
+    Tokenizasyon ayarları aynı olan vektörleştiricilerin sözlükleri tek bir ortak sözlükte
+    birleştirilir. Her yorum grup başına bir kez tokenize edilip n-gram sayımına çevrilir;
+    her kategorinin TF-IDF matrisi bu sayımlardan seyrek bir sütun toplama + idf ölçekleme
+    ve satır normalizasyonuyla elde edilir, sonuç ``vectorizer.transform`` ile aynıdır.
+    Birleştirilemeyen vektörleştiriciler kendi ``transform``'larıyla çalıştırılır.
+
+    ``predict(texts, workers=N)`` kategorileri N süreçlik havuzda paralel tahmin eder:
+    sayım matrisleri bir kez diske yazılıp işçilerde bellek eşlemeyle açılır, her işçi
+    modelini kendi dosyasından bir kez yükler. Havuz çağrılar arasında açık kalır (parça
+    parça tahminde modeller yeniden yüklenmez); ``close()`` ya da ``with`` ile kapatılır.
+
+    ``feature_cache_dir`` verilirse her grubun sayımları ``ml/feature_store.py`` deposundan
+    alınır: aynı yorumlar tekrar tahmin edildiğinde tokenizasyon yapılmaz, sayımlar diskten açılır.
+    """
+
+    def __init__(self, models, model_paths=None, student=False, feature_cache_dir=None):
+        self.categories = list(models)
+        self.models = {category: model for category, (model, _) in models.items()}
+        self.vectorizers = {category: vectorizer for category, (_, vectorizer) in models.items()}
+        self.model_paths = dict(model_paths or {})
+        self.student = student
+        self.feature_cache_dir = feature_cache_dir
+        self.groups = []
+        self.direct = []
+        self.last_errors = {}
+        self.last_stats = {}
+        self._executor = None
+        self._executor_workers = 0
+        self._build()
+
+    @classmethod
+    def from_dir(cls, model_dir=".", model_paths=None, student=False, feature_cache_dir=None):
+        """Klasördeki model paketlerini / model_*.pkl dosyalarını yükle; (tahminci, yükleme hataları) döndür.
+
+        Paketlerdeki diziler bellek eşlemeli açılır. student=True ise damıtılmış öğrenci modeli
+        olan paketlerde ensemble yerine öğrenci kullanılır (hızlı yol).
+        """
+        if model_paths is None:
+            model_paths = find_models(model_dir)
+        models, errors = {}, {}
+        for category, path in model_paths.items():
+            try:
+                models[category] = load_model(path, student=student)
+            except Exception as e:
+                errors[category] = e
+        return cls(models, model_paths, student, feature_cache_dir), errors
+
+    def _build(self):
+        """Vektörleştiricileri analiz imzasına göre grupla ve ortak sözlükleri kur"""
+        grouped = {}
+        for category in self.categories:
+            signature = analyzer_signature(self.vectorizers[category])
+            if signature is None:
+                self.direct.append(category)
+            else:
+                grouped.setdefault(signature, []).append(category)
+
+        if self.feature_cache_dir is not None:
+            from ml.feature_store import FeatureStore
+
+        for categories in grouped.values():
+            vocabulary = {}
+            for category in categories:
+                for term in self.vectorizers[category].vocabulary_:
+                    vocabulary.setdefault(term, len(vocabulary))
+            base = self.vectorizers[categories[0]]
+            counter = CountVectorizer(vocabulary=vocabulary, dtype=np.float64,
+                                      **{name: getattr(base, name) for name in ANALYZER_PARAMS})
+            projections = {category: build_projection(self.vectorizers[category], vocabulary) for category in categories}
+            store = None
+            if self.feature_cache_dir is not None:
+                store = FeatureStore.for_vectorizer(base, self.feature_cache_dir)
+            self.groups.append((counter, projections, store))
+
+    def _projection_spec(self, category, projection):
+        vectorizer = self.vectorizers[category]
+        return (projection, vectorizer.binary, getattr(vectorizer, "sublinear_tf", False),
+                getattr(vectorizer, "norm", None), vectorizer.dtype)
+
+    def _shared_inputs(self, texts):
+        """Her kategori için (ortak matris, izdüşüm ayarları) döndür; metinler grup başına bir kez tokenize edilir"""
+        inputs = {}
+        for counter, projections, store in self.groups:
+            if store is None:
+                counts = counter.transform(texts)
+            else:
+                # Depodaki sayımların sütunları derlemin tüm terimleridir; izdüşümler ona göre kurulur
+                snapshot = store.snapshot(texts)
+                counts = snapshot.counts[snapshot.rows(texts)]
+                projections = {category: build_projection(self.vectorizers[category], snapshot.vocabulary)
+                               for category in projections}
+            for category, projection in projections.items():
+                inputs[category] = (counts, self._projection_spec(category, projection))
+        for category in self.direct:
+            inputs[category] = (self.vectorizers[category].transform(texts), None)
+        return inputs
+
+    def transform(self, texts):
+        """Her kategori için özellik matrisini döndür; metinler grup başına bir kez tokenize edilir"""
+        features = {}
+        for category, (matrix, spec) in self._shared_inputs(texts).items():
+            features[category] = matrix if spec is None else project_counts(matrix, *spec)
+        return features
+
+    def _predict_serial(self, inputs, labels, timings):
+        for column, category in enumerate(self.categories):
+            start_time = time.perf_counter()
+            try:
+                matrix, spec = inputs[category]
+                X = matrix if spec is None else project_counts(matrix, *spec)
+                labels[:, column] = self.models[category].predict(X)
+            except Exception as e:
+                self.last_errors[category] = e
+            timings[category] = time.perf_counter() - start_time
+
+    def _predict_parallel(self, inputs, labels, timings, workers):
+        """Kategorileri süreç havuzunda tahmin et; matrisler kopyalanmadan bellek eşlemeyle paylaşılır"""
+        with tempfile.TemporaryDirectory(prefix="tahmin_") as shared_dir:
+            shared = {}
+            for category in self.categories:
+                matrix, spec = inputs[category]
+                if id(matrix) not in shared:
+                    shared[id(matrix)] = save_shared_csr(matrix, os.path.join(shared_dir, f"matris{len(shared)}"))
+
+            executor = self._get_executor(workers)
+            futures = {}
+            for column, category in enumerate(self.categories):
+                matrix, spec = inputs[category]
+                futures[category] = (column, executor.submit(_predict_category_worker, self.model_paths[category],
+                                                             self.student, *shared[id(matrix)], spec))
+            for category, (column, future) in futures.items():
+                try:
+                    labels[:, column], timings[category] = future.result()
+                except Exception as e:
+                    self.last_errors[category] = e
+
+    def _get_executor(self, workers):
+        """Süreç havuzunu ilk kullanımda oluştur; işçi sayısı değişmedikçe yeniden kullan"""
+        if self._executor is None or self._executor_workers != workers:
+            self.close()
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            self._executor_workers = workers
+        return self._executor
+
+    def close(self):
+        """Paralel tahmin için açılan süreç havuzunu kapat"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def predict(self, texts, workers=1):
+        """Tüm kategoriler için (yorum sayısı x kategori sayısı) 0/1 etiket matrisini döndür.
+
+        workers > 1 ise kategoriler o kadar süreçte paralel tahmin edilir (model dosyası yolları
+        gerekir). Tahmini başarısız olan kategorilerin sütunu 0 kalır, hata ``last_errors``'a yazılır.
+        """
+        start_time = time.perf_counter()
+        inputs = self._shared_inputs(texts)
+        vectorize_time = time.perf_counter() - start_time
+
+        labels = np.zeros((len(texts), len(self.categories)), dtype=np.int64)
+        self.last_errors = {}
+        timings = {}
+        workers = max(1, min(workers, len(self.categories)))
+        if workers > 1 and all(category in self.model_paths for category in self.categories):
+            self._predict_parallel(inputs, labels, timings, workers)
+        else:
+            workers = 1
+            self._predict_serial(inputs, labels, timings)
+
+        self.last_stats = {
+            'yorum': len(texts),
+            'kategori': len(self.categories),
+            'grup': len(self.groups),
+            'isci': workers,
+            'vektorlestirme_sn': vectorize_time,
+            'kategori_sn': timings,
+            'sure': time.perf_counter() - start_time,
+        }
+        return labels
@@ -0,0 +1,157 @@
+"""Sparse TF-IDF matrisini yoğun diziye çevirmeden çalışan naive Bayes modelleri.
+
+Ensemble'larda GaussianNB ve MultinomialNB eskiden ``make_dense`` (``X.toarray()``) ile
+besleniyordu; her fit, tahmin ve çapraz doğrulama katında satır x özellik boyutunda yoğun bir
+dizi ayrılıyordu. MultinomialNB sparse girdiyi zaten destekler. ``SparseGaussianNB`` ise
+GaussianNB'nin ortalama, varyans ve olasılık hesaplarını sparse matris işlemleriyle yapar:
+
+    sum((x - theta)^2 / var) = (x^2) @ (1 / var) - 2 x @ (theta / var) + sum(theta^2 / var)
+
+Sonuçlar GaussianNB ile (kayan nokta yuvarlaması dışında) aynıdır; yoğun girdi verilirse
+doğrudan GaussianNB davranır.
+
+Bellek karşılaştırması (fit + predict_proba başına en yüksek ayrılan bellek):
+    python ml/sparse_naive_bayes.py --rows 50000 --features 1000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.naive_bayes import GaussianNB, MultinomialNB
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import FunctionTransformer
+from sklearn.utils.multiclass import check_classification_targets
+from sklearn.utils.validation import _check_sample_weight
+
+try:
+    from sklearn.utils.validation import validate_data
+except ImportError:  # scikit-learn < 1.6
+    def validate_data(estimator, X, y="no_validation", **kwargs):
+        return estimator._validate_data(X, y, **kwargs)
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _column_moments(X, weights):
+    """Sütunların ağırlıklı ortalaması ve varyansı (sparse matris yoğunlaştırılmadan)"""
+    total = weights.sum()
+    mean = np.asarray(X.T @ weights).ravel() / total
+    square = np.asarray(X.multiply(X).T @ weights).ravel() / total
+    return mean, np.maximum(square - mean ** 2, 0.0)
+
+
+class SparseGaussianNB(GaussianNB):
+    """Sparse (CSR) girdiyi yoğunlaştırmadan eğitilen ve tahmin yapan GaussianNB"""
+
+    def fit(self, X, y, sample_weight=None):
+        if not sp.issparse(X):
+            return super().fit(X, y, sample_weight=sample_weight)
+        X, y = validate_data(self, X, y, accept_sparse="csr", dtype=np.float64, reset=True)
+        check_classification_targets(y)
+        weights = _check_sample_weight(sample_weight, X)
+
+        # GaussianNB ile aynı: varyans yumuşatması tüm verinin en büyük sütun varyansına göre
+        self.epsilon_ = self.var_smoothing * _column_moments(X, np.ones(X.shape[0]))[1].max()
+        self.classes_ = np.unique(y)
+        n_classes, n_features = len(self.classes_), X.shape[1]
+        self.theta_ = np.zeros((n_classes, n_features))
+        self.var_ = np.zeros((n_classes, n_features))
+        self.class_count_ = np.zeros(n_classes, dtype=np.float64)
+        for index, label in enumerate(self.classes_):
+            rows = np.flatnonzero(y == label)
+            self.theta_[index], self.var_[index] = _column_moments(X[rows], weights[rows])
+            self.class_count_[index] = weights[rows].sum()
+        self.var_ += self.epsilon_
+
+        if self.priors is not None:
+            priors = np.asarray(self.priors)
+            if len(priors) != n_classes:
+                raise ValueError("Number of priors must match number of classes.")
+            if not np.isclose(priors.sum(), 1.0):
+                raise ValueError("The sum of the priors should be 1.")
+            if (priors < 0).any():
+                raise ValueError("Priors must be non-negative.")
+            self.class_prior_ = priors
+        else:
+            self.class_prior_ = self.class_count_ / self.class_count_.sum()
+        return self
+
+    def _check_X(self, X):
+        return validate_data(self, X, accept_sparse="csr", reset=False)
+
+    def _joint_log_likelihood(self, X):
+        if not sp.issparse(X):
+            return super()._joint_log_likelihood(X)
+        inverse = 1.0 / self.var_
+        squared = np.asarray(X.multiply(X) @ inverse.T)
+        cross = np.asarray(X @ (self.theta_ * inverse).T)
+        constant = (np.log(self.class_prior_) - 0.5 * np.log(2.0 * np.pi * self.var_).sum(axis=1)
+                    - 0.5 * (self.theta_ ** 2 * inverse).sum(axis=1))
+        return constant - 0.5 * (squared - 2.0 * cross)
+
+
+def _sample_tfidf(rows, features, density=0.01, seed=42):
+    """Satırları L2 normalize edilmiş rastgele sparse TF-IDF benzeri matris ve etiketler"""
+    rng = np.random.default_rng(seed)
+    X = sp.random(rows, features, density=density, format="csr", dtype=np.float64, random_state=seed)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    X = sp.diags(1.0 / norms) @ X
+    y = (np.asarray(X[:, :features // 10].sum(axis=1)).ravel() + rng.normal(0, 0.05, rows) > 0.1).astype(int)
+    return X.tocsr(), y
+
+
+def _measure(model, X, y):
+    """Bir fit + predict_proba çağrısının en yüksek bellek kullanımı (MB), süresi ve olasılıkları"""
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    proba = model.fit(X, y).predict_proba(X)
+    seconds = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 ** 2, seconds, proba
+
+
+def benchmark(rows=50_000, features=1000, density=0.01):
+    """Yoğunlaştırmalı (eski) ve sparse naive Bayes modellerini bellek ve süre açısından karşılaştır"""
+    from ml.model_trainer import make_dense
+
+    X, y = _sample_tfidf(rows, features, density)
+    pairs = {
+        'MultinomialNB': (make_pipeline(FunctionTransformer(make_dense, accept_sparse=True), MultinomialNB()),
+                          MultinomialNB()),
+        'GaussianNB': (make_pipeline(FunctionTransformer(make_dense, accept_sparse=True), GaussianNB()),
+                       SparseGaussianNB()),
+    }
+    results = {}
+    for name, (dense_model, sparse_model) in pairs.items():
+        dense_mb, dense_seconds, dense_proba = _measure(dense_model, X, y)
+        sparse_mb, sparse_seconds, sparse_proba = _measure(sparse_model, X, y)
+        results[name] = {
+            'eski_mb': dense_mb,
+            'yeni_mb': sparse_mb,
+            'eski_sn': dense_seconds,
+            'yeni_sn': sparse_seconds,
+            'en_buyuk_fark': float(np.abs(dense_proba - sparse_proba).max()),
+        }
+    return {'yorum': rows, 'ozellik': features, 'matris_mb': X.data.nbytes / 1024 ** 2, 'modeller': results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yoğun ve sparse naive Bayes bellek karşılaştırması")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--features", type=int, default=1000)
+    parser.add_argument("--density", type=float, default=0.01)
+    args = parser.parse_args()
+
+    sonuc = benchmark(args.rows, args.features, args.density)
+    print(f"📊 {sonuc['yorum']} yorum x {sonuc['ozellik']} özellik (sparse veri: {sonuc['matris_mb']:.1f} MB)")
+    for ad, olcum in sonuc['modeller'].items():
+        print(f"   {ad}: fit + predict_proba başına en yüksek bellek {olcum['eski_mb']:.1f} MB -> "
+              f"{olcum['yeni_mb']:.1f} MB, süre {olcum['eski_sn']:.2f} sn -> {olcum['yeni_sn']:.2f} sn, "
+              f"en büyük olasılık farkı {olcum['en_buyuk_fark']:.2e}")
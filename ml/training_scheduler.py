@@ -0,0 +1,114 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from threadpoolctl import threadpool_limits
+
+
+def plan_cores(n_tasks, cores=None):
+    """Çekirdek bütçesini dış (eşzamanlı kategori) ve iç (arama/fold) seviyeye böl; (dış, iç) döndür"""
+    cores = max(1, cores or os.cpu_count() or 1)
+    outer = max(1, min(n_tasks, cores))
+    return outer, max(1, cores // outer)
+
+
+def _proc_cpu_seconds(pid, ticks):
+    with open(f"/proc/{pid}/stat", "r") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime, stime, cutime, cstime (sürecin beklediği alt süreçleri dahil)
+    return sum(int(value) for value in fields[11:15]) / ticks
+
+
+def _child_pids(pid):
+    """Sürecin yaşayan doğrudan alt süreçleri (Linux /proc/<pid>/task/<tid>/children)"""
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children", "r") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def process_tree_cpu_seconds():
+    """Bu sürecin, beklenmiş alt süreçlerinin ve yaşayan alt süreçlerinin (ör. joblib işçileri) CPU süresi.
+
+    Süreç ve beklenmiş alt süreçler os.times ile okunur; yalnızca yaşayan alt süreç ağacının
+    /proc kayıtları taranır (tüm sistem değil). /proc yoksa yaşayan alt süreçler sayılmaz.
+    """
+    times = os.times()
+    total = times.user + times.system + times.children_user + times.children_system
+    if not os.path.isdir("/proc"):
+        return total
+    ticks = os.sysconf("SC_CLK_TCK")
+    seen, frontier = set(), _child_pids(os.getpid())
+    while frontier:
+        pid = frontier.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        try:
+            total += _proc_cpu_seconds(pid, ticks)
+        except (OSError, IndexError, ValueError):
+            continue
+        frontier.extend(_child_pids(pid))
+    return total
+
+
+def _run_task(function, args, inner_jobs, capture_output):
+    """Görevi iç çekirdek sınırıyla çalıştır; (sonuç ya da hata, istatistik, çıktı) döndür"""
+    output = io.StringIO()
+    start_time, start_cpu = time.perf_counter(), process_tree_cpu_seconds()
+    with threadpool_limits(limits=inner_jobs), \
+            (contextlib.redirect_stdout(output) if capture_output else contextlib.nullcontext()):
+        try:
+            result = function(*args, n_jobs=inner_jobs)
+        except Exception as e:
+            print(traceback.format_exc())
+            result = e
+    wall = time.perf_counter() - start_time
+    cpu = process_tree_cpu_seconds() - start_cpu
+    stats = {
+        'Sure_Sn': wall,
+        'CPU_Sn': cpu,
+        'Cekirdek': inner_jobs,
+        'CPU_Kullanim': cpu / (wall * inner_jobs) if wall else 0.0,
+    }
+    return result, stats, output.getvalue()
+
+
+def run_scheduled(function, tasks, cores=None):
+    """Görevleri tek bir çekirdek bütçesi altında eşzamanlı çalıştır.
+
+    tasks: [(ad, args)]; her görev ``function(*args, n_jobs=iç)`` olarak çağrılır. Bütçe
+    plan_cores ile eşzamanlı görevler (süreç havuzu) ve görev içi paralellik (n_jobs, BLAS
+    iş parçacıkları) arasında bölünür, böylece iç içe joblib işçileri çekirdekleri aşmaz.
+    Havuzda çalışan görevlerin çıktısı görev bitince toplu yazdırılır. Görev sırasıyla
+    {ad: (sonuç ya da hata, istatistik)} döndürür; istatistik duvar saati süresi, CPU süresi,
+    ayrılan çekirdek ve CPU kullanımıdır (CPU süresi / (süre x çekirdek)).
+    """
+    outer, inner = plan_cores(len(tasks), cores)
+    print(f"🧵 Çekirdek bütçesi: {outer * inner} ({outer} eşzamanlı görev x {inner} çekirdek)")
+    results = {}
+    if outer == 1:
+        for name, args in tasks:
+            result, stats, _ = _run_task(function, args, inner, capture_output=False)
+            results[name] = (result, stats)
+        return results
+
+    with ProcessPoolExecutor(max_workers=outer, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {executor.submit(_run_task, function, args, inner, True): name for name, args in tasks}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result, stats, output = future.result()
+            except Exception as e:
+                result, stats, output = e, None, ""
+            print(output, end="")
+            results[name] = (result, stats)
+    return {name: results[name] for name, _ in tasks}
@@ -0,0 +1,294 @@
+"""Tüm işlem hattını etkileşimsiz çalıştıran komut satırı aracı.
+
+Örnekler:
+    python pipeline.py --config pipeline.toml run
+    python pipeline.py --config pipeline.toml label --input outputs/filtrelenmis_yorumlar.parquet
+    python pipeline.py --config pipeline.toml --profile predict
+
+Her aşama içe aktarılabilir bir fonksiyon çağırır; ``run`` aşamaları aynı süreçte
+zincirler ve aradaki DataFrame'leri dosyaya yazmadan bir sonrakine aktarır.
+"""
+import argparse
+import cProfile
+import importlib.util
+import os
+import pstats
+import sys
+import time
+
+import pandas as pd
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from data.table_io import write_table
+
+STAGES = ["scrape", "filter", "merge", "label", "train", "predict", "sentiment"]
+DEFAULT_RUN = ["filter", "label", "train", "predict", "sentiment"]
+SENTIMENT_OPTIONS = ("batch_size", "num_threads", "workers", "backend", "parity_sample", "cache_file", "server_url",
+                     "chunk_reducer", "window_overlap")
+
+
+def load_config(path):
+    """TOML ya da YAML yapılandırma dosyasını sözlük olarak oku"""
+    if not path:
+        return {}
+    if path.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise RuntimeError("YAML yapılandırması için 'pyyaml' paketi gerekli (pip install pyyaml)")
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    if tomllib is None:
+        raise RuntimeError("TOML yapılandırması için Python 3.11+ gerekli; YAML dosyası da kullanılabilir")
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def _load_scraper_module(file_name):
+    """'Web Scraping' klasöründeki (adında boşluk var) kazıyıcıyı dosya yolundan yükle"""
+    path = os.path.join(ROOT, "Web Scraping", "scrapers", file_name)
+    spec = importlib.util.spec_from_file_location(os.path.splitext(file_name)[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def stage_scrape(cfg, state):
+    """Seçilen kaynaktan yorumları çek ve Tarih/Yorum sütunlu DataFrame döndür"""
+    source = cfg.get("source", "sikayetvar")
+    if source == "sikayetvar":
+        module = _load_scraper_module("sikayetvar_scraper.py")
+        scraper = module.SikayetvarScraper(market_name=cfg.get("market", "migros"), max_pages=cfg.get("pages", 1),
+                                           show_full_comment=cfg.get("show_full_comment", True),
+                                           max_workers=cfg.get("max_workers", 5))
+        scraper.scrape_comments()
+        df = pd.DataFrame(scraper.comments, columns=["sayfa", "sıra", "içerik", "tarih"])
+        df = df.rename(columns={"içerik": "Yorum", "tarih": "Tarih"})
+    elif source == "google_play":
+        module = _load_scraper_module("google_play_scraper.py")
+        scraper = module.GooglePlayParallelScraper(app_url=cfg["url"], max_workers=cfg.get("max_workers", 3),
+                                                   output_file=cfg.get("output_file", "yorumlar"))
+        scraper.scrape()
+        df = scraper.df.rename(columns={"yorum": "Yorum", "tarih": "Tarih"})
+    elif source == "eksisozluk":
+        module = _load_scraper_module("eksisozluk_scraper.py")
+        scraper = module.EksiSozlukScraper(topic_url=cfg["url"], max_pages=cfg.get("pages", 1))
+        try:
+            scraper.start_driver()
+            scraper.scrape_entries()
+        finally:
+            scraper.close()
+        df = pd.read_csv(scraper.csv_filename).rename(columns={"content": "Yorum", "date": "Tarih"})
+    else:
+        raise ValueError(f"Bilinmeyen kaynak: {source} (sikayetvar, google_play, eksisozluk)")
+
+    output = cfg.get("output")
+    if output:
+        write_table(df, output)
+    state["comments"] = df
+    return len(df)
+
+
+def stage_filter(cfg, state):
+    """Kısa yorumları ele"""
+    from data.filter_short_comments import filtrele_yorumlar
+
+    df = filtrele_yorumlar(cfg.get("input", "birlesik_yorumlar.csv"),
+                           cfg.get("output", os.path.join("outputs", "filtrelenmis_yorumlar.parquet")),
+                           min_kelime=cfg.get("min_words", 5), df=state.get("comments"))
+    if df is None:
+        raise RuntimeError("Filtreleme başarısız oldu")
+    state["comments"] = df
+    return len(df)
+
+
+def stage_merge(cfg, state):
+    """Kategori Excel dosyalarını tek tabloda birleştir"""
+    from data.merge_category_excels import birlestir, dosya_isimleri
+
+    df = birlestir(cfg.get("folder", "kategori_sonuclari"),
+                   cfg.get("output", os.path.join("outputs", "birlesik_veri.parquet")),
+                   cfg.get("categories", dosya_isimleri), excel_path=cfg.get("excel"))
+    if df is None:
+        raise RuntimeError("Birleştirilecek veri bulunamadı")
+    state["merged"] = df
+    return len(df)
+
+
+def stage_label(cfg, state):
+    """Yorumları LLM ile etiketle"""
+    from labeling.category_labeling_llm import run_labeling
+
+    df = state.get("comments")
+    labels = run_labeling(cfg.get("input", os.path.join("outputs", "filtrelenmis_yorumlar.parquet")),
+                          categories=cfg.get("categories"), multi_label=cfg.get("multi_label", True),
+                          target_positive=cfg.get("target_positive", 0),
+                          target_negative=cfg.get("target_negative", 0),
+                          file_type=cfg.get("file_type", "all"), use_cascade=cfg.get("cascade"),
+                          sampler=cfg.get("sampler"), max_comments=cfg.get("max_comments"), df=df)
+    state["labels"] = labels
+    return len(df) if df is not None else len(labels)
+
+
+def stage_train(cfg, state):
+    """Kategori modellerini eğit; etiketler bellekteyse Excel okunmaz"""
+    keys = ["excel_folder", "model_dir", "report_dir", "distill", "feature_cache_dir", "cores"]
+    if cfg.get("trainer", "default") == "ensemble":
+        from ml.model_training_ensemble import train_ensemble_models as train
+    else:
+        from ml.model_trainer import train_models as train
+        # Süre bütçeli parametre araması yalnızca varsayılan eğiticide var
+        keys += ["search_mode", "search_budget"]
+
+    kwargs = {key: cfg[key] for key in keys if key in cfg}
+    results = train(frames=state.get("labels"), **kwargs)
+    state["model_dir"] = kwargs.get("model_dir", state.get("model_dir"))
+    return len(results)
+
+
+def stage_predict(cfg, state):
+    """Eğitilmiş modellerle kategori tahmini yap; chunk_size verilirse girdi parça parça işlenir"""
+    from ml.category_prediction import predict_categories, predict_categories_streaming, tahmin_excel
+
+    model_dir = cfg.get("model_dir") or state.get("model_dir") or "."
+    if cfg.get("chunk_size"):
+        rows = predict_categories_streaming(cfg.get("input", tahmin_excel), model_dir=model_dir,
+                                            output_path=cfg.get("output", os.path.join("outputs", "tahmin_sonuclari.parquet")),
+                                            chunk_size=cfg["chunk_size"], workers=cfg.get("workers", 1),
+                                            use_student=cfg.get("student", False),
+                                            feature_cache_dir=cfg.get("feature_cache_dir"))
+        if rows is None:
+            raise RuntimeError("Tahmin başarısız oldu")
+        # Sonuçlar bellekte tutulmaz; duygu analizi aşaması çıktı dosyasını okur
+        state.pop("predictions", None)
+        return rows
+    df = predict_categories(cfg.get("input", tahmin_excel), df=state.get("comments"), model_dir=model_dir,
+                            output_path=cfg.get("output", os.path.join("outputs", "tahmin_sonuclari.parquet")),
+                            excel_path=cfg.get("excel"), workers=cfg.get("workers", 1),
+                            use_student=cfg.get("student", False), feature_cache_dir=cfg.get("feature_cache_dir"))
+    if df is None:
+        raise RuntimeError("Tahmin başarısız oldu")
+    state["predictions"] = df
+    return len(df)
+
+
+def stage_sentiment(cfg, state):
+    """Kategorisi bulunan yorumlara duygu analizi uygula"""
+    from analysis.bert_sentiment_tr import run_sentiment
+
+    df = run_sentiment(cfg.get("input", os.path.join("outputs", "tahmin_sonuclari.parquet")),
+                       df=state.get("predictions"),
+                       sonuc_dosyasi=cfg.get("output", os.path.join("outputs", "duygu_analizi_sonuclari.parquet")),
+                       excel_path=cfg.get("excel"),
+                       **{key: cfg[key] for key in SENTIMENT_OPTIONS if key in cfg})
+    if df is None:
+        raise RuntimeError("Duygu analizi başarısız oldu")
+    state["sentiment"] = df
+    return len(df)
+
+
+STAGE_FUNCTIONS = {
+    "scrape": stage_scrape,
+    "filter": stage_filter,
+    "merge": stage_merge,
+    "label": stage_label,
+    "train": stage_train,
+    "predict": stage_predict,
+    "sentiment": stage_sentiment,
+}
+
+
+def run_stage(name, config, state, timings):
+    """Tek bir aşamayı çalıştır ve süresini / satır hızını kaydet"""
+    print(f"\n===== AŞAMA: {name} =====")
+    start = time.perf_counter()
+    rows = STAGE_FUNCTIONS[name](config.get(name, {}), state)
+    elapsed = time.perf_counter() - start
+    timings.append((name, rows, elapsed))
+    print(f"⏱️ {name}: {rows} satır, {elapsed:.2f} sn ({rows / elapsed if elapsed else 0:.1f} satır/sn)")
+    return rows
+
+
+def run_pipeline(stages, config=None, state=None):
+    """Aşamaları sırayla aynı süreçte çalıştır; (state, süreler) döndür"""
+    config = config or {}
+    state = {} if state is None else state
+    timings = []
+    for name in stages:
+        if name not in STAGE_FUNCTIONS:
+            raise ValueError(f"Bilinmeyen aşama: {name} ({', '.join(STAGES)})")
+        run_stage(name, config, state, timings)
+    return state, timings
+
+
+def print_timings(timings):
+    print("\n📊 AŞAMA SÜRELERİ")
+    for name, rows, elapsed in timings:
+        print(f"   {name:<10} {rows:>8} satır  {elapsed:>9.2f} sn  {rows / elapsed if elapsed else 0:>10.1f} satır/sn")
+    print(f"   {'toplam':<10} {'':>8}        {sum(t[2] for t in timings):>9.2f} sn")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Türkçe yorum analizi işlem hattı")
+    parser.add_argument("--config", "-c", help="TOML veya YAML yapılandırma dosyası")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="DOSYA",
+                        help="cProfile ile çalıştır; dosya verilirse istatistikleri oraya yaz")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in STAGES:
+        stage_parser = subparsers.add_parser(name, help=STAGE_FUNCTIONS[name].__doc__)
+        stage_parser.add_argument("--input", help="Girdi dosyası (yapılandırmadaki değeri ezer)")
+        stage_parser.add_argument("--output", help="Çıktı dosyası (yapılandırmadaki değeri ezer)")
+
+    run_parser = subparsers.add_parser("run", help="Aşamaları aynı süreçte zincirle")
+    run_parser.add_argument("--stages", help=f"Virgülle ayrılmış aşamalar (varsayılan: {','.join(DEFAULT_RUN)})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = load_config(args.config)
+
+    if args.command == "run":
+        if args.stages:
+            stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+        else:
+            stages = config.get("run", {}).get("stages", DEFAULT_RUN)
+    else:
+        stages = [args.command]
+        section = dict(config.get(args.command, {}))
+        for key in ("input", "output"):
+            if getattr(args, key):
+                section[key] = getattr(args, key)
+        config[args.command] = section
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        _, timings = run_pipeline(stages, config)
+    finally:
+        if profiler:
+            profiler.disable()
+            if args.profile == "-":
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+            else:
+                profiler.dump_stats(args.profile)
+                print(f"📈 Profil kaydedildi: {args.profile}")
+    print_timings(timings)
+
+
+if __name__ == "__main__":
+    main()
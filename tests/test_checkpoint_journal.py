@@ -0,0 +1,46 @@
+from labeling.checkpoint_journal import CheckpointJournal
+
+
+HEADER = {'dosya': 'yorumlar.xlsx', 'kategori': 'Kargo'}
+
+
+def _write_results(journal, indices):
+    for index in indices:
+        journal.append_result(index, {'Yorum': f"yorum {index}", 'Sonuç': index % 2})
+    journal.close()
+
+
+def test_resume_after_torn_tail_keeps_new_records(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    journal = CheckpointJournal(path, HEADER)
+    journal.start()
+    _write_results(journal, range(3))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"t": "r", "i": 3, "d": {"Yor')
+
+    resumed = CheckpointJournal(path, HEADER)
+    assert resumed.load()
+    assert len(resumed.results) == 3
+    _write_results(resumed, range(3, 6))
+
+    reloaded = CheckpointJournal(path, HEADER)
+    assert reloaded.load()
+    assert [result['Yorum'] for result in reloaded.results] == [f"yorum {i}" for i in range(6)]
+    assert len(reloaded.processed) == 6
+
+
+def test_load_without_torn_tail_leaves_file_unchanged(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    journal = CheckpointJournal(path, HEADER)
+    journal.start()
+    _write_results(journal, range(2))
+    journal.mark_processed(5)
+    journal.close()
+    with open(path, 'rb') as f:
+        before = f.read()
+
+    resumed = CheckpointJournal(path, HEADER)
+    assert resumed.load()
+    assert len(resumed.results) == 2 and 5 in resumed.processed
+    with open(path, 'rb') as f:
+        assert f.read() == before
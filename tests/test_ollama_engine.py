@@ -0,0 +1,96 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from labeling.label_cache import LabelCache
+from labeling.ollama_engine import OllamaLabelingEngine
+
+
+_COMMENT_LINE = re.compile(r'^\s*\d+\. "(.*)"$', re.M)
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    """Sahte /api/chat: 'kargo' geçen yorumlara 1 der; 'bozuk' geçen toplu isteklere bozuk JSON,
+    'hata' geçen isteklere HTTP 500 döner"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        comments = _COMMENT_LINE.findall(body["messages"][0]["content"])
+        self.server.requests.append(comments)
+        time.sleep(random.uniform(0, 0.02))
+        if any("hata" in comment for comment in comments):
+            self.send_response(500)
+            self.end_headers()
+            return
+        if len(comments) > 1 and any("bozuk" in comment for comment in comments):
+            content = '{"sonuclar": [{"id": 1, "sonuc":'
+        else:
+            content = json.dumps({"sonuclar": [{"id": idx, "sonuc": int("kargo" in comment)}
+                                               for idx, comment in enumerate(comments, 1)]})
+        data = json.dumps({"message": {"content": content}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllama)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _engine(server, cache=None, **kwargs):
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    engine = OllamaLabelingEngine("stub", host=host, max_retries=1, retry_delay=0, timeout=5, cache=cache, **kwargs)
+    # Ortamdaki HTTP vekil ayarları yerel sahte sunucuya giden istekleri etkilemesin
+    engine.session.trust_env = False
+    return engine
+
+
+def test_stream_preserves_order_with_concurrent_batches(server):
+    comments = [f"yorum {i} {'kargo' if i % 3 == 0 else 'ürün'}" for i in range(40)]
+    engine = _engine(server, max_workers=4, batch_size=3)
+
+    results = list(engine.stream(enumerate(comments), "Kargo", "Kargo ile ilgili yorumlar"))
+
+    assert [index for index, _, _ in results] == list(range(40))
+    assert [comment for _, comment, _ in results] == comments
+    assert [label for _, _, label in results] == [int(i % 3 == 0) for i in range(40)]
+
+
+def test_malformed_batch_falls_back_to_single_comments(server):
+    comments = ["kargo geç geldi", "bozuk cevap", "ürün güzel"]
+    engine = _engine(server, batch_size=3)
+
+    assert engine.label_batch(comments, "Kargo", "Kargo ile ilgili yorumlar") == [1, 0, 0]
+    assert server.requests[0] == comments
+    assert sorted(server.requests[1:]) == sorted([comment] for comment in comments)
+
+
+def test_failed_answers_are_not_cached(server, tmp_path):
+    cache = LabelCache(str(tmp_path / "etiketler.sqlite"), "stub")
+    comments = ["kargo hızlı", "hata veren yorum", "ürün güzel"]
+    engine = _engine(server, cache=cache, batch_size=3)
+
+    assert engine.label_batch(comments, "Kargo", "açıklama") == [1, 0, 0]
+    assert cache.get_many(comments, "Kargo", "açıklama") == ["1", None, "0"]
+
+    requests_before = len(server.requests)
+    engine.label_batch(comments, "Kargo", "açıklama")
+    assert server.requests[requests_before:] == [["hata veren yorum"]]
+    cache.close()